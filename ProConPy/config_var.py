@@ -4,6 +4,8 @@ from traitlets import HasTraits, Any, default, validate
 from ProConPy.out_handler import handler as owh
 from ProConPy.csp_solver import csp
 from ProConPy.options_spec import OptionsSpec
+from ProConPy.event_loop import running_event_loop
+from ProConPy.options_validities import OptionsValidities
 from ProConPy.dummy_widget import DummyWidget
 from ProConPy.dev_utils import ProConPyError, DEBUG
 from ProConPy.stage import Stage
@@ -27,6 +29,8 @@ class ConfigVar(HasTraits):
         The frontend representation of the variable instance.
         The user can view and change the value of variable
         trough the widget.
+    widget_factory
+        A function returning the widget, to be called when the widget is first accessed.
     """
 
     # Dictionary of instances. This should not be modified or overriden in derived classes.
@@ -42,8 +46,10 @@ class ConfigVar(HasTraits):
     # (If the instance has a finite set of options.)
     _invalid_opt_char = chr(int("274C", base=16))
     _valid_opt_char = chr(int("200B", base=16))
+    _unevaluated_opt_char = chr(int("2026", base=16))
 
-    def __init__(self, name, default_value=None, widget_none_val=None, hide_invalid=False, value_delimiter=None):
+    def __init__(self, name, default_value=None, widget_none_val=None, hide_invalid=False, value_delimiter=None,
+                 lazy_validities=False):
         """
         ConfigVar constructor.
 
@@ -63,6 +69,12 @@ class ConfigVar(HasTraits):
         value_delimiter: str, optional
             Delimiter used to separate multiple values in the value trait.
             Can only be specified for String (Unicode) variables.
+        lazy_validities: bool, optional
+            If True, options validities are not evaluated all at once, but on demand, i.e., when
+            the widget is about to display the options (if the widget supports it), when an option
+            is assigned, or when a valid option is searched for. Useful for variables with very long
+            options lists of which only a page is displayed at a time. Cannot be combined with
+            hide_invalid.
         """
 
         # Check if the variable has already been defined
@@ -92,6 +104,7 @@ class ConfigVar(HasTraits):
 
         self._widget_none_val = widget_none_val
         self._widget = DummyWidget(value=widget_none_val)
+        self._widget_factory = None  # to construct the actual widget upon first access
 
         # The rank of a ConfigVar indicates the order of the Stage it belongs to. The lower 
         # the rank, the earlier the Stage is in the sequence of Stages and thus the higher 
@@ -101,14 +114,19 @@ class ConfigVar(HasTraits):
 
         # properties for instances that have finite options
         self._options = []
-        self._options_validities = {}
+        self._options_validities = OptionsValidities()
+        self._validities_context = None  # csp.validity_context under which validities were evaluated
         self._options_spec = None
+        self._options_stream = None  # OptionsStream whose remaining pages are yet to be appended
+        self._num_published_options = 0  # number of streamed options displayed by the widget
         self._dependent_vars = (
             set()
         )  # ConfigVar instances whose options depend on the value of this instance
         self._is_guard_var = False  # True if this variable appears in the guard of any Stage
         self._hide_invalid = hide_invalid
 
+        assert not (hide_invalid and lazy_validities), "hide_invalid and lazy_validities cannot be combined"
+        self._lazy_validities = lazy_validities
 
         assert isinstance(value_delimiter, (str, type(None))), "value_delimiter must be a string or None"
         self._value_delimiter = value_delimiter
@@ -157,6 +175,28 @@ class ConfigVar(HasTraits):
         """
         return varname in cls.vdict
 
+    @classmethod
+    def assign_many(cls, assignments):
+        """Assign multiple variables as a single transaction. The combined assignment is checked
+        and propagated at once, and if it is invalid, none of the variables are assigned.
+        See CspSolver.batch for details.
+
+        Parameters
+        ----------
+        assignments : dict
+            A dictionary mapping ConfigVar instances (or their names) to their new values. The
+            assignments are made in the order of the dictionary.
+
+        Raises
+        ------
+        ConstraintViolation : If the combined assignment is invalid.
+        """
+        with csp.batch():
+            for var, new_value in assignments.items():
+                if isinstance(var, str):
+                    var = cls.vdict[var]
+                var.value = new_value
+
     @classmethod
     def lock(cls):
         """After all ConfigVar instances are initialized, this class method must be called to prevent
@@ -242,10 +282,97 @@ class ConfigVar(HasTraits):
         assert isinstance(
             new_options, (list, set, tuple)
         ), f"Unexpected new_options type: {type(new_options)}"
+        self._options_stream = None  # drop the pending pages of an earlier options stream, if any
         self._options = new_options
         csp.register_options(self, new_options)
         self.update_options_validities()
 
+    @property
+    def options_pending(self):
+        """True if the options of the variable are being streamed and some pages are yet to be appended."""
+        return self._options_stream is not None
+
+    def stream_options(self, stream):
+        """Set variable options from an OptionsStream. The first page of options is published
+        immediately. If there is a running event loop, e.g., that of the Jupyter kernel, the
+        remaining pages are validated and appended in subsequent event loop iterations so that the
+        frontend remains responsive. Otherwise, the stream is consumed in full right away. The
+        options are registered with the CSP solver only after the stream is exhausted.
+
+        Parameters
+        ----------
+        stream: OptionsStream
+            The stream of new options and tooltips
+        """
+
+        logger.debug("Streaming options for ConfigVar %s", self.name)
+        csp.register_options(self, None)  # drop the outdated options assertion, if any
+        if not stream.options and not stream.exhausted:
+            stream.next_page()  # unless the first page was read when the assignment was checked
+        loop = running_event_loop()
+        if stream.exhausted or loop is None:
+            stream.drain()
+            self.options = stream.options
+            self.tooltips = list(stream.tooltips)
+            return
+
+        self._options_stream = stream
+        self._options = list(stream.options)
+        self.update_options_validities()
+        self.tooltips = list(stream.tooltips)
+        self._num_published_options = len(self._options)
+        loop.call_soon(self._append_next_options_page, stream, loop)
+
+    @owh.out.capture()
+    def _append_next_options_page(self, stream, loop):
+        """Event loop callback to append the next page of options from the given stream."""
+        if stream is not self._options_stream:
+            return  # the stream has been completed or superseded in the meantime.
+        new_options, _ = stream.next_page()
+        self._append_options(new_options, final=stream.exhausted)
+        if stream.exhausted:
+            self._complete_options_stream()
+        else:
+            loop.call_soon(self._append_next_options_page, stream, loop)
+
+    def complete_options(self):
+        """If the options of the variable are being streamed, consume and append all the
+        remaining pages right away. This is to guarantee that the options list is complete, e.g.,
+        before an assignment is checked or the stage of the variable is completed."""
+        if self._options_stream is None:
+            return
+        logger.debug("Completing the options stream of ConfigVar %s", self.name)
+        new_options, _ = self._options_stream.drain()
+        self._append_options(new_options, final=True)
+        self._complete_options_stream()
+
+    def _append_options(self, new_options, final=False):
+        """Append a page of streamed options and determine their validities. Since the widget
+        options can only be replaced as a whole, the widget is refreshed only when the number
+        of options has doubled since the last refresh, or the page is the final one, so that
+        streaming N options costs O(N) widget traffic rather than O(N^2). Likewise, the options
+        list and validities are extended in place rather than rebuilt for each page."""
+        if len(new_options) > 0:
+            self._options.extend(new_options)
+            self._invalidate_stale_validities_context()
+            self._options_validities.extend(
+                new_options,
+                None if self._lazy_validities else csp.get_options_validities(self, new_options),
+            )
+        num_options = len(self._options)
+        if num_options > self._num_published_options and (
+            final or num_options >= 2 * self._num_published_options
+        ):
+            self._refresh_widget_options()
+            # Assign a new list, so that the change is detected and synced to the frontend.
+            self.tooltips = list(self._options_stream.tooltips)
+            self._num_published_options = num_options
+
+    def _complete_options_stream(self):
+        """Finalize an exhausted options stream by registering the complete options list."""
+        self._options_stream = None
+        csp.register_streamed_options(self)
+
     @property
     def options_spec(self):
         """The options specification of the variable."""
@@ -266,11 +393,11 @@ class ConfigVar(HasTraits):
             new_options_spec, OptionsSpec
         ), "new_options_spec must be an OptionsSpec instance"
         assert all(
-            isinstance(arg, ConfigVar) for arg in new_options_spec._args
+            isinstance(arg, ConfigVar) for arg in new_options_spec.args
         ), "all OptionsSpec args must be config_vars"
         self._options_spec = new_options_spec
 
-        for arg in new_options_spec._args:
+        for arg in new_options_spec.args:
             arg._dependent_vars.add(self)
 
     def update_options_validities(self):
@@ -286,14 +413,53 @@ class ConfigVar(HasTraits):
         old_widget_value = self._widget.value
         old_validities = self._options_validities
 
-        # First, update self._options_validities.
-        self._options_validities = csp.get_options_validities(self)
+        # If the options list hasn't changed, reuse its options list and index map.
+        if old_validities.options == list(self._options):
+            template = old_validities
+        else:
+            template = OptionsValidities(self._options)
 
         # check if options list have changed since the last time validities were updated
-        options_changed = old_validities.keys() != self._options_validities.keys()
+        options_changed = template is not old_validities
+
+        # If none of the assertions that the validities depend on have changed since the old
+        # validities were evaluated, carry over the old validities of the options that are retained.
+        context = csp.validity_context(self)
+        context_changed = context != self._validities_context
+        self._validities_context = context
+
+        # First, update self._options_validities.
+        if context_changed:
+            self._options_validities = template.with_validities()
+        elif options_changed:
+            self._options_validities = template.with_validities(
+                {
+                    opt: old_validities[opt]
+                    for opt in template.options
+                    if opt in old_validities and old_validities.is_evaluated(opt)
+                }
+            )
+        else:
+            self._options_validities = old_validities.copy()
+
+        if self._lazy_validities:
+            # Only evaluate the validities of the current value(s). The remaining validities are
+            # evaluated on demand and are set to None in the meantime.
+            self._evaluate_options_validities(self._current_values())
+        elif not self._options_validities.all_evaluated():
+            validities = self._options_validities
+            validities.update(
+                csp.get_options_validities(
+                    self, [opt for opt in self._options if not validities.is_evaluated(opt)]
+                )
+            )
+
         validities_changed = options_changed or (
             old_validities != self._options_validities
         )
+        if self._lazy_validities and not validities_changed and context_changed:
+            # Validities that are yet to be evaluated may have changed.
+            validities_changed = not self._options_validities.all_evaluated()
 
         # If no change has occurred, return.
         if not (options_changed or validities_changed):
@@ -308,11 +474,22 @@ class ConfigVar(HasTraits):
             logger.debug("ConfigVar %s validities changed. Updating widget", self.name)
 
         # After updating the internal options validities, refresh widget options list.
-        self._refresh_widget_options()
+        if options_changed or self._hide_invalid or not hasattr(self._widget, "patch_options"):
+            self._refresh_widget_options()
+        else:
+            self._patch_widget_options(old_validities)
 
         # Finally, update the value if necessary.
         if options_changed:
-            if self.value is not None:
+            if self.value is None:
+                pass
+            elif all(
+                self._options_validities.get(val) for val in self._current_values()
+            ):
+                # The value is retained in the new options list and is still valid, so keep it.
+                # Only the widget value must be re-set since its options list has changed.
+                self._update_widget_value()
+            else:
                 # reset the value to ensure that _post_value_change() gets called
                 # when options change, but the first valid option happens to be the
                 # same as the old value (from a different list of options)
@@ -337,7 +514,91 @@ class ConfigVar(HasTraits):
     @property
     def valid_options(self):
         """Returns the list of valid options for this variable."""
-        return [opt for opt in self._options if self._options_validities.get(opt, False)]
+        self.complete_options()
+        self._evaluate_options_validities(self._options)
+        return self._options_validities.valid_options()
+
+    def _current_values(self):
+        """Returns the list of current values of this variable, which may be multiple if the
+        variable has a value delimiter."""
+        if self.value is None:
+            return []
+        if self._value_delimiter is None:
+            return [self.value]
+        return self.value.split(self._value_delimiter)
+
+    def _evaluate_options_validities(self, options):
+        """Evaluate the validities of those of the given options whose validities are yet to be
+        evaluated. Applicable only if lazy_validities is True."""
+        validities = self._options_validities
+        if validities.all_evaluated():
+            return
+        unevaluated = [
+            opt for opt in options if opt in validities and not validities.is_evaluated(opt)
+        ]
+        if unevaluated:
+            self._invalidate_stale_validities_context()
+            self._options_validities.update(csp.get_options_validities(self, unevaluated))
+
+    def _invalidate_stale_validities_context(self):
+        """If the validity context has changed since the validities were last updated, the
+        validities about to be evaluated may be inconsistent with the earlier ones. So, forget
+        the context to prevent the validities from being carried over in the next update."""
+        if self._validities_context != csp.validity_context(self):
+            self._validities_context = None
+
+    def option_validity(self, option):
+        """Returns the validity of the given option, evaluating it first if needed.
+        Returns None if the given option is not an option of this variable."""
+        self._evaluate_options_validities([option])
+        return self._options_validities.get(option)
+
+    def iter_options_validities(self, chunk_size=16):
+        """Iterate over (option, validity) pairs of this variable. Validities that are yet to
+        be evaluated are evaluated in chunks as the iteration proceeds, so that a search for
+        valid options can stop early without evaluating all the validities."""
+        options = list(self._options)
+        for i in range(0, len(options), chunk_size):
+            chunk = options[i : i + chunk_size]
+            self._evaluate_options_validities(chunk)
+            for opt in chunk:
+                yield opt, self._options_validities[opt]
+
+    def _widget_option(self, opt):
+        """Returns the displayed widget option, i.e., the option preceded by its validity char."""
+        validity = self._options_validities[opt]
+        if validity is True:
+            return f"{self._valid_opt_char} {opt}"
+        if validity is None:
+            return f"{self._unevaluated_opt_char} {opt}"
+        return f"{self._invalid_opt_char} {opt}"
+
+    def _resolve_widget_options(self, widget_options):
+        """Given a sequence of widget options about to be displayed, evaluate the validities of
+        those that are yet to be evaluated and return the widget options with the validity chars
+        resolved. This method is passed to widgets that support on-demand resolution of options."""
+        unevaluated = [
+            wopt[1:].strip() for wopt in widget_options if wopt[0] == self._unevaluated_opt_char
+        ]
+        if not unevaluated:
+            return widget_options
+        self._evaluate_options_validities(unevaluated)
+        return tuple(
+            self._widget_option(wopt[1:].strip()) if wopt[0] == self._unevaluated_opt_char else wopt
+            for wopt in widget_options
+        )
+
+    def _patch_widget_options(self, old_validities):
+        """Send only the widget options whose validities have changed to the widget, as a dict
+        mapping option indices to new widget options. This is only applicable if the options list
+        itself hasn't changed and the widget supports patching its options."""
+        validities = self._options_validities
+        patches = {
+            ix: self._widget_option(validities.options[ix])
+            for ix in validities.changed_indices(old_validities)
+        }
+        logger.debug("Patching %d widget options of ConfigVar %s", len(patches), self.name)
+        self._widget.patch_options(patches)
 
     def _refresh_widget_options(self):
         """Refresh the widget options list based on information in the current self._options_validities."""
@@ -350,19 +611,12 @@ class ConfigVar(HasTraits):
                 if self._options_validities[opt]
             )
         else:
-            self._widget.options = tuple(
-                (
-                    f"{self._valid_opt_char} {opt}"
-                    if self._options_validities[opt] is True
-                    else f"{self._invalid_opt_char} {opt}"
-                )
-                for opt in self._options
-            )
+            self._widget.options = tuple(self._widget_option(opt) for opt in self._options)
 
         # If the (internal) value is None, make sure widget value is None too, because the above
         # widget options assignment might have set the widget value to the first value.
         if self.value is None:
-            self.widget.value = self.widget_none_val
+            self._widget.value = self.widget_none_val
 
     @property
     def tooltips(self):
@@ -374,18 +628,23 @@ class ConfigVar(HasTraits):
 
         if self._hide_invalid is True:
             self._widget.tooltips = [
-                new_tooltips[i]
-                for i, opt in enumerate(self._options)
-                if self._options_validities[opt] is True
+                new_tooltips[i] for i in self._options_validities.valid_indices()
             ]
         else:
             self._widget.tooltips = new_tooltips
 
     def get_first_valid_option(self):
         """Returns the first valid value from the list of options of this ConfigVar instance."""
-        for opt in self._options:
-            if self._options_validities[opt] is True:
+        if self._options_validities.all_evaluated():
+            if (opt := self._options_validities.first_valid()) is not None:
                 return opt
+        else:
+            for opt, validity in self.iter_options_validities():
+                if validity is True:
+                    return opt
+        if self.options_pending:
+            self.complete_options()
+            return self.get_first_valid_option()
         return None
 
     @property
@@ -409,14 +668,21 @@ class ConfigVar(HasTraits):
 
     @property
     def widget(self):
-        """Returns a reference of the widget instance."""
+        """Returns a reference of the widget instance. If a widget factory is set, the widget
+        is constructed upon first access, replacing the DummyWidget instance."""
+        if self._widget_factory is not None:
+            self.widget = self._widget_factory()  # the setter also discards the factory
         return self._widget
 
     @widget.setter
     def widget(self, new_widget):
         """The user can view and change the value of this variable through the (GUI) widget."""
+        self._widget_factory = None
         old_widget = self._widget
         self._widget = new_widget
+        if self._lazy_validities and hasattr(new_widget, "options_resolver"):
+            # Let the widget request the validities of the options it is about to display.
+            new_widget.options_resolver = self._resolve_widget_options
         if self.has_options():
             self._widget.options = old_widget.options
             self._widget.tooltips = old_widget.tooltips
@@ -434,6 +700,26 @@ class ConfigVar(HasTraits):
             type="change",
         )
 
+    @property
+    def widget_factory(self):
+        """Returns the function to construct the widget, if the widget is not constructed yet."""
+        return self._widget_factory
+
+    @widget_factory.setter
+    def widget_factory(self, new_widget_factory):
+        """Set a function returning the widget of this variable. The function is called when the
+        widget is first accessed, e.g., when the widget of the stage containing this variable gets
+        constructed. Until then, the variable retains its DummyWidget instance, and the current
+        options and value are transferred to the actual widget once constructed.
+
+        Parameters
+        ----------
+        new_widget_factory : callable
+            A function that takes no arguments and returns the widget.
+        """
+        assert callable(new_widget_factory), "widget_factory must be callable"
+        self._widget_factory = new_widget_factory
+
     @validate("value")
     def _validate_value(self, proposal):
         """This method is called automatially to verify that the new value is valid.
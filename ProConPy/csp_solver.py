@@ -1,11 +1,13 @@
 import logging
 from collections import deque
+from contextlib import contextmanager
 from z3 import Solver, Optimize, sat, unsat, Or
 from z3 import BoolRef, Int
 from z3 import z3util
 
 from ProConPy.dev_utils import ConstraintViolation
 from ProConPy.csp_utils import TraversalLock
+from ProConPy.options_spec import OptionsStream
 from ProConPy.out_handler import handler as owh
 
 logger = logging.getLogger(f"  {__name__.split('.')[-1]}")
@@ -32,6 +34,19 @@ class CspSolver:
         self._checked_assignment = None
         # ^ A record of the current assignment being processed. This is used
         # as a hand-shake mechanism between check_assignment and register_assignment.
+        self._checked_options = None
+        # ^ The options and tooltips of dependent vars determined while checking the latest
+        # assignment of an infinite-domain var, to be carried over to its registration.
+        self._component = {}
+        # ^ Maps each variable to a representative variable of its connected component in the
+        # (undirected) constraint graph.
+        self._component_epochs = {}
+        self._own_epochs = {}
+        self._stage_epoch = 0
+        # ^ Counters of the changes in the assertions, used to determine whether the options
+        # validities of a variable may have changed. See validity_context.
+        self._batch = None
+        # ^ The state of the batch assignment in progress, if any. See batch.
 
     @owh.out.capture()
     def proceed(self):
@@ -49,6 +64,7 @@ class CspSolver:
         # Clean the current assignment and options assertions for the next stage
         self._assignment_assertions = {}
         self._options_assertions = {}
+        self._stage_epoch += 1
 
         # Finally, refresh the solver
         self._refresh_solver()
@@ -61,6 +77,7 @@ class CspSolver:
         logger.debug("Reverting the CSP solver...")
         self._assignment_assertions = self._past_assignment_assertions.pop()
         self._options_assertions = self._past_options_assertions.pop()
+        self._stage_epoch += 1
         self._refresh_solver()
 
     def _refresh_solver(self):
@@ -231,6 +248,15 @@ class CspSolver:
         # constraint graph
         self._cgraph = {var: set() for var in cvars.values()}
 
+        # union-find forest to determine the connected components of the constraint graph
+        parent = {var: var for var in cvars.values()}
+
+        def find(var):
+            while parent[var] is not var:
+                parent[var] = parent[parent[var]]
+                var = parent[var]
+            return var
+
         warn = (
             "The relational_constraints must be a dictionary where keys are the z3 boolean expressions "
             "corresponding to the constraints and values are error messages to be displayed when "
@@ -261,6 +287,44 @@ class CspSolver:
                     )
                 )
 
+            root = find(next(iter(constr_vars)))
+            for var in constr_vars:
+                parent[find(var)] = root
+
+        self._component = {var: find(var) for var in cvars.values()}
+
+    def _bump_epoch(self, var):
+        """Record a change in the assignment or options assertion of the given variable."""
+        root = self._component.get(var, var)
+        self._component_epochs[root] = self._component_epochs.get(root, 0) + 1
+        self._own_epochs[var] = self._own_epochs.get(var, 0) + 1
+
+    def validity_context(self, var):
+        """Return a token identifying the state of the assertions that the options validities of
+        the given variable depend on. Since the assertions are kept satisfiable (see
+        check_assignment), only the variables in the same connected component of the constraint
+        graph can affect the validities of a variable, and the variable's own assignment
+        and options assertions are excluded when its validities are determined. So, the token
+        changes when the stage changes or when the assertion of another variable in the same
+        component changes. If two calls return the same token, the options validities of the
+        variable are guaranteed to be the same.
+
+        Parameters
+        ----------
+        var : ConfigVar
+            The variable whose validity context is to be returned.
+
+        Returns
+        -------
+        tuple
+            A hashable token identifying the validity context of the variable.
+        """
+        root = self._component.get(var, var)
+        return (
+            self._stage_epoch,
+            self._component_epochs.get(root, 0) - self._own_epochs.get(var, 0),
+        )
+
     @property
     def initialized(self):
         """Return True if the CSP solver is initialized."""
@@ -299,8 +363,15 @@ class CspSolver:
         ), "A check/register cycle is in progress."
         assert new_value is not None, "None is always a valid assignment."
 
+        # Make sure the options list is complete if the options are being streamed
+        var.complete_options()
+
         # Depending on the domain of the variable, check the assignment
-        if var.has_options():
+        if self._batch is not None:
+            # Within a batch, only check that the value is an option. The validity of the
+            # combined assignment is checked when the batch is committed.
+            self._check_batch_assignment(var, new_value)
+        elif var.has_options():
             self._check_assignment_of_finite_domain_var(var, new_value)
         else:
             self._check_assignment_of_infinite_domain_var(var, new_value)
@@ -308,21 +379,40 @@ class CspSolver:
         # Record the currently checked assignment for registration
         self._checked_assignment = (var, new_value)
 
+    def _check_batch_assignment(self, var, new_value):
+        """Check that the new value of a variable assigned within a batch is among its options.
+        If the options of the variable depend on variables assigned earlier in the batch, the
+        check is deferred to the commit, since the options are yet to be updated."""
+        if not var.has_options():
+            return
+        if var._options_spec is not None and any(
+            arg in self._batch["touched"] for arg in var._options_spec.args
+        ):
+            return
+        new_values = (
+            [new_value]
+            if var._value_delimiter is None
+            else new_value.split(var._value_delimiter)
+        )
+        for new_val in new_values:
+            if new_val not in var.options:
+                raise ConstraintViolation(f"{new_val} not an option for {var}")
+
     def _check_assignment_of_finite_domain_var(self, var, new_value):
         """Check the assignment of a variable with a finite domain to a new value. The check
         is simply done by looking up the validity of the new value in the options_validities
-        of the variable.  This method is called by check_assignment when the variable being
-        assigned has options."""
+        of the variable (after evaluating it, if the variable has lazy validities). This method
+        is called by check_assignment when the variable being assigned has options."""
 
         if var._value_delimiter is None:
-            if (validity := var._options_validities.get(new_value)) is False:
+            if (validity := var.option_validity(new_value)) is False:
                 raise ConstraintViolation(self.retrieve_error_msg(var, new_value))
             if validity is None:
                 raise ConstraintViolation(f"{new_value} not an option for {var}")
         else:
             new_values = new_value.split(var._value_delimiter)
             for new_val in new_values:
-                if (validity := var._options_validities.get(new_val)) is False:
+                if (validity := var.option_validity(new_val)) is False:
                     raise ConstraintViolation(self.retrieve_error_msg(var, new_val))
                 if validity is None:
                     raise ConstraintViolation(f"{new_val} not an option for {var}")
@@ -352,21 +442,30 @@ class CspSolver:
             # Now, remove old assignment assertion for good. This is to make sure that no conflict occurs
             # with the new assignment assertion when the new options_spec are called and they themselves call
             # csp methods, e.g., check_assignments, that rely on self._assignment_assertions.
-            self._assignment_assertions.pop(var, None)
+            if self._assignment_assertions.pop(var, None) is not None:
+                self._bump_epoch(var)
 
             # determine new options for dependent variables and temporarily apply the options assertions
             new_options_and_tooltips = {}
+            streams = {}
             for dependent_var in var._dependent_vars:
-                new_options, new_tooltips = dependent_var._options_spec()
+                # var.value is not set yet, so the options specs are called with new_value instead
+                new_options, new_tooltips = dependent_var._options_spec({var: new_value})
+                if isinstance(new_options, OptionsStream):
+                    # Only the first page is read here, so that the remaining options are still
+                    # streamed once the assignment is registered.
+                    if not new_options.options:
+                        new_options.next_page()
+                    streams[dependent_var] = new_options
+                elif new_options is not None:
+                    s.add(Or([dependent_var == opt for opt in new_options]))
 
                 new_options_and_tooltips[dependent_var] = (
                     new_options,
                     new_tooltips,
                 )
-                if new_options is not None:
-                    s.add(Or([dependent_var == opt for opt in new_options]))
 
-            if s.check() == unsat:
+            if not self._streamed_options_feasible(s, streams):
                 # The new value for the variable being assigned led to infeasible options for dependent variables.
                 # Set variable value to None, and raise an exception.
                 var.value = None
@@ -375,6 +474,27 @@ class CspSolver:
                     "Please reset or revise your selections."
                 )
 
+        # Carry the new options over to register_assignment, so the options specs are called once.
+        self._checked_options = (var, new_value, new_options_and_tooltips)
+
+    @staticmethod
+    def _streamed_options_feasible(s, streams):
+        """Check if the assertions of the given solver are satisfiable along with the options of
+        the given variables (keys) being streamed (values). Since the options read so far are a
+        subset of all options, their feasibility suffices. Otherwise, the streams are read in full.
+        """
+        with s:
+            for var, stream in streams.items():
+                s.add(Or([var == opt for opt in stream.options]))
+            if s.check() == sat:
+                return True
+        if all(stream.exhausted for stream in streams.values()):
+            return False
+        for var, stream in streams.items():
+            stream.drain()
+            s.add(Or([var == opt for opt in stream.options]))
+        return s.check() == sat
+
     def check_expression(self, expr):
         """Check if the given z3 BoolRef expression is satisfiable.
 
@@ -404,7 +524,7 @@ class CspSolver:
             )  # todo: this may not be necessary because options assertions are for variables of future stages
             return s.check(expr) == sat
 
-    def retrieve_error_msg(self, var, new_value):
+    def retrieve_error_msg(self, var, new_value, assumptions=None):
         """Retrieve an error message for the given assignment of the given variable to the given
         value. The error message is retrieved by applying the assignment assertions and the options
         assertions to the solver and then retrieving the unsatisfiable core of the solver.
@@ -415,6 +535,9 @@ class CspSolver:
             The variable being assigned.
         new_value : any
             The new value of the variable.
+        assumptions : dict, optional
+            Other assignments (ConfigVar -> value) to assume, e.g., those made earlier in a batch.
+            These override the current assignment assertions of the respective variables.
 
         Returns
         -------
@@ -437,8 +560,10 @@ class CspSolver:
             for stage in self._past_options_assertions:
                 s.add(list(stage.values()))
             # apply current assertions
-            self.apply_assignment_assertions(s, exclude_var=var)
+            assumptions = assumptions or {}
+            self.apply_assignment_assertions(s, exclude_vars={var, *assumptions})
             self.apply_options_assertions(s)
+            s.add([other == value for other, value in assumptions.items()])
             s.add(var == new_value)
 
             # apply relational constraints
@@ -488,6 +613,17 @@ class CspSolver:
             # Handshake complete. Reset the checked assignment:
             self._checked_assignment = None
 
+        if self._batch is not None:
+            # Within a batch, only record the assignment. Propagation is deferred to the commit.
+            self._batch["touched"][var] = None
+            if self._cgraph[var] or var.is_guard_var:
+                if new_value is not None:
+                    self._assignment_assertions[var] = var == new_value
+                else:
+                    self._assignment_assertions.pop(var, None)
+                self._bump_epoch(var)
+            return
+
         if not (var.has_dependent_vars() or self._cgraph[var] or var.is_guard_var):
             logger.debug("%s has no dependent or related variables. Returning.", var)
             return
@@ -505,9 +641,15 @@ class CspSolver:
                     self._assignment_assertions[var] = var == new_value
                 else:
                     self._assignment_assertions.pop(var, None)
+                self._bump_epoch(var)
 
-            # Update the options of the dependent variables
-            self._update_options_of_dependent_vars(var, new_value)
+            # Update the options of the dependent variables, reusing those determined when the
+            # assignment was checked, if any.
+            checked_options, self._checked_options = self._checked_options, None
+            if checked_options is not None and checked_options[:2] == (var, new_value):
+                self._set_options_of_dependent_vars(checked_options[2])
+            else:
+                self._update_options_of_dependent_vars(var, new_value)
 
             # refresh the options validities of affected variables
             self._refresh_options_validities(var)
@@ -515,6 +657,199 @@ class CspSolver:
             # record the assignment
             self._assignment_history.append((var, new_value))
 
+    @property
+    def batch_in_progress(self):
+        """True if a batch assignment is in progress. See batch."""
+        return self._batch is not None
+
+    @contextmanager
+    def batch(self):
+        """A context manager to assign multiple variables as a single transaction. Within the
+        context, each assignment is only checked against the options of the variable being
+        assigned, and the propagation of the assignments is deferred. When the context is exited,
+        the combined assignment is checked with a single solver check, the options specs of the
+        dependent variables are called once per dependent variable, and the options validities of
+        the affected variables are refreshed in a single traversal of the constraint graph. If the
+        combined assignment is invalid, or if an exception is raised within the context, all of
+        the assignments are rolled back and the exception is re-raised. Nested batches are merged
+        into the outermost one.
+
+        Example
+        -------
+        >>> with csp.batch():
+        ...     cvars["COMP_ATM"].value = "cam"
+        ...     cvars["COMP_LND"].value = "clm"
+
+        Raises
+        ------
+        ConstraintViolation : If the combined assignment is invalid.
+        """
+
+        if self._batch is not None:
+            yield  # nested batch: merged into the outer one
+            return
+
+        assert self._initialized, "Must finalize initialization to assign variables in batch."
+        assert (
+            not self._tlock.is_locked()
+        ), "Traversal lock is acquired. Cannot start a batch assignment."
+
+        self._batch = {
+            "old_values": {var: var.value for var in self._cgraph},
+            "old_assignment_assertions": dict(self._assignment_assertions),
+            "touched": {},  # variables assigned within the batch, in the order of assignment
+            "old_options": None,  # options of the dependent variables, recorded before propagation
+            "callbacks": {},  # callbacks deferred until the end of the batch, see call_after_batch
+        }
+        try:
+            yield
+            self._commit_batch()
+        except BaseException:
+            self._rollback_batch()
+            raise
+        finally:
+            callbacks = self._batch["callbacks"]
+            self._batch = None
+            for func, args in callbacks:
+                func(*args)
+
+    def call_after_batch(self, func, *args):
+        """Call the given function with the given arguments after the batch assignment in
+        progress ends, or right away if no batch assignment is in progress. Repeated requests for
+        the same call within a batch are merged into one."""
+        if self._batch is None:
+            func(*args)
+        else:
+            self._batch["callbacks"][(func, args)] = None
+
+    def _commit_batch(self):
+        """Check the combined assignment of the batch in progress and propagate it.
+
+        Raises
+        ------
+        ConstraintViolation : If the combined assignment is invalid or it leads to infeasible
+            options for the dependent variables.
+        """
+        old_values = self._batch["old_values"]
+        assigned_vars = [
+            var for var in self._batch["touched"] if var.value != old_values[var]
+        ]
+        if not assigned_vars:
+            return
+        assigned_set = set(assigned_vars)
+
+        logger.debug("Committing batch assignment of %s.", assigned_vars)
+
+        dependent_vars = list(
+            dict.fromkeys(dep for var in assigned_vars for dep in var._dependent_vars)
+        )
+
+        single_valued, multi_valued = {}, {}
+        for var in assigned_vars:
+            if var.value is None:
+                continue
+            if var._value_delimiter is not None and var._value_delimiter in var.value:
+                multi_valued[var] = var.value.split(var._value_delimiter)
+            else:
+                single_valued[var] = var.value
+
+        with self._solver as s:
+
+            # apply all the assignments at current stage except for those of the batch and all
+            # current options assertions except for those of the assigned and dependent variables.
+            self.apply_assignment_assertions(s, exclude_vars=assigned_vars)
+            self.apply_options_assertions(s, exclude_vars={*assigned_set, *dependent_vars})
+
+            # check the combined assignment
+            s.add([var == value for var, value in single_valued.items()])
+            if s.check() == unsat:
+                raise ConstraintViolation(self._retrieve_batch_error_msg(single_valued))
+            for var, values in multi_valued.items():
+                for value in values:
+                    if s.check(var == value) == unsat:
+                        raise ConstraintViolation(
+                            self.retrieve_error_msg(var, value, single_valued)
+                        )
+
+            # determine new options for dependent variables, calling each options spec once.
+            new_options_and_tooltips = {}
+            check_feasibility = False
+            for dependent_var in dependent_vars:
+                args = [arg for arg in dependent_var._options_spec.args if arg in assigned_set]
+                if any(arg.value is None for arg in args):
+                    new_options_and_tooltips[dependent_var] = (None, None)
+                    continue
+                new_options, new_tooltips = dependent_var._options_spec()
+                if isinstance(new_options, OptionsStream):
+                    new_options.drain()
+                    new_options, new_tooltips = new_options.options, new_options.tooltips
+                new_options_and_tooltips[dependent_var] = (new_options, new_tooltips)
+                # As in check_assignment, the options of variables that depend on a variable with
+                # an infinite domain must remain feasible.
+                if new_options is not None and any(not arg.has_options() for arg in args):
+                    s.add(Or([dependent_var == opt for opt in new_options]))
+                    check_feasibility = True
+
+            # the values assigned to dependent variables within the batch must be among their new options
+            for dependent_var, (new_options, _) in new_options_and_tooltips.items():
+                if dependent_var not in single_valued and dependent_var not in multi_valued:
+                    continue
+                for value in multi_valued.get(dependent_var, [dependent_var.value]):
+                    if new_options and value not in new_options:
+                        raise ConstraintViolation(f"{value} not an option for {dependent_var}")
+
+            if check_feasibility and s.check() == unsat:
+                raise ConstraintViolation(
+                    f"Your current configuration settings have created infeasible options for future settings. "
+                    "Please reset or revise your selections."
+                )
+
+        # Propagate the combined assignment
+        self._batch["old_options"] = {
+            dependent_var: (dependent_var.options, dependent_var._widget.tooltips)
+            for dependent_var in new_options_and_tooltips
+        }
+        with self._tlock:
+            self._set_options_of_dependent_vars(new_options_and_tooltips)
+            self._refresh_options_validities(*assigned_vars)
+            self._assignment_history.extend((var, var.value) for var in assigned_vars)
+
+    def _retrieve_batch_error_msg(self, assignments):
+        """Retrieve an error message for an invalid combined assignment by determining the first
+        assignment that is invalid given the preceding ones."""
+        with self._solver as s:
+            self.apply_assignment_assertions(s, exclude_vars=assignments)
+            self.apply_options_assertions(s, exclude_vars=assignments)
+            preceding = {}
+            for var, value in assignments.items():
+                if s.check(var == value) == unsat:
+                    return self.retrieve_error_msg(var, value, preceding)
+                s.add(var == value)
+                preceding[var] = value
+        return "Invalid combined assignment."
+
+    def _rollback_batch(self):
+        """Restore the values and assignment assertions of the variables assigned within the
+        batch in progress. If the batch has already been (partially) propagated, also restore the
+        options of the dependent variables and refresh the options validities."""
+        logger.debug("Rolling back batch assignment.")
+        old_values = self._batch["old_values"]
+        old_options = self._batch["old_options"]
+        # Restore the options first so that the old values are among the options again. Doing so
+        # may reset the values of the dependent variables, which are then restored below.
+        for dependent_var, (options, tooltips) in (old_options or {}).items():
+            dependent_var.options = options
+            dependent_var._widget.tooltips = tooltips
+        for var in reversed(list(self._batch["touched"])):
+            if var.value != old_values[var]:
+                var.value = old_values[var]
+        self._assignment_assertions = self._batch["old_assignment_assertions"]
+        for var in self._batch["touched"]:
+            self._bump_epoch(var)
+        if old_options is not None:
+            with self._tlock:
+                self._refresh_options_validities(*self._batch["touched"])
+
     @staticmethod
     def _update_options_of_dependent_vars(var, new_value):
         """Update the options of variables in new_options_and_tooltips. This method is called
@@ -542,36 +877,56 @@ class CspSolver:
                     new_options,
                     new_tooltips,
                 )
-            # Note: For variables with infinite domain, the options_spec methods are called both
-            # within check_assignment and register_assignment. This doesn't appear to lead to
-            # noticeable performance issues, but it may be worth revisiting in the future.
 
+        CspSolver._set_options_of_dependent_vars(new_options_and_tooltips)
+
+    @staticmethod
+    def _set_options_of_dependent_vars(new_options_and_tooltips):
+        """Set the new options and tooltips of dependent variables.
+
+        Parameters
+        ----------
+        new_options_and_tooltips : dict
+            A dictionary where the keys are the dependent variables and the values are tuples of
+            new options (or OptionsStream instances, or None) and new tooltips.
+        """
         for dependent_var, (
             new_options,
             new_tooltips,
         ) in new_options_and_tooltips.items():
-            if new_options is not None:
+            if isinstance(new_options, OptionsStream):
+                dependent_var.stream_options(new_options)
+            elif new_options is not None:
                 dependent_var.options = new_options
                 dependent_var.tooltips = new_tooltips
             else:
                 dependent_var.options = []
                 dependent_var.tooltips = []
 
-    def _refresh_options_validities(self, var):
+    def _refresh_options_validities(self, *assigned_vars):
         """Traverse the constraint graph to refresh the options validities of all possibly affected
-        variables by the assignment of the given variable.
+        variables by the assignment of the given variable(s).
 
         Parameters
         ----------
-        var : ConfigVar
-            The variable whose assignment triggers the refresh of the options validities of other variables.
+        *assigned_vars : ConfigVar
+            The variable(s) whose assignment triggers the refresh of the options validities of other
+            variables. Multiple variables are passed when a batch assignment is committed, in which
+            case the affected variables are refreshed in a single, merged traversal.
         """
 
         # Queue of variables to be visited
-        queue = deque([neig for neig in self._cgraph[var] if neig.has_options()])
+        queue = deque(
+            dict.fromkeys(
+                neig
+                for var in assigned_vars
+                for neig in self._cgraph[var]
+                if neig.has_options()
+            )
+        )
 
         # Set of all variables that have been queued
-        queued = {var} | set(queue)
+        queued = set(assigned_vars) | set(queue)
 
         # Traverse the constraint graph to refresh the options validities of all possibly affected variables
         while queue:
@@ -658,8 +1013,23 @@ class CspSolver:
             self._options_assertions[var] = Or([var == opt for opt in new_options])
         else:
             self._options_assertions.pop(var, None)
+        self._bump_epoch(var)
+
+    def register_streamed_options(self, var):
+        """Register the options of the given variable once its options stream is exhausted, and
+        refresh the options validities of variables related to it. (While the options of a variable
+        are being streamed, no options assertion is registered for it.)
+
+        Parameters
+        ----------
+        var : ConfigVar
+            The variable whose options stream has been exhausted.
+        """
+        self.register_options(var, var.options)
+        with self._tlock:
+            self._refresh_options_validities(var)
 
-    def get_options_validities(self, var):
+    def get_options_validities(self, var, options=None):
         """Get the validities of the options of the given variable. The validities are determined
         by checking the satisfiability of the assignment assertions with the variable being assigned
         to each of its options. The validities are returned as a dictionary with the options as keys
@@ -669,6 +1039,8 @@ class CspSolver:
         ----------
         var : ConfigVar
             The variable whose options are to be checked for validity.
+        options : list, optional
+            The subset of options to check. If None, all options of the variable are checked.
 
         Returns
         -------
@@ -680,7 +1052,8 @@ class CspSolver:
             self.apply_options_assertions(
                 s, exclude_vars=[var]
             )  # todo: this may not be necessary because options assertions are for variables of future stages
-            new_validities = {opt: s.check(var == opt) == sat for opt in var._options}
+            options = var._options if options is None else options
+            new_validities = {opt: s.check(var == opt) == sat for opt in options}
         return new_validities
 
 
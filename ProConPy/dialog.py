@@ -1,7 +1,18 @@
-"""A module consisting of functions to display error and warning messages."""
+"""A module consisting of functions to display error and warning messages. When the GUI is not
+displayed, i.e., when running headless, the messages are logged instead."""
 
-# TODO: this is a ProConPy module and so should not have IPython (Jupyter) dependency
-from IPython.display import display, HTML
+import logging
+
+from ProConPy.out_handler import handler as owh
+
+logger = logging.getLogger(f"  {__name__.split('.')[-1]}")
+
+
+def _display_js(js):
+    """Display the given javascript in the notebook frontend."""
+    from IPython.display import display, HTML
+
+    display(HTML(js))
 
 
 def alert_info(msg):
@@ -13,8 +24,11 @@ def alert_info(msg):
         Info message to be displayed
     """
 
+    if owh.headless:
+        logger.info(msg)
+        return
     js = f"""<script>alert("INFO: {msg} ");</script>"""
-    display(HTML(js))
+    _display_js(js)
 
 
 def alert_warning(msg):
@@ -26,8 +40,11 @@ def alert_warning(msg):
         Warning message to be displayed
     """
 
+    if owh.headless:
+        logger.warning(msg)
+        return
     js = f"""<script>alert("WARNING: {msg} ");</script>"""
-    display(HTML(js))
+    _display_js(js)
 
 
 def alert_error(msg):
@@ -39,5 +56,8 @@ def alert_error(msg):
         Error message to be displayed
     """
 
+    if owh.headless:
+        logger.error(msg)
+        return
     js = f"<script>alert('ERROR: {msg}');</script>"
-    display(HTML(js))
+    _display_js(js)
@@ -40,3 +40,17 @@ class DummyLayout:
 
     def __init__(self):
         self.visibility = "hidden"
+
+
+class DummyStageWidget:
+    """A placeholder for the widget of a Stage when no GUI is displayed, e.g., when stages are
+    traversed headless. It implements only the methods that Stage calls on its widget."""
+
+    def __init__(self):
+        self.stage = None  # To be set by the stage object.
+
+    def add_child_stages(self, first_child=None):
+        pass
+
+    def remove_child_stages(self):
+        pass
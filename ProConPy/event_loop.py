@@ -0,0 +1,13 @@
+"""Event loop utilities. Kept free of heavy dependencies, e.g., z3 and ipywidgets, so that they
+can be imported by any module, including the logging output handler."""
+
+import asyncio
+
+
+def running_event_loop():
+    """Return the running asyncio event loop, e.g., that of the Jupyter kernel, or None if
+    there is no running event loop, e.g., when running scripts or tests."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -1,11 +1,9 @@
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import networkx as nx
 from ProConPy.config_var import ConfigVar
 from z3 import BoolRef
 
 def hgraph_to_nxgraph(hgraph):
     """Convert a given hypergraph to a networkx graph."""
+    import networkx as nx
 
     nxgraph = nx.DiGraph()
 
@@ -23,6 +21,7 @@ def hgraph_to_nxgraph(hgraph):
 def plot_nxgraph(hgraph):
 
     """Plot the hypergraph using networkx and matplotlib."""
+    import matplotlib.pyplot as plt
     
     nxgraph = hgraph_to_nxgraph(hgraph)
 
@@ -1,5 +1,64 @@
+from collections import OrderedDict
+from itertools import islice
 from z3 import BoolRef
-from inspect import signature
+from inspect import signature, isgenerator
+
+
+class OptionsStream:
+    """An iterator of (option, tooltip) pairs returned by an options function, e.g., a generator,
+    to be consumed one page at a time. This allows a ConfigVar to publish the first page of a very
+    large options list immediately, and to append the remaining pages later on."""
+
+    def __init__(self, pairs, page_size):
+        """
+        Parameters
+        ----------
+        pairs : iterator
+            Iterator of (option, tooltip) pairs.
+        page_size : int
+            Number of options to consume per page.
+        """
+        self._pairs = pairs
+        self._page_size = page_size
+        self._exhausted = False
+        self._options = []
+        self._tooltips = []
+
+    @property
+    def exhausted(self):
+        """True if all the options have been consumed."""
+        return self._exhausted
+
+    @property
+    def options(self):
+        """The list of all options consumed so far."""
+        return self._options
+
+    @property
+    def tooltips(self):
+        """The list of tooltips of all options consumed so far."""
+        return self._tooltips
+
+    def _consume(self, pairs):
+        options = [option for option, _ in pairs]
+        tooltips = [tooltip for _, tooltip in pairs]
+        self._options.extend(options)
+        self._tooltips.extend(tooltips)
+        return options, tooltips
+
+    def next_page(self):
+        """Consume and return the next page of options and tooltips."""
+        pairs = list(islice(self._pairs, self._page_size))
+        if len(pairs) < self._page_size:
+            self._exhausted = True
+        return self._consume(pairs)
+
+    def drain(self):
+        """Consume and return all the remaining options and tooltips."""
+        pairs = list(self._pairs)
+        self._exhausted = True
+        return self._consume(pairs)
+
 
 class OptionsSpec:
 
@@ -8,6 +67,9 @@ class OptionsSpec:
         func,
         args = None,
         static_options_expr = None,
+        pure = False,
+        cache_size = 32,
+        page_size = 16,
     ):
         """
         OptionsSpec is a class to specify the options and tooltips of a config_var.
@@ -16,7 +78,9 @@ class OptionsSpec:
         ----------
         func : callable
             function to get options and tooltips. The function must return a tuple of two lists.
-            The first list is the options, and the second list is the tooltips.
+            The first list is the options, and the second list is the tooltips. Alternatively, for
+            very large option domains, the function may return a generator of (option, tooltip)
+            pairs, in which case the options are published in pages (see OptionsStream).
         args : list of configvars
             arguments to pass to func. All arguments must be config_vars. Each time one of these config_vars
             changes, func will be called with the values of these config_vars as arguments.
@@ -26,6 +90,17 @@ class OptionsSpec:
             developrs must ensure that this expression is consistent with the options returned by func. This is 
             used to ensure that the options constraints are properly accounted for when doing static analysis.
             (n dynamic mode, the optinons constraints are automatically set. )
+        pure : bool
+            If True, func is declared to be pure, i.e., its return value depends only on the values of
+            args and not on any other ConfigVar values or the state of the CSP solver. The options and
+            tooltips of a pure OptionsSpec are cached for each tuple of argument values, so func is not
+            re-invoked when the same argument values are encountered again, e.g., when the user
+            goes back and forth between stages.
+        cache_size : int
+            Maximum number of cached (options, tooltips) results. Only applicable if pure is True.
+            When exceeded, the least recently used result is evicted. Generator results are not cached.
+        page_size : int
+            Number of options per page when func returns a generator.
         """
 
         assert callable(func), "func must be callable"
@@ -34,6 +109,7 @@ class OptionsSpec:
         if len(signature(self._func).parameters) > 0:
             assert args is not None, "Must provide args if func has arguments."
 
+        self._args = ()
         if args is not None:
             assert isinstance(args, (list, tuple)), "args must be a list or tuple"
             assert len(signature(self._func).parameters) == len(args), "func must have the same number of arguments as args"
@@ -43,15 +119,55 @@ class OptionsSpec:
             #todo     "This ensures that the options constraints are properly accounted for when doing static analysis."
             #todo assert isinstance(static_options_expr, BoolRef), "static_options_expr must be a z3.BoolRef."
             #todo self._static_options_constraint = static_options_expr
-        
 
-    def __call__(self):
-        """ Call the function with the current values of the arguments"""
+        assert isinstance(cache_size, int) and cache_size > 0, "cache_size must be a positive integer"
+        self._pure = pure
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
 
-        if any([arg.value is None for arg in self._args]):
+        assert isinstance(page_size, int) and page_size > 0, "page_size must be a positive integer"
+        self._page_size = page_size
+
+    @property
+    def args(self):
+        """The ConfigVars whose values are passed to func."""
+        return self._args
+
+    @property
+    def pure(self):
+        """True if func is declared to depend only on the values of args."""
+        return self._pure
+
+    def clear_cache(self):
+        """Drop all cached options and tooltips."""
+        self._cache.clear()
+
+    def __call__(self, overrides=None):
+        """ Call the function with the current values of the arguments
+
+        Parameters
+        ----------
+        overrides : dict, optional
+            Values to use in place of the current values of some of the arguments, e.g., the
+            value of an argument whose assignment is being checked, i.e., not set yet.
+        """
+
+        overrides = {} if overrides is None else overrides
+        arg_values = tuple(overrides.get(arg, arg.value) for arg in self._args)
+
+        if any([arg_value is None for arg_value in arg_values]):
             return None, None
 
-        options, tooltips = self._func(*[arg.value for arg in self._args])
+        if self._pure and arg_values in self._cache:
+            self._cache.move_to_end(arg_values)
+            return self._cache[arg_values]
+
+        result = self._func(*arg_values)
+
+        if isgenerator(result):
+            return OptionsStream(result, self._page_size), None
+
+        options, tooltips = result
 
         # options must be a list of tuple
         if options is not None:
@@ -62,6 +178,11 @@ class OptionsSpec:
                 #todo:uncomment assert len(options) == len(tooltips), "options and tooltips must have the same length"
         else:
             assert tooltips is None, "options must be None if tooltips is None"
-        
+
+        if self._pure:
+            self._cache[arg_values] = (options, tooltips)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
         return options, tooltips
         
@@ -0,0 +1,159 @@
+from collections.abc import MutableMapping
+
+
+class OptionsValidities(MutableMapping):
+    """Validities of the options of a ConfigVar, stored compactly as two bitsets over a shared
+    list of options: one for the validities, and one for whether the validities have been
+    evaluated yet (see ConfigVar lazy_validities). Bit i corresponds to the i-th option.
+
+    An OptionsValidities instance behaves like a dict mapping options to True, False, or None
+    (not evaluated yet). In addition, it supports bitwise operations that avoid iterating over
+    all options in Python, e.g., comparing, counting, and listing valid options. Instances
+    derived from one another via with_validities() share the same options list and index map.
+    """
+
+    def __init__(self, options=(), validities=None, _index=None):
+        """
+        Parameters
+        ----------
+        options : iterable
+            The options. Must be unique and hashable.
+        validities : dict, optional
+            Mapping of (some of the) options to their validities. Options missing from this
+            mapping are marked as not evaluated.
+        """
+        if _index is None:
+            self._options = list(options)
+            self._index = {opt: i for i, opt in enumerate(self._options)}
+        else:
+            self._options, self._index = options, _index
+        # A duplicate option would silently share the validity bit of its first occurrence.
+        assert len(self._index) == len(self._options), "Options must be unique."
+        self._valid = 0
+        self._evaluated = 0
+        if validities:
+            self.update(validities)
+
+    def with_validities(self, validities=None):
+        """Return a new instance with the same options (sharing the options list and index map)
+        and the given validities."""
+        return OptionsValidities(self._options, validities, _index=self._index)
+
+    def copy(self):
+        """Return a copy of this instance, sharing the options list and index map."""
+        dup = self.with_validities()
+        dup._valid, dup._evaluated = self._valid, self._evaluated
+        return dup
+
+    def extended(self, new_options, validities=None):
+        """Return a new instance with the given options appended. The validities of the existing
+        options are carried over, and those of the new options are set from the given mapping."""
+        ext = OptionsValidities(self._options)
+        ext._valid, ext._evaluated = self._valid, self._evaluated
+        ext.extend(new_options, validities)
+        return ext
+
+    def extend(self, new_options, validities=None):
+        """Append the given options in place, setting their validities from the given mapping.
+        Unlike extended(), this only costs time proportional to the number of new options, but
+        it also extends the options of any instance sharing them (see with_validities())."""
+        start = len(self._options)
+        self._options.extend(new_options)
+        self._index.update(
+            (opt, i) for i, opt in enumerate(self._options[start:], start)
+        )
+        assert len(self._index) == len(self._options), "Options must be unique."
+        if validities:
+            self.update(validities)
+
+    @property
+    def options(self):
+        """The list of options. Must not be modified directly."""
+        return self._options
+
+    def same_options(self, other):
+        """Returns True if the other instance has the same options in the same order."""
+        return self._options is other._options or self._options == other._options
+
+    def __getitem__(self, opt):
+        i = self._index[opt]
+        if not (self._evaluated >> i) & 1:
+            return None
+        return bool((self._valid >> i) & 1)
+
+    def __setitem__(self, opt, validity):
+        bit = 1 << self._index[opt]
+        if validity is None:
+            self._evaluated &= ~bit
+            self._valid &= ~bit
+            return
+        self._evaluated |= bit
+        if validity:
+            self._valid |= bit
+        else:
+            self._valid &= ~bit
+
+    def __delitem__(self, opt):
+        raise TypeError("Options cannot be removed from an OptionsValidities instance.")
+
+    def __contains__(self, opt):
+        return opt in self._index
+
+    def __iter__(self):
+        return iter(self._options)
+
+    def __len__(self):
+        return len(self._options)
+
+    def __eq__(self, other):
+        if isinstance(other, OptionsValidities):
+            return (
+                self._valid == other._valid
+                and self._evaluated == other._evaluated
+                and self.same_options(other)
+            )
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"OptionsValidities({dict(self.items())})"
+
+    @staticmethod
+    def _indices(bits):
+        """Yield the indices of the set bits of the given bitset in increasing order."""
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def all_evaluated(self):
+        """Returns True if the validities of all options have been evaluated."""
+        return self._evaluated == (1 << len(self._options)) - 1
+
+    def is_evaluated(self, opt):
+        """Returns True if the given option's validity has been evaluated."""
+        return bool((self._evaluated >> self._index[opt]) & 1)
+
+    def count_valid(self):
+        """Returns the number of (evaluated) valid options."""
+        return self._valid.bit_count()
+
+    def valid_indices(self):
+        """Yield the indices of the (evaluated) valid options."""
+        return self._indices(self._valid)
+
+    def valid_options(self):
+        """Returns the list of (evaluated) valid options."""
+        return [self._options[i] for i in self._indices(self._valid)]
+
+    def first_valid(self):
+        """Returns the first (evaluated) valid option, or None if there is none."""
+        if self._valid == 0:
+            return None
+        return self._options[(self._valid & -self._valid).bit_length() - 1]
+
+    def changed_indices(self, other):
+        """Yield the indices of the options whose validities differ from those in the other
+        instance, which must have the same options."""
+        return self._indices(
+            (self._valid ^ other._valid) | (self._evaluated ^ other._evaluated)
+        )
@@ -1,37 +1,169 @@
 """ Logging Output Handler Module """
 
 import logging
-import ipywidgets as widgets
+import functools
+import time
+from collections import deque
+
+from ProConPy.event_loop import running_event_loop
 
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = logging.BASIC_FORMAT
+LOG_DATEFMT = "%I:%M:%S"
+
+
+class OutputProxy:
+    """A stand-in for the ipywidgets Output widget that logs and captured outputs are directed to.
+    Until the actual Output widget is created (see OutHandler.widget), which happens only when
+    the GUI is displayed, capture() is a no-op and outputs go to the console. This allows the
+    ProConPy modules to be imported and used headless, i.e., without importing ipywidgets."""
+
+    def __init__(self):
+        self._widget = None
+
+    def capture(self, *capture_args, **capture_kwargs):
+        """Decorator to capture the outputs of the decorated function in the Output widget, if
+        any. Otherwise, the decorated function is called as is."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if self._widget is None:
+                    return func(*args, **kwargs)
+                return self._widget.capture(*capture_args, **capture_kwargs)(func)(
+                    *args, **kwargs
+                )
+
+            return wrapper
+
+        return decorator
+
+    def clear_output(self, *args, **kwargs):
+        """Clear the outputs of the Output widget, if any."""
+        if self._widget is not None:
+            self._widget.clear_output(*args, **kwargs)
+
+    def __enter__(self):
+        if self._widget is not None:
+            self._widget.__enter__()
+
+    def __exit__(self, *args):
+        if self._widget is not None:
+            return self._widget.__exit__(*args)
+
+
+class OutHandler(logging.StreamHandler):
+    """Custom logging handler sending logs to an output widget. Until the output widget is
+    created, i.e., when running headless, logs are sent to the console like a plain StreamHandler.
 
-class OutHandler(logging.Handler):
-    """Custom logging handler sending logs to an output widget"""
+    The most recent records are kept in a bounded ring buffer, and the output widget is updated
+    with the buffer contents at most once per flush interval, as opposed to once per record. The
+    records are formatted only when flushed, and only those that remain in the buffer."""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, max_records=1000, flush_interval=0.5, **kwargs):
+        """
+        Parameters
+        ----------
+        max_records : int, optional
+            The maximum number of (most recent) log records to display.
+        flush_interval : float, optional
+            The minimum time, in seconds, between two consecutive updates of the output widget.
+        """
         super().__init__(*args, **kwargs)
-        layout = {
-            #'width': '100%',
-            #'height': '160px',
-            "border": "1px solid black"
-        }
-        self.out = widgets.Output(layout=layout)
-        logging.basicConfig(level=logging.DEBUG, datefmt="%I:%M:%S")
+        self.out = OutputProxy()
+        self._lines = deque(maxlen=max_records)  # formatted records, oldest first
+        self._pending = deque(maxlen=max_records)  # records yet to be formatted and displayed
+        self._flush_interval = flush_interval
+        self._flush_scheduled = False
+        self._last_flush = 0.0
+        self._console_handler = None
+
+    @property
+    def headless(self):
+        """True if no output widget has been created, e.g., the GUI is not displayed."""
+        return self.out._widget is None
+
+    @property
+    def widget(self):
+        """The Output widget displaying the logs. The widget is created upon first access,
+        which is also when the root logger gets configured for the GUI."""
+        if self.out._widget is None:
+            import ipywidgets as widgets
+
+            layout = {
+                #'width': '100%',
+                #'height': '160px',
+                "border": "1px solid black"
+            }
+            self.out._widget = widgets.Output(layout=layout)
+            self.attach_to_root_logger()
+            self.set_verbosity(verbose=False)
+        return self.out._widget
+
+    def attach_to_root_logger(self):
+        """Attach this handler to the root logger, so that the records of all module loggers,
+        e.g., logging.getLogger("\t" + __name__), are displayed in the output widget."""
+        if self.formatter is None:
+            self.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+        root = logging.getLogger()
+        if self not in root.handlers:
+            root.addHandler(self)
+
+    def attach_console_handler(self):
+        """When running headless, attach a plain StreamHandler, with the same format as the
+        output widget, to the root logger so that the logs are displayed on the console.
+        Otherwise, only the warnings and errors would reach logging.lastResort, unformatted."""
+        if self._console_handler is None:
+            self._console_handler = logging.StreamHandler()
+            self._console_handler.setFormatter(
+                logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT)
+            )
+        root = logging.getLogger()
+        if self._console_handler not in root.handlers:
+            root.addHandler(self._console_handler)
         self.set_verbosity(verbose=False)
 
     def emit(self, record):
         """Overload of logging.Handler method"""
-        formatted_record = self.format(record)
-        new_output = {
-            "name": "stdout",
-            "output_type": "stream",
-            "text": formatted_record + "\n",
-        }
-        self.out.outputs = (new_output,) + self.out.outputs
+        if self.out._widget is None:
+            super().emit(record)
+            return
+        self._pending.append(record)
+        if self._flush_scheduled:
+            return
+        delay = self._last_flush + self._flush_interval - time.monotonic()
+        loop = running_event_loop()
+        if delay <= 0 or loop is None:
+            self.flush()
+        else:
+            self._flush_scheduled = True
+            loop.call_later(delay, self.flush)
+
+    def flush(self):
+        """Overload of logging.Handler method. Display the buffered records in the output
+        widget, the most recent first."""
+        if self.out._widget is None:
+            super().flush()
+            return
+        with self.lock:
+            self._flush_scheduled = False
+            if not self._pending:
+                return
+            self._lines.extend(self.format(record) for record in self._pending)
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+            new_output = {
+                "name": "stdout",
+                "output_type": "stream",
+                "text": "".join(line + "\n" for line in reversed(self._lines)),
+            }
+            self.out._widget.outputs = (new_output,)
 
     def clear_logs(self):
         """Clear the current logs"""
+        self._lines.clear()
+        self._pending.clear()
         self.out.clear_output()
 
     def set_verbosity(self, verbose=False):
@@ -42,14 +174,13 @@ class OutHandler(logging.Handler):
         verbose : bool, optional
             If True, logging level is set to DEBUG.
         """
-        if verbose:
-            logging.getLogger().setLevel(logging.DEBUG)
-        else:
-            logging.getLogger().setLevel(logging.INFO)
+        level = logging.DEBUG if verbose else logging.INFO
+        logging.getLogger().setLevel(level)
+        # Records below the active level are discarded before they are buffered or formatted.
+        self.setLevel(level)
         for module in ["CIME.XML", "CIME.utils", "CIME.config", "Comm"]:
             logger_temp = logging.getLogger(module)
             logger_temp.setLevel(logging.INFO)
 
 
 handler = OutHandler()
-logger.addHandler(handler)
@@ -2,6 +2,7 @@
 parameters, of type ConfigVar, to configure the system."""
 
 import logging
+from itertools import islice
 from z3 import BoolRef
 from traitlets import HasTraits, UseEnum
 
@@ -250,7 +251,9 @@ class Stage(Node, HasTraits):
         description : str
             The description of the stage.
         widget : optional
-            The container widget to display the stage's variables
+            The container widget to display the stage's variables, or a function that takes no
+            arguments and returns the widget. In the latter case, the widget is constructed when
+            the stage is first enabled or displayed (see the widget property).
         varlist : list, optional
             The list of variables to be set in the stage.
         aux_varlist : list, optional
@@ -310,6 +313,10 @@ class Stage(Node, HasTraits):
         self._relevance_condition = relevance_condition
         self._skipped = False  # True when the stage was auto-skipped as irrelevant
 
+        # The widget of the stage, or the function to construct it upon first access
+        self._widget = None
+        self._widget_factory = widget if callable(widget) else None
+
         self._construct_observances()
 
         # Enable the first stage and disable the rest
@@ -319,9 +326,9 @@ class Stage(Node, HasTraits):
         else:
             self._disable()
 
-        # Set the widget of the stage
-        self._widget = widget
-        if self._widget is not None:
+        # Set the widget of the stage, unless it is to be constructed lazily
+        if self._widget_factory is None:
+            self._widget = widget
             self._widget.stage = self
 
     @classmethod
@@ -351,6 +358,23 @@ class Stage(Node, HasTraits):
     def enabled(self):
         return not self._disabled
 
+    @property
+    def widget(self):
+        """The container widget of the stage. If a widget factory was passed at initialization,
+        the widget is constructed upon first access, i.e., when the stage is first enabled or
+        displayed as a child of its parent stage. Until then, no widget of the stage, including
+        those of its variables and supplementary widgets, gets constructed."""
+        self._construct_widget()
+        return self._widget
+
+    def _construct_widget(self):
+        """Construct the widget of the stage if it is deferred and not constructed yet."""
+        if self._widget_factory is not None:
+            logger.debug("Constructing the widget of stage %s.", self._title)
+            self._widget = self._widget_factory()
+            self._widget_factory = None
+            self._widget.stage = self
+
     def _construct_observances(self):
         for var in self._varlist:
             var.observe(
@@ -362,6 +386,10 @@ class Stage(Node, HasTraits):
     def _on_value_change(self, change):
         """This method is called when the value of a ConfigVar in the varlist changes.
         When all the ConfigVars in the varlist are set, the stage is deemed complete."""
+        if csp.batch_in_progress:
+            # Defer the status check until the batch assignment is committed (or rolled back).
+            csp.call_after_batch(self._on_value_change, None)
+            return
         self.refresh_status()
         if self.enabled and self.status == StageStat.COMPLETE:
             logger.debug("Stage <%s> is complete.", self._title)
@@ -373,6 +401,10 @@ class Stage(Node, HasTraits):
         or the right sibling of an ancestor stage (in that order). If no next stage is found, the stage
         tree traversal is complete."""
 
+        # Guarantee that the options lists of the variables of this stage are complete.
+        for var in self._varlist:
+            var.complete_options()
+
         self._disable()
 
         Stage._completed_stages.append(self)
@@ -385,7 +417,7 @@ class Stage(Node, HasTraits):
 
         # Display the child stage and its siblings by appending them to the current stage's widget
         if self.has_children() and next_stage.is_descendant_of(self):
-            self._widget.add_child_stages(first_child=next_stage)
+            self.widget.add_child_stages(first_child=next_stage)
 
         # Proceed the csp solver before enabling the next stage
         csp.proceed()
@@ -521,6 +553,10 @@ class Stage(Node, HasTraits):
         # (Set before refresh_status so the stage widget can suppress display of skipped stages.)
         self._skipped = not self.is_relevant()
 
+        # Construct the (deferred) widget of the stage, unless the stage is to be skipped.
+        if not self._skipped:
+            self._construct_widget()
+
         self.refresh_status()
 
         # if the stage doesn't have any ConfigVars, it is already complete
@@ -606,12 +642,24 @@ class Stage(Node, HasTraits):
         str or None
             The single valid option if it exists, otherwise None.
         """
-        valid_opts = []
-        for opt, validity in var._options_validities.items():
-            if validity is True:
-                valid_opts.append(opt)
-                if len(valid_opts) == 2:
-                    break  # there are more than one valid options. No need to check further.
+
+        def first_two_valid_options():
+            validities = var._options_validities
+            if validities.all_evaluated():
+                return [validities.options[i] for i in islice(validities.valid_indices(), 2)]
+            valid_opts = []
+            for opt, validity in var.iter_options_validities():
+                if validity is True:
+                    valid_opts.append(opt)
+                    if len(valid_opts) == 2:
+                        break  # there are more than one valid options. No need to check further.
+            return valid_opts
+
+        valid_opts = first_two_valid_options()
+        if len(valid_opts) < 2 and var.options_pending:
+            # The options that are yet to be streamed may include further valid options.
+            var.complete_options()
+            valid_opts = first_two_valid_options()
         if len(valid_opts) == 1:
             return valid_opts[0]
         return None
@@ -663,5 +711,5 @@ class Stage(Node, HasTraits):
             logger.info("Reverting to stage %s.", previous_stage._title)
             # If the stage to enable has guards as children, remove them from the widget
             if previous_stage.has_children():
-                previous_stage._widget.remove_child_stages()
+                previous_stage.widget.remove_child_stages()
             previous_stage._enable()
@@ -0,0 +1,141 @@
+"""Unit tests for batch assignments, i.e., assignments of multiple variables that are checked
+and propagated as a single transaction."""
+
+import pytest
+from z3 import Implies
+
+from ProConPy.config_var import ConfigVar, cvars
+from ProConPy.config_var_str import ConfigVarStr
+from ProConPy.options_spec import OptionsSpec
+from ProConPy.stage import Stage
+from ProConPy.csp_solver import csp
+from ProConPy.dev_utils import ConstraintViolation
+from tests.utils import FakeStageWidget
+
+
+def _build():
+    """Build a stage with ATM, OCN, and ICE, followed by a stage with PHYS whose options depend
+    on ATM and OCN. ICE cannot be "cice" if ATM is "datm" and OCN is "docn"."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_atm = ConfigVarStr("ATM")
+    cv_ocn = ConfigVarStr("OCN")
+    cv_ice = ConfigVarStr("ICE")
+    cv_phys = ConfigVarStr("PHYS")
+
+    calls = []
+
+    def phys_options_func(atm, ocn):
+        calls.append((atm, ocn))
+        return [f"{atm}_{ocn}_1", f"{atm}_{ocn}_2"], None
+
+    cv_phys.options_spec = OptionsSpec(func=phys_options_func, args=(cv_atm, cv_ocn))
+
+    relational_constraints = {
+        Implies(cv_atm == "datm", cv_ice != "cice"): "cice requires an active atmosphere",
+        Implies(cv_ocn == "docn", cv_ice != "cice"): "cice requires an active ocean",
+    }
+
+    Stage("Comps", "comps", widget=FakeStageWidget(), varlist=[cv_atm, cv_ocn, cv_ice])
+    Stage("Phys", "phys", widget=FakeStageWidget(), varlist=[cv_phys], parent=Stage.first())
+    csp.initialize(cvars, relational_constraints, Stage.first())
+
+    cv_atm.options = ["cam", "datm"]
+    cv_ocn.options = ["mom", "docn"]
+    cv_ice.options = ["cice", "dice"]
+
+    return cv_atm, cv_ocn, cv_ice, cv_phys, calls
+
+
+def test_batch_propagates_once(monkeypatch):
+    cv_atm, cv_ocn, cv_ice, cv_phys, calls = _build()
+
+    refreshes = []
+    refresh = csp._refresh_options_validities
+    monkeypatch.setattr(
+        csp, "_refresh_options_validities", lambda *vars: refreshes.append(vars) or refresh(*vars)
+    )
+
+    with csp.batch():
+        cv_atm.value = "cam"
+        cv_ocn.value = "mom"
+        assert cv_phys.options == []  # propagation is deferred
+        assert Stage.active().title == "Comps"
+
+    assert calls == [("cam", "mom")]
+    assert cv_phys.options == ["cam_mom_1", "cam_mom_2"]
+    assert len(refreshes) == 1
+    assert cv_ice._options_validities == {"cice": True, "dice": True}
+    assert csp.assignment_history[-2:] == [(cv_atm, "cam"), (cv_ocn, "mom")]
+
+
+def test_batch_rolls_back_on_violation():
+    cv_atm, cv_ocn, cv_ice, cv_phys, calls = _build()
+    cv_ice.value = "cice"
+
+    # Each assignment alone would be invalid too, but the violation is detected at commit
+    with pytest.raises(ConstraintViolation, match="cice requires an active atmosphere"):
+        ConfigVar.assign_many({"ICE": "dice", "ATM": "datm", "OCN": "docn", cv_ice: "cice"})
+
+    assert (cv_atm.value, cv_ocn.value, cv_ice.value) == (None, None, "cice")
+    assert calls == []
+    assert cv_atm._options_validities == {"cam": True, "datm": False}
+
+    # A valid combined assignment. The stage is completed only once the batch is committed.
+    ConfigVar.assign_many({cv_ice: "dice", cv_atm: "datm", cv_ocn: "docn"})
+    assert Stage.active().title == "Phys"
+    ConfigVar.assign_many({cv_phys: "datm_docn_2"})
+    assert cv_phys.value == "datm_docn_2"
+
+
+def test_batch_assignment_of_dependent_var():
+    """The options of a variable that depend on a variable assigned earlier in the same batch are
+    updated at commit, and the value assigned to the dependent variable is checked against them."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_comp = ConfigVarStr("COMP")
+    cv_comp_phys = ConfigVarStr("COMP_PHYS")  # an auxiliary variable not in any stage
+    cv_comp_phys.options_spec = OptionsSpec(
+        func=lambda comp: ([f"{comp}1", f"{comp}2"], None), args=(cv_comp,)
+    )
+    Stage("Comp", "comp", widget=FakeStageWidget(), varlist=[cv_comp])
+    csp.initialize(cvars, {}, Stage.first())
+    cv_comp.options = ["x", "y"]
+
+    cv_comp.value = "x"
+    ConfigVar.assign_many({cv_comp: "y", cv_comp_phys: "y2"})
+    assert (cv_comp.value, cv_comp_phys.value) == ("y", "y2")
+
+    with pytest.raises(ConstraintViolation, match="y1 not an option for COMP_PHYS"):
+        ConfigVar.assign_many({cv_comp: "x", cv_comp_phys: "y1"})
+    assert (cv_comp.value, cv_comp_phys.value) == ("y", "y2")
+    assert cv_comp_phys.options == ["y1", "y2"]
+
+
+def test_batch_rolls_back_after_propagation(monkeypatch):
+    cv_atm, cv_ocn, cv_ice, cv_phys, calls = _build()
+    ConfigVar.assign_many({cv_atm: "cam", cv_ocn: "mom"})
+    assert cv_phys.options == ["cam_mom_1", "cam_mom_2"]
+
+    # Fail the commit after the dependent options and the validities are propagated
+    refresh = csp._refresh_options_validities
+    failures = []
+
+    def failing_refresh(*vars):
+        refresh(*vars)
+        if not failures:
+            failures.append(dict(cv_ice._options_validities))
+            raise RuntimeError("refresh failed")
+
+    monkeypatch.setattr(csp, "_refresh_options_validities", failing_refresh)
+
+    with pytest.raises(RuntimeError, match="refresh failed"):
+        ConfigVar.assign_many({cv_atm: "datm", cv_ocn: "docn"})
+    assert failures == [{"cice": False, "dice": True}]  # as propagated before the failure
+
+    assert (cv_atm.value, cv_ocn.value) == ("cam", "mom")
+    assert cv_phys.options == ["cam_mom_1", "cam_mom_2"]
+    assert cv_ice._options_validities == {"cice": True, "dice": True}
+    cv_ice.value = "cice"
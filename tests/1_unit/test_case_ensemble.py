@@ -0,0 +1,135 @@
+"""Unit tests for the bulk creation of ensemble members."""
+
+import shlex
+import shutil
+import multiprocessing
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+from visualCaseGen.custom_widget_types import case_plan
+from visualCaseGen.custom_widget_types.case_plan import CasePlan, RUNDIR
+from visualCaseGen.custom_widget_types.case_tools import CommandResult
+from visualCaseGen.custom_widget_types.case_ensemble import member_plan, create_ensemble
+
+# The stand-in CIME tools are monkeypatched, so they are inherited by forked workers only.
+_FORK = multiprocessing.get_context("fork")
+
+
+def _base_plan(tmp_path):
+    plan = CasePlan(tmp_path / "base")
+    plan.add_step("modelgrid_alias", alias="res", grids=[["atm", "f19"]], allow_override=True)
+    plan.add_step(
+        "create_newcase", compset="F2000", res="res", case=plan.caseroot, machine="m", project="p"
+    )
+    plan.add_message(f"cd {plan.caseroot}")
+    plan.add_step("xmlchanges", changes=[["OCN_NX", "10"]])
+    plan.add_step("case_setup")
+    plan.add_step("copy", src="a.nc", dst=(tmp_path / "grid" / "a.nc").as_posix())
+    plan.add_step("copy", src="b.inp", dst=f"{RUNDIR}/ww3_moddef_create/b.inp")
+    plan.add_step("user_nl", model="mom", blocks=[{"pairs": [["DT", "1800.0"]], "comment": None}])
+    return plan
+
+
+def test_member_plan(tmp_path):
+    plan = _base_plan(tmp_path)
+    caseroot = (tmp_path / "m1").as_posix()
+    member = member_plan(
+        plan, {"CASEROOT": caseroot, "NINST": 2, "STOP_N": 5, "user_nl": {"mom": {"DT": 900}}}
+    )
+    # The ccs_config edits and the copy to the grid directory are shared by all members:
+    assert [step.kind for step in member.steps] == [
+        "create_newcase", "message", "xmlchanges", "case_setup", "copy", "user_nl"
+    ]
+    assert member.ninst == 2
+    assert member.steps[0].args["case"] == caseroot and member.steps[0].args["ninst"] == 2
+    assert member.steps[1].message == f"cd {caseroot}"
+    assert member.steps[2].args["changes"] == [["OCN_NX", "10"], ["STOP_N", "5"]]
+    # The user_nl overrides are merged into the user_nl step of the model, replacing DT:
+    assert member.steps[-1].args["blocks"] == [
+        {"pairs": [["DT", "900"]], "comment": "Ensemble member overrides"}
+    ]
+
+    # Clones inherit the xml and user_nl changes, including the overrides, of the cloned case:
+    overrides = {"CASEROOT": caseroot, "STOP_N": 5, "user_nl": {"mom": {"DT": 900}}}
+    clone = member_plan(plan, overrides, clone=plan.caseroot)
+    assert [step.kind for step in clone.steps] == [
+        "create_clone", "message", "case_setup", "copy"
+    ]
+
+
+@pytest.fixture
+def fake_cime_tools(monkeypatch):
+    """Replace the CIME tools with stand-ins that create the case directories, and fail for
+    case names containing "bad"."""
+
+    async def run_command_async(cmd, out=None, cwd=None, timeout=None):
+        args = shlex.split(cmd)
+        if args[0].endswith(("create_newcase", "create_clone")):
+            caseroot = Path(args[args.index("--case") + 1])
+            if "bad" in caseroot.name:
+                return CommandResult(cmd, 1, "", "create_newcase failed", 0.0)
+            if "--clone" in args:
+                shutil.copytree(args[args.index("--clone") + 1], caseroot)
+            else:
+                caseroot.mkdir()
+            (caseroot / "created_by").write_text(Path(args[0]).name)
+        return CommandResult(cmd, 0, "", "", 0.0)
+
+    monkeypatch.setattr(case_plan, "run_command_async", run_command_async)
+    return SimpleNamespace(cimeroot=Path("/cime"), srcroot="/src")
+
+
+def test_create_ensemble(tmp_path, fake_cime_tools):
+    plan = CasePlan(tmp_path / "base")
+    plan.add_step(
+        "create_newcase", compset="F2000", res="f19_g17", case=plan.caseroot, machine="m"
+    )
+    plan.add_step("user_nl", model="mom", blocks=[{"pairs": [["DT", "1800.0"]], "comment": None}])
+    members = [{"CASEROOT": (tmp_path / name).as_posix()} for name in ("m1", "bad", "m2")]
+    members[2]["user_nl"] = {"mom": {"DT": 900.0}}
+
+    events = []
+    results = create_ensemble(
+        plan, members, fake_cime_tools, max_workers=2, progress=lambda *e: events.append(e),
+        mp_context=_FORK,
+    )
+
+    # The failure of a member does not affect the others
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == "Error creating case."
+    assert (tmp_path / "m1" / "user_nl_mom").read_text() == "DT = 1800.0\n"
+    assert (tmp_path / "m2" / "user_nl_mom").read_text() == (
+        "\n! Ensemble member overrides\nDT = 900.0\n"
+    )
+    assert (members[1]["CASEROOT"], "failed: Error creating case.") in events
+    assert all((member["CASEROOT"], "queued") in events for member in members)
+
+    with pytest.raises(RuntimeError, match="already exists"):
+        create_ensemble(plan, members[:1], fake_cime_tools, mp_context=_FORK)
+
+
+def test_create_ensemble_clones(tmp_path, fake_cime_tools):
+    plan = CasePlan(tmp_path / "base")
+    plan.add_step(
+        "create_newcase", compset="F2000", res="f19_g17", case=plan.caseroot, machine="m"
+    )
+    plan.add_step("user_nl", model="mom", blocks=[{"pairs": [["DT", "1800.0"]], "comment": None}])
+    overrides = {"STOP_N": 5, "user_nl": {"mom": {"DT": 900.0}}}
+    members = [
+        {"CASEROOT": (tmp_path / "m1").as_posix(), **overrides},
+        {"CASEROOT": (tmp_path / "m2").as_posix(), **overrides},
+        {"CASEROOT": (tmp_path / "m3").as_posix(), "STOP_N": 5},
+    ]
+
+    results = create_ensemble(plan, members, fake_cime_tools, clone=True, mp_context=_FORK)
+    assert all(result.ok for result in results)
+
+    # Only the member with the same overrides as the first one is cloned from it, and the
+    # overrides are not repeated in its user_nl file.
+    created_by = [(tmp_path / name / "created_by").read_text() for name in ("m1", "m2", "m3")]
+    assert created_by == ["create_newcase", "create_clone", "create_newcase"]
+    member_user_nl = "\n! Ensemble member overrides\nDT = 900.0\n"
+    assert (tmp_path / "m2" / "user_nl_mom").read_text() == member_user_nl
+    assert (tmp_path / "m3" / "user_nl_mom").read_text() == "DT = 1800.0\n"
@@ -0,0 +1,104 @@
+"""Unit tests for building, serializing, and executing case plans."""
+
+import asyncio
+import threading
+
+from visualCaseGen.custom_widget_types.case_plan import CasePlan, RUNDIR
+from visualCaseGen.custom_widget_types.case_tools import dedup_user_nl_blocks
+from tests.utils import FakeCase, FakeCime
+
+
+def _make_plan(tmp_path, ninst=1):
+    src = tmp_path / "grid.inp"
+    src.write_text("ww3 input")
+    plan = CasePlan(tmp_path / "case", ninst=ninst)
+    plan.add_message("Apply case xml changes:")
+    plan.add_step("xmlchanges", changes=[["OCN_NX", "10"], ["OCN_NY", "20"]])
+    plan.add_step("copy", src=src.as_posix(), dst=f"{RUNDIR}/ww3_moddef_create/grid.inp")
+    plan.add_step("user_nl", model="mom", pairs=[["NIGLOBAL", "10"]], comment="Grid")
+    plan.add_step("user_nl", model="cice", pairs=[["grid_format", '"nc"']])
+    plan.add_step("user_nl", model="mom", pairs=[["DT", "600.0"]], log_title=False)
+    return plan
+
+
+def test_case_plan_serialization(tmp_path):
+    plan = _make_plan(tmp_path, ninst=2)
+    plan_copy = CasePlan.from_json(plan.to_json(tmp_path / "plan.json"))
+    assert plan_copy.to_dict() == plan.to_dict()
+    assert CasePlan.from_json(path=tmp_path / "plan.json").to_dict() == plan.to_dict()
+    assert [step.kind for step in plan_copy.steps] == [
+        "message", "xmlchanges", "copy", "user_nl", "user_nl", "user_nl"
+    ]
+    # The copy and the user_nl steps are grouped to be executed concurrently
+    assert [len(group) for group in plan_copy._step_groups()] == [1, 1, 4]
+
+
+def test_case_plan_execute(tmp_path):
+    caseroot, rundir = tmp_path / "case", tmp_path / "run"
+    caseroot.mkdir()
+    rundir.mkdir()
+    case = FakeCase(rundir)
+    plan = CasePlan.from_json(_make_plan(tmp_path, ninst=2).to_json())
+
+    # Nothing is written if the plan is only displayed
+    plan.execute(FakeCime(case), do_exec=False)
+    assert case.values == {} and list(caseroot.iterdir()) == []
+
+    plan.execute(FakeCime(case), do_exec=True)
+    assert case.values == {"OCN_NX": "10", "OCN_NY": "20"}
+    assert (rundir / "ww3_moddef_create" / "grid.inp").read_text() == "ww3 input"
+    for i in ("0001", "0002"):
+        # appends to the same user_nl file remain in order
+        assert (caseroot / f"user_nl_mom_{i}").read_text() == (
+            "\n! Grid\nNIGLOBAL = 10\nDT = 600.0\n"
+        )
+        assert (caseroot / f"user_nl_cice_{i}").read_text() == 'grid_format = "nc"\n'
+
+
+def test_user_nl_blocks(tmp_path):
+    caseroot = tmp_path / "case"
+    caseroot.mkdir()
+    blocks = dedup_user_nl_blocks(
+        [
+            {"pairs": [["NIGLOBAL", "10"], ["DT", "1800.0"]], "comment": "Grid"},
+            {"pairs": [["dt", "600.0"]], "comment": "Timesteps"},
+            {"pairs": [["DT_THERM", "1200.0"]], "comment": None},
+        ]
+    )
+    # Repeated variables (case-insensitive) are set only where they are set last
+    assert blocks == [
+        {"pairs": [["NIGLOBAL", "10"]], "comment": "Grid"},
+        {"pairs": [["dt", "600.0"]], "comment": "Timesteps"},
+        {"pairs": [["DT_THERM", "1200.0"]], "comment": None},
+    ]
+
+    plan = CasePlan(caseroot, ninst=3)
+    plan.add_step("user_nl", model="mom", blocks=blocks)
+    plan.execute(FakeCime(None), max_workers=3)
+    for i in ("0001", "0002", "0003"):
+        assert (caseroot / f"user_nl_mom_{i}").read_text() == (
+            "\n! Grid\nNIGLOBAL = 10\n\n! Timesteps\ndt = 600.0\nDT_THERM = 1200.0\n"
+        )
+
+
+def test_log_only_in_running_loop(tmp_path, capsys):
+    plan = _make_plan(tmp_path)
+    plan.add_step("case_setup")
+    threads = []
+
+    class _Out:
+        def __enter__(self):
+            threads.append(threading.current_thread())
+
+        def __exit__(self, *args):
+            pass
+
+    async def show_commands():
+        plan.execute(FakeCime(None), do_exec=False, out=_Out())
+
+    # Displaying the commands, e.g., within the notebook kernel, requires no event loop or
+    # thread of its own.
+    asyncio.run(show_commands())
+    assert threads and set(threads) == {threading.main_thread()}
+    assert "case.setup" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == [tmp_path / "grid.inp"]
@@ -0,0 +1,112 @@
+"""Unit tests for the incremental updates of ccs_config xml files."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from visualCaseGen.custom_widget_types.ccs_config_updater import (
+    entry_index,
+    update_entry,
+    revert_entry,
+    model_grid_entry,
+    domain_entry,
+)
+
+MODELGRID_ALIASES = """<?xml version="1.0"?>
+<grids version="2.1">
+  <!-- <model_grid alias="old"> <grid name="atm">x</grid> </model_grid> -->
+  <model_grid alias="f19_g17" not_compset="_POP">
+    <grid name="atm">1.9x2.5</grid>
+    <grid name="ocnice">gx1v7</grid>
+  </model_grid>
+
+  <model_grid alias='T62_g37'>
+    <grid name="atm">T62</grid>
+  </model_grid>
+</grids>
+"""
+
+
+@pytest.fixture
+def xml_path(tmp_path):
+    path = tmp_path / "modelgrid_aliases_nuopc.xml"
+    path.write_text(MODELGRID_ALIASES)
+    return path
+
+
+def test_entry_index(xml_path):
+    index = entry_index(xml_path, "model_grid")
+    assert list(index) == ["f19_g17", "T62_g37"]
+    start, end = index["T62_g37"]
+    assert MODELGRID_ALIASES[start:end].startswith("<model_grid alias='T62_g37'>")
+    assert MODELGRID_ALIASES[start:end].endswith("</model_grid>")
+    assert entry_index(xml_path, "model_grid") is index  # cached until the file changes
+
+
+def test_update_and_revert_entry(xml_path):
+    entry = model_grid_entry("my_res", [("atm", "0.9x1.25"), ("ocnice", "my_grid")])
+    assert update_entry(xml_path, entry) is None
+    text = xml_path.read_text()
+
+    # The new entry is inserted before the closing root tag, leaving the rest unchanged
+    assert text.startswith(MODELGRID_ALIASES[: MODELGRID_ALIASES.index("</grids>")])
+    assert text.endswith(
+        '  <model_grid alias="my_res">\n'
+        '    <grid name="atm">0.9x1.25</grid>\n'
+        '    <grid name="ocnice">my_grid</grid>\n'
+        "  </model_grid>\n"
+        "</grids>\n"
+    )
+    assert "my_res" in entry_index(xml_path, "model_grid")
+    ET.parse(xml_path)  # still well-formed
+
+    with pytest.raises(RuntimeError, match="already exists"):
+        update_entry(xml_path, model_grid_entry("f19_g17", [("atm", "T62")]))
+
+    # Replace an existing entry, and revert the replacement
+    previous = update_entry(
+        xml_path, model_grid_entry("f19_g17", [("atm", "T62")]), allow_override=True
+    )
+    assert previous.startswith('<model_grid alias="f19_g17" not_compset="_POP">')
+    assert '<grid name="atm">T62</grid>' in xml_path.read_text()
+    revert_entry(xml_path, "model_grid", "f19_g17", previous)
+    revert_entry(xml_path, "model_grid", "my_res")
+    assert xml_path.read_text() == MODELGRID_ALIASES
+
+
+def test_check_only(xml_path):
+    update_entry(xml_path, domain_entry("my_grid", 10, 20, "mesh.nc", "desc"), do_exec=False)
+    assert xml_path.read_text() == MODELGRID_ALIASES
+
+
+def test_concurrent_updates(xml_path):
+    aliases = [f"res{i}" for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for alias in aliases:
+            pool.submit(update_entry, xml_path, model_grid_entry(alias, [("atm", "T62")]))
+    index = entry_index(xml_path, "model_grid")
+    assert set(aliases) <= set(index)
+    assert len(ET.parse(xml_path).getroot().findall("model_grid")) == len(aliases) + 2
+
+
+def test_lock_file(xml_path):
+    update_entry(xml_path, model_grid_entry("res", [("atm", "T62")]))
+    revert_entry(xml_path, "model_grid", "res")
+    # The lock is kept next to the xml file, i.e., on the file system shared by all hosts
+    assert sorted(path.name for path in xml_path.parent.iterdir()) == [
+        f".{xml_path.name}.lock", xml_path.name
+    ]
+
+
+def test_entry_index_after_external_edit(xml_path):
+    # An edit that retains the modification time and the size of the file is still detected
+    st = xml_path.stat()
+    entry_index(xml_path, "model_grid")
+    xml_path.write_text(MODELGRID_ALIASES.replace("T62_g37", "T62_g38"))
+    os.utime(xml_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert xml_path.stat().st_size == st.st_size
+    assert list(entry_index(xml_path, "model_grid")) == ["f19_g17", "T62_g38"]
+    revert_entry(xml_path, "model_grid", "T62_g38")
+    assert "T62_g38" not in xml_path.read_text()
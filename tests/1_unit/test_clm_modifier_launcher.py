@@ -0,0 +1,92 @@
+"""Unit tests for running the CLM input modifier tools via ClmModifierLauncher."""
+
+import asyncio
+import types
+
+import pytest
+
+from visualCaseGen.custom_widget_types.clm_modifier_launcher import ClmModifierLauncher
+
+# A stand-in for the tool that reads the behavior and the file to generate from its config file.
+FAKE_TOOL = """#!/bin/sh
+read mode modified_file started_flag < "$1"
+echo "Modifying input file"
+case $mode in
+    success) echo generated > "$modified_file" ;;
+    warning) echo "some warning" >&2; echo generated > "$modified_file" ;;
+    failure) echo "some error" >&2 ;;
+    hang) touch "$started_flag"; sleep 60; echo generated > "$modified_file" ;;
+esac
+"""
+
+
+class _FakeLauncher(ClmModifierLauncher):
+    def __init__(self, srcroot, mode):
+        self.mode = mode
+        super().__init__("fake_modifier", srcroot, [], types.SimpleNamespace(value=None))
+
+    def _write_config(self, config_file_path, modified_file_path):
+        started_flag = config_file_path.parent / "started"
+        config_file_path.write_text(f"{self.mode} {modified_file_path} {started_flag}\n")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    tool = tmp_path / "components" / "clm" / "tools" / "modify_input_files" / "fake_modifier"
+    tool.parent.mkdir(parents=True)
+    tool.write_text(FAKE_TOOL)
+    tool.chmod(0o755)
+    return tmp_path, tmp_path / "fake_modifier.cfg", tmp_path / "modified.nc"
+
+
+def _run_tool(paths, mode):
+    srcroot, config_file_path, modified_file_path = paths
+    launcher = _FakeLauncher(srcroot, mode)
+    launcher._write_config(config_file_path, modified_file_path)
+    return asyncio.run(launcher._run_tool_async(config_file_path, modified_file_path))
+
+
+def test_run_tool_success(paths, capsys):
+    assert _run_tool(paths, "success") is True
+    assert paths[2].read_text() == "generated\n"
+    out = capsys.readouterr().out
+    assert "Modifying input file" in out
+    assert "has generated the file" in out and "warnings" not in out
+
+
+def test_run_tool_warnings(paths, capsys):
+    assert _run_tool(paths, "warning") is True
+    out = capsys.readouterr().out
+    assert "some warning" in out
+    assert "but the above warnings were issued" in out
+
+
+def test_run_tool_failure(paths, capsys):
+    paths[2].write_text("stale")  # an old file is removed before the tool runs
+    assert _run_tool(paths, "failure") is False
+    assert not paths[2].exists()
+    assert "has failed to generate the file" in capsys.readouterr().out
+
+
+def test_run_tool_cancel(paths, capsys):
+    srcroot, config_file_path, modified_file_path = paths
+    launcher = _FakeLauncher(srcroot, "hang")
+    launcher._write_config(config_file_path, modified_file_path)
+    started_flag = srcroot / "started"
+
+    async def launch_and_cancel():
+        launcher._task = asyncio.ensure_future(
+            launcher._launch_task(config_file_path, modified_file_path)
+        )
+        while not started_flag.exists():
+            await asyncio.sleep(0.05)
+        assert launcher._btn_cancel.layout.display == "flex"
+        launcher._on_cancel_clicked()
+        await asyncio.wait_for(asyncio.shield(launcher._task), 30)
+
+    asyncio.run(launch_and_cancel())
+    assert launcher._status_var.value is None
+    assert launcher._task is None
+    assert launcher._btn_cancel.layout.display == "none"
+    assert "fake_modifier cancelled." in capsys.readouterr().out
+    assert not modified_file_path.exists()
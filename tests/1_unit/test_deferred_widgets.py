@@ -0,0 +1,48 @@
+"""Unit tests for the deferred construction of ConfigVar and Stage widgets."""
+
+from functools import partial
+from ipywidgets import VBox, ToggleButtons
+
+from ProConPy.config_var import ConfigVar, cvars
+from ProConPy.config_var_str import ConfigVarStr
+from ProConPy.dummy_widget import DummyWidget
+from ProConPy.stage import Stage
+from ProConPy.csp_solver import csp
+from visualCaseGen.custom_widget_types.stage_widget import StageWidget
+
+
+def test_deferred_widgets():
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_atm = ConfigVarStr("ATM")
+    cv_ocn = ConfigVarStr("OCN")
+    for var in (cv_atm, cv_ocn):
+        var.widget_factory = partial(ToggleButtons, description=f"{var.name}:")
+
+    constructed = []
+
+    def make_stage_widget(title):
+        constructed.append(title)
+        return StageWidget(VBox)
+
+    Stage("Atm", "atm", widget=partial(make_stage_widget, "Atm"), varlist=[cv_atm])
+    Stage("Ocn", "ocn", widget=partial(make_stage_widget, "Ocn"), varlist=[cv_ocn])
+    csp.initialize(cvars, {}, Stage.first())
+
+    cv_atm.options = ["cam", "datm"]
+    cv_ocn.options = ["mom", "docn"]
+
+    # Only the widget of the first (enabled) stage, and those of its variables, are constructed
+    assert constructed == ["Atm"]
+    assert isinstance(cv_atm._widget, ToggleButtons)
+    assert isinstance(cv_ocn._widget, DummyWidget)
+
+    # Options and value set before the widget is constructed are transferred at construction
+    cv_atm.value = "cam"
+    assert constructed == ["Atm", "Ocn"]
+    assert isinstance(cv_ocn._widget, ToggleButtons)
+    assert cv_ocn.widget_factory is None
+    assert len(cv_ocn.widget.options) == 2
+    assert cv_ocn.widget.description == "OCN:"
+    assert Stage.active().widget.stage is Stage.active()
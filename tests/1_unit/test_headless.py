@@ -0,0 +1,48 @@
+"""Unit tests for using ProConPy and the backend of visualCaseGen headless, i.e., without GUI."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "modules, heavy",
+    [
+        # The core and backend modules must not import any GUI or plotting libraries.
+        (
+            [
+                "ProConPy.config_var_str_ms", "ProConPy.config_var_int", "ProConPy.config_var_real",
+                "ProConPy.stage", "ProConPy.csp_solver", "ProConPy.dialog",
+                "visualCaseGen.initialize",
+            ],
+            ["ipywidgets", "IPython", "matplotlib", "networkx", "xarray"],
+        ),
+        # Heavy optional dependencies are to be imported only by the GUI widgets and backend
+        # functions that need them, not by the case creation backend.
+        (
+            [
+                "visualCaseGen.initialize",
+                "visualCaseGen.custom_widget_types.case_creator",
+                "ProConPy.hgraph_utils",
+            ],
+            ["ipywidgets", "IPython", "matplotlib", "networkx", "xarray", "mom6_forge", "nbformat"],
+        ),
+    ],
+)
+def test_headless_imports(modules, heavy):
+    """Importing the given modules must not import any of the given heavy libraries."""
+    code = (
+        "import sys\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + f"print(sorted({set(heavy)!r} & {{name.split('.')[0] for name in sys.modules}}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
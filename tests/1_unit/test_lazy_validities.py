@@ -0,0 +1,116 @@
+"""Unit tests for ConfigVar instances with lazy validities, i.e., options validities that are
+evaluated on demand rather than all at once."""
+
+import pytest
+from z3 import Implies
+
+from ProConPy.config_var import ConfigVar, cvars
+from ProConPy.config_var_str import ConfigVarStr
+from ProConPy.stage import Stage
+from ProConPy.csp_solver import csp
+from ProConPy.dev_utils import ConstraintViolation
+from tests.utils import FakeStageWidget
+
+
+def _build():
+    """Build a single stage with SELECT and a lazy PICK variable, where the first few options of
+    PICK are invalid if SELECT is "a"."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_select = ConfigVarStr("SELECT")
+    cv_pick = ConfigVarStr("PICK", lazy_validities=True)
+
+    relational_constraints = {
+        Implies(cv_select == "a", cv_pick != f"p{i}"): f"p{i} is incompatible with a"
+        for i in range(3)
+    }
+
+    Stage("Main", "main", widget=FakeStageWidget(), varlist=[cv_select, cv_pick])
+    csp.initialize(cvars, relational_constraints, Stage.first())
+
+    cv_select.options = ["a", "b"]
+    cv_pick.options = [f"p{i}" for i in range(100)]
+
+    return cv_select, cv_pick
+
+
+def _num_evaluated(var):
+    return sum(validity is not None for validity in var._options_validities.values())
+
+
+def test_validities_evaluated_on_demand():
+    cv_select, cv_pick = _build()
+    cv_select.value = "a"
+
+    assert _num_evaluated(cv_pick) == 0
+    assert cv_pick.option_validity("p1") is False
+    assert cv_pick.option_validity("p50") is True
+    assert cv_pick.option_validity("foo") is None
+    assert _num_evaluated(cv_pick) == 2
+
+    # Assigning an option whose validity is not evaluated yet
+    with pytest.raises(ConstraintViolation):
+        cv_pick.value = "p2"
+    cv_pick.value = "p70"
+    assert cv_pick.value == "p70"
+
+
+def test_valid_option_searches_short_circuit():
+    cv_select, cv_pick = _build()
+    cv_select.value = "a"
+
+    assert cv_pick.get_first_valid_option() == "p3"
+    assert Stage.single_valid_option(cv_pick) is None
+    assert _num_evaluated(cv_pick) < len(cv_pick.options)
+
+    assert cv_pick.valid_options == [f"p{i}" for i in range(3, 100)]
+    assert _num_evaluated(cv_pick) == len(cv_pick.options)
+
+
+def test_validities_reset_on_refresh():
+    cv_select, cv_pick = _build()
+    cv_select.value = "a"
+    assert cv_pick.option_validity("p0") is False
+
+    # The change in SELECT invalidates the evaluated validities of PICK
+    cv_select.value = "b"
+    assert cv_pick._options_validities["p0"] is None
+    assert cv_pick.option_validity("p0") is True
+
+
+def test_resolve_widget_options():
+    cv_select, cv_pick = _build()
+    cv_select.value = "a"
+
+    widget_options = cv_pick.widget.options
+    assert all(wopt[0] == ConfigVar._unevaluated_opt_char for wopt in widget_options)
+
+    resolved = cv_pick._resolve_widget_options(widget_options[:4])
+    assert resolved == (
+        f"{ConfigVar._invalid_opt_char} p0",
+        f"{ConfigVar._invalid_opt_char} p1",
+        f"{ConfigVar._invalid_opt_char} p2",
+        f"{ConfigVar._valid_opt_char} p3",
+    )
+    assert _num_evaluated(cv_pick) == 4
+
+
+def test_validities_carried_over_on_options_change():
+    cv_select, cv_pick = _build()
+    cv_select.value = "a"
+    cv_pick.value = "p50"
+    assert cv_pick.option_validity("p1") is False
+
+    # Overlapping options retain their evaluated validities, and the value is kept since it is
+    # still an option and still valid.
+    cv_pick.options = [f"p{i}" for i in range(50)] + [f"p{i}" for i in range(100, 110)] + ["p50"]
+    assert cv_pick.value == "p50"
+    assert cv_pick._options_validities["p1"] is False
+    assert cv_pick._options_validities["p100"] is None
+    assert _num_evaluated(cv_pick) == 2
+
+    # The value is reset if it is not an option anymore.
+    cv_pick.options = [f"p{i}" for i in range(10)]
+    assert cv_pick.value is None
+    assert cv_pick._options_validities["p1"] is False
@@ -96,3 +96,60 @@ def test_options_reassigment():
     assert mc._filtered_options == ("g", "h", "i", "j")
     assert mc._filtered_tooltips == ("G", "H", "I", "J")
     assert mc._len_options_to_display() == 4
+
+def test_paging():
+    """Test that only a page of options is rendered in "all" display mode, and that the value is
+    retained while paging."""
+    options = tuple(f"opt{i}" for i in range(200))
+    mc = MultiCheckbox(options=options, tooltips=tuple(f"Opt{i}" for i in range(200)))
+    mc._switch_display_mode()
+    assert len(mc._options_vbox.children) == mc._len_options_to_display() < len(options)
+
+    # select an option on the second page
+    prev_btn, page_label, next_btn = mc._page_nav.children
+    next_btn.click()
+    first_cb = mc._options_vbox.children[0]
+    assert first_cb.description == f"opt{mc._window_start}"
+    first_cb.value = True
+    assert mc.value == (first_cb.description,)
+
+    # paging doesn't change the value, and the checkboxes are reused
+    num_checkboxes = len(mc._checkboxes)
+    next_btn.click()
+    prev_btn.click()
+    assert mc.value == (first_cb.description,) and first_cb.value is True
+    assert len(mc._checkboxes) == num_checkboxes
+
+    # assigning a value on another page displays that page
+    mc.value = ("opt199",)
+    assert "opt199" in [cb.description for cb in mc._options_vbox.children if cb.value]
+
+def test_patch_options():
+    """Test that patching options updates only the given options and retains the value and filter."""
+    mc = MultiCheckbox(options=("✓ a", "✓ b", "✓ ab"), tooltips=("A", "B", "AB"))
+    mc.value = ("✓ a",)
+    mc._filter_textbox.value = "a"
+    mc.value = ("✓ ab",)
+
+    mc.patch_options({0: "❌ a"})
+    assert mc.options == ("❌ a", "✓ b", "✓ ab")
+    assert mc._filtered_options == ("❌ a", "✓ ab")
+    assert [cb.description for cb in mc._options_vbox.children] == ["❌ a", "✓ ab"]
+    assert mc.value == ("✓ ab",) and mc._filter_textbox.value == "a"
+
+def test_patch_selected_option():
+    """Test that patching the selected option renames the value, keeps its checkbox checked, and
+    doesn't signal a value change to the backend."""
+    mc = MultiCheckbox(options=("\u200b o1", "\u200b o2", "\u200b o3"), tooltips=("1", "2", "3"))
+    mc.value = ("\u200b o2",)
+    signals = []
+    mc.observe(lambda change: signals.append(change["new"]), names="_property_lock")
+
+    mc.patch_options({1: "❌ o2"})
+    assert mc.value == ("❌ o2",)
+    assert [cb.value for cb in mc._options_vbox.children] == [False, True, False]
+    assert [cb.description for cb in mc._options_vbox.children] == ["\u200b o1", "❌ o2", "\u200b o3"]
+    assert signals == []
+
+    # the value can be restored, e.g., by ConfigVar.update_options_validities
+    mc.value = ("❌ o2",)
@@ -0,0 +1,91 @@
+"""Unit tests for the cached NetCDF metadata reader."""
+
+import os
+
+import netCDF4
+import pytest
+
+from visualCaseGen import nc_metadata
+from visualCaseGen.nc_metadata import read_header, global_attrs, dim_size, memoize_by_file
+
+
+def _write_topo(path, min_depth, nk=3):
+    with netCDF4.Dataset(path, "w") as ds:
+        ds.createDimension("nx", 4)
+        ds.createDimension("nk", nk)
+        ds.createVariable("dz", "f8", ("nk",))
+        ds.min_depth = min_depth
+        ds.max_depth = 5000.0
+
+
+def test_read_header(tmp_path):
+    path = tmp_path / "topo.nc"
+    _write_topo(path, 10.0)
+
+    header = read_header(path)
+    assert header.dims == {"nx": 4, "nk": 3}
+    assert header.variables == {"dz": ("nk",)}
+    assert global_attrs(path) == {"min_depth": 10.0, "max_depth": 5000.0}
+    assert isinstance(global_attrs(path)["min_depth"], float)
+    assert dim_size(path, "dz") == 3
+    assert read_header(str(path)) is header  # cached
+
+    # The cache is invalidated when the file changes
+    _write_topo(path, 20.0, nk=5)
+    os.utime(path, ns=(0, 0))
+    assert global_attrs(path)["min_depth"] == 20.0
+    assert dim_size(path, "dz") == 5
+
+
+def test_memoize_by_file(tmp_path):
+    path = tmp_path / "mesh.nc"
+    _write_topo(path, 10.0)
+    calls = []
+
+    @memoize_by_file
+    def min_depth(p):
+        calls.append(p)
+        with netCDF4.Dataset(p) as ds:
+            return ds.min_depth
+
+    assert min_depth(path) == min_depth(path) == 10.0
+    assert len(calls) == 1
+    _write_topo(path, 20.0)
+    os.utime(path, ns=(0, 0))
+    assert min_depth(path) == 20.0
+    assert len(calls) == 2
+
+
+def test_global_attrs_read_only(tmp_path):
+    path = tmp_path / "topo.nc"
+    _write_topo(path, 10.0)
+
+    attrs = global_attrs(path)
+    with pytest.raises(TypeError):
+        attrs["min_depth"] = 0.0
+    assert global_attrs(path)["min_depth"] == 10.0
+
+
+def test_memoize_by_file_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(nc_metadata, "MAX_CACHED_FILES", 2)
+    path = tmp_path / "mesh.nc"
+    _write_topo(path, 10.0)
+    calls = []
+
+    @memoize_by_file
+    def scaled_depth(p, factor):
+        calls.append(factor)
+        with netCDF4.Dataset(p) as ds:
+            return ds.min_depth * factor
+
+    # Results of the same file with different arguments don't evict each other
+    assert scaled_depth(path, 1) == 10.0
+    assert scaled_depth(path, 2) == 20.0
+    assert scaled_depth(path, 1) == 10.0
+    assert calls == [1, 2]
+
+    # The least recently used result is dropped once the cache is full
+    assert scaled_depth(path, 3) == 30.0
+    assert scaled_depth(path, 1) == 10.0
+    assert scaled_depth(path, 2) == 20.0
+    assert calls == [1, 2, 3, 2]
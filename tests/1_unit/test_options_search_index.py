@@ -0,0 +1,34 @@
+from visualCaseGen.custom_widget_types.options_search_index import OptionsSearchIndex
+
+
+def test_search_matches_linear_scan():
+    """Check that the index finds the same options as a linear substring scan."""
+    options = tuple(f"opt_{i}" for i in range(500))
+    tooltips = tuple(f"ocean grid {i % 7} atm {i % 11}" for i in range(500))
+    index = OptionsSearchIndex(options, tooltips)
+    texts = [(opt + tip).lower() for opt, tip in zip(options, tooltips)]
+
+    for exact, other in [
+        ([], ["grid 3"]),
+        (["atm 10"], []),
+        (["ocean"], ["opt_4", "opt_5"]),
+        (["grid 2", "atm 1"], ["o"]),
+        ([], ["nomatch"]),
+    ]:
+        expected = {
+            i
+            for i, text in enumerate(texts)
+            if all(kw in text for kw in exact) and (not other or any(kw in text for kw in other))
+        }
+        assert set(index.search(exact, other)) == expected
+
+
+def test_search_ranking():
+    """Options that match more keywords, and those that match in the option itself rather than
+    in the tooltip, are ranked first. Ties retain the original order."""
+    options = ("alpha", "beta", "gamma", "delta")
+    tooltips = ("beta related", "", "beta and gamma", "")
+    index = OptionsSearchIndex(options, tooltips)
+
+    assert index.search(other_keywords=["beta", "gamma"]) == [2, 1, 0]
+    assert index.search(other_keywords=["a"]) == [0, 1, 2, 3]
@@ -0,0 +1,263 @@
+"""Unit tests for OptionsSpec: argument-keyed caching of options and tooltips for
+options specs declared pure, and streaming of options returned by generators."""
+
+import asyncio
+
+from z3 import Implies
+
+from ProConPy.config_var import ConfigVar, cvars
+from ProConPy.config_var_str import ConfigVarStr
+from ProConPy.options_spec import OptionsSpec
+from ProConPy.stage import Stage
+from ProConPy.csp_solver import csp
+from tests.utils import FakeStageWidget
+
+
+def _build(pure, cache_size=32):
+    """Build a two-stage chain: Select -> Pick, where the options of PICK depend on SELECT."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_select = ConfigVarStr("SELECT")
+    cv_pick = ConfigVarStr("PICK")
+
+    calls = []
+
+    def pick_options_func(select):
+        calls.append(select)
+        return [f"{select}_1", f"{select}_2"], [f"first {select}", f"second {select}"]
+
+    cv_pick.options_spec = OptionsSpec(
+        func=pick_options_func, args=(cv_select,), pure=pure, cache_size=cache_size
+    )
+
+    Stage("Select", "select", widget=FakeStageWidget(), varlist=[cv_select])
+    Stage("Pick", "pick", widget=FakeStageWidget(), varlist=[cv_pick], parent=Stage.first())
+    csp.initialize(cvars, {}, Stage.first())
+
+    cv_select.options = ["a", "b", "c"]
+
+    return cv_select, cv_pick, calls
+
+
+def test_pure_options_spec_is_cached():
+    cv_select, cv_pick, calls = _build(pure=True)
+
+    cv_select.value = "a"
+    assert cv_pick.options == ["a_1", "a_2"]
+    assert calls == ["a"]
+
+    Stage.active().revert()
+    cv_select.value = "b"
+    assert cv_pick.options == ["b_1", "b_2"]
+    Stage.active().revert()
+
+    # Going back to a previously encountered argument value doesn't re-invoke func
+    cv_select.value = "a"
+    assert cv_pick.options == ["a_1", "a_2"]
+    assert calls == ["a", "b"]
+
+
+def test_impure_options_spec_is_not_cached():
+    cv_select, cv_pick, calls = _build(pure=False)
+
+    cv_select.value = "a"
+    Stage.active().revert()
+    cv_select.value = "b"
+    Stage.active().revert()
+    cv_select.value = "a"
+    assert cv_pick.options == ["a_1", "a_2"]
+    assert calls == ["a", "b", "a"]
+
+
+def test_options_spec_cache_eviction():
+    cv_select, cv_pick, calls = _build(pure=True, cache_size=2)
+
+    for val in ["a", "b", "c"]:
+        cv_select.value = val
+        Stage.active().revert()
+
+    # "a" is the least recently used entry, so it must have been evicted
+    assert len(cv_pick.options_spec._cache) == 2
+    cv_select.value = "b"
+    assert calls == ["a", "b", "c"]
+    Stage.active().revert()
+    cv_select.value = "a"
+    assert calls == ["a", "b", "c", "a"]
+
+
+def _build_streaming(num_options=40, page_size=16):
+    """Build a two-stage chain: Select -> Pick, where the options of PICK are streamed."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_select = ConfigVarStr("SELECT")
+    cv_pick = ConfigVarStr("PICK")
+
+    def pick_options_func(select):
+        return ((f"{select}_{i}", f"option {i}") for i in range(num_options))
+
+    cv_pick.options_spec = OptionsSpec(
+        func=pick_options_func, args=(cv_select,), page_size=page_size
+    )
+
+    Stage("Select", "select", widget=FakeStageWidget(), varlist=[cv_select])
+    Stage("Pick", "pick", widget=FakeStageWidget(), varlist=[cv_pick], parent=Stage.first())
+    csp.initialize(cvars, {}, Stage.first())
+
+    cv_select.options = ["a", "b"]
+
+    return cv_select, cv_pick
+
+
+def test_streamed_options_without_event_loop():
+    cv_select, cv_pick = _build_streaming()
+
+    # With no running event loop, the stream is consumed right away.
+    cv_select.value = "a"
+    assert not cv_pick.options_pending
+    assert cv_pick.options == [f"a_{i}" for i in range(40)]
+    assert cv_pick.tooltips[-1] == "option 39"
+    assert cv_pick.valid_options == cv_pick.options
+
+
+def test_streamed_options_with_event_loop():
+    cv_select, cv_pick = _build_streaming()
+
+    async def select_and_wait():
+        cv_select.value = "a"
+        # Only the first page is published before control returns to the event loop
+        assert cv_pick.options_pending
+        assert cv_pick.options == [f"a_{i}" for i in range(16)]
+        while cv_pick.options_pending:
+            await asyncio.sleep(0)
+
+    asyncio.run(select_and_wait())
+    assert cv_pick.options == [f"a_{i}" for i in range(40)]
+    assert cv_pick.tooltips == [f"option {i}" for i in range(40)]
+
+
+def test_streamed_widget_refreshes():
+    cv_select, cv_pick = _build_streaming(num_options=200, page_size=10)
+    published = []
+    cv_pick.widget.observe(lambda change: published.append(len(change["new"])), names="options")
+
+    async def select_and_wait():
+        cv_select.value = "a"
+        stream_tooltips = cv_pick._options_stream.tooltips
+        while cv_pick.options_pending:
+            await asyncio.sleep(0)
+        return stream_tooltips
+
+    stream_tooltips = asyncio.run(select_and_wait())
+    # The widget is refreshed only when the number of options doubles, and at the end
+    assert published == [10, 20, 40, 80, 160, 200]
+    # A new tooltips list is assigned to the widget, so that the change gets synced
+    assert cv_pick.widget.tooltips == stream_tooltips
+    assert cv_pick.widget.tooltips is not stream_tooltips
+
+
+def test_streamed_options_completed_on_assignment():
+    cv_select, cv_pick = _build_streaming()
+
+    async def select_and_pick():
+        cv_select.value = "b"
+        assert cv_pick.options_pending
+        # An option that is not streamed yet can be assigned right away
+        cv_pick.value = "b_39"
+        assert not cv_pick.options_pending
+
+    asyncio.run(select_and_pick())
+    assert cv_pick.value == "b_39"
+    assert len(cv_pick.options) == 40
+
+
+def test_superseded_options_stream():
+    cv_select, cv_pick = _build_streaming()
+
+    async def select_twice():
+        cv_select.value = "a"
+        Stage.active().revert()
+        cv_select.value = "b"
+        while cv_pick.options_pending:
+            await asyncio.sleep(0)
+
+    asyncio.run(select_twice())
+    assert cv_pick.options == [f"b_{i}" for i in range(40)]
+
+
+def test_infinite_domain_options_evaluated_once():
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_name = ConfigVarStr("NAME")  # no options, i.e., infinite domain
+    cv_pick = ConfigVarStr("PICK")
+    calls = []
+
+    def pick_options_func(name):
+        calls.append(name)
+        return [f"{name}_1", f"{name}_2"], None
+
+    # Not declared pure, so the options function is not cached
+    cv_pick.options_spec = OptionsSpec(func=pick_options_func, args=(cv_name,))
+
+    Stage("Name", "name", widget=FakeStageWidget(), varlist=[cv_name])
+    Stage("Pick", "pick", widget=FakeStageWidget(), varlist=[cv_pick], parent=Stage.first())
+    csp.initialize(cvars, {}, Stage.first())
+
+    # The options determined when the assignment is checked are carried over to its registration
+    cv_name.value = "x"
+    assert calls == ["x"]
+    assert cv_pick.options == ["x_1", "x_2"]
+    Stage.active().revert()
+    cv_name.value = "y"
+    assert calls == ["x", "y"]
+    assert cv_pick.options == ["y_1", "y_2"]
+
+
+def _build_streaming_infinite_domain():
+    """Build a two-stage chain: Name -> Pick, where NAME has an infinite domain and the options
+    of PICK are streamed. The first page of options is infeasible if NAME is "y"."""
+    ConfigVar.reboot()
+    Stage.reboot()
+
+    cv_name = ConfigVarStr("NAME")
+    cv_pick = ConfigVarStr("PICK")
+    consumed = []
+
+    def pick_options_func(name):
+        for i in range(40):
+            consumed.append(i)
+            yield f"{name}_{i}", f"option {i}"
+
+    cv_pick.options_spec = OptionsSpec(func=pick_options_func, args=(cv_name,), page_size=16)
+
+    relational_constraints = {
+        Implies(cv_name == "y", cv_pick != f"y_{i}"): f"y_{i} is incompatible with y"
+        for i in range(16)
+    }
+    Stage("Name", "name", widget=FakeStageWidget(), varlist=[cv_name])
+    Stage("Pick", "pick", widget=FakeStageWidget(), varlist=[cv_pick], parent=Stage.first())
+    csp.initialize(cvars, relational_constraints, Stage.first())
+
+    async def assign_and_wait(name):
+        cv_name.value = name
+        num_consumed = len(consumed)
+        while cv_pick.options_pending:
+            await asyncio.sleep(0)
+        return num_consumed
+
+    return cv_pick, assign_and_wait
+
+
+def test_streamed_options_of_infinite_domain_var():
+    # Checking the assignment reads only the first page, which is feasible, so the remaining
+    # options are still streamed once the assignment is registered.
+    cv_pick, assign_and_wait = _build_streaming_infinite_domain()
+    assert asyncio.run(assign_and_wait("x")) == 16
+    assert cv_pick.options == [f"x_{i}" for i in range(40)]
+
+    # Otherwise, the options are read in full to check their feasibility.
+    cv_pick, assign_and_wait = _build_streaming_infinite_domain()
+    assert asyncio.run(assign_and_wait("y")) == 40
+    assert cv_pick.valid_options == [f"y_{i}" for i in range(16, 40)]
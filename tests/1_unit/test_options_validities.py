@@ -0,0 +1,65 @@
+import pytest
+from ProConPy.options_validities import OptionsValidities
+
+
+def test_dict_behavior():
+    validities = OptionsValidities(["a", "b", "c"], {"a": True, "b": False})
+    assert validities["a"] is True
+    assert validities["b"] is False
+    assert validities["c"] is None
+    assert validities.get("d") is None
+    assert list(validities) == ["a", "b", "c"]
+    assert dict(validities) == {"a": True, "b": False, "c": None}
+    assert validities == {"a": True, "b": False, "c": None}
+
+    validities["c"] = True
+    assert validities.all_evaluated()
+    with pytest.raises(TypeError):
+        del validities["a"]
+
+
+def test_bitwise_operations():
+    options = [f"opt{i}" for i in range(200)]
+    validities = OptionsValidities(options, {opt: i % 3 == 0 for i, opt in enumerate(options)})
+
+    assert validities.count_valid() == 67
+    assert validities.valid_options() == options[::3]
+    assert validities.first_valid() == "opt0"
+
+    # derived instances share the options tuple and compare bitwise
+    other = validities.with_validities({opt: i % 3 == 0 for i, opt in enumerate(options)})
+    assert other.options is validities.options
+    assert other == validities
+    other["opt0"] = False
+    other["opt1"] = True
+    assert other != validities
+    assert list(other.changed_indices(validities)) == [0, 1]
+    assert other.first_valid() == "opt1"
+
+
+def test_extended():
+    validities = OptionsValidities(["a", "b"], {"a": False, "b": True})
+    extended = validities.extended(["c", "d"], {"c": True})
+    assert dict(extended) == {"a": False, "b": True, "c": True, "d": None}
+    assert extended.valid_options() == ["b", "c"]
+    assert not extended.same_options(validities)
+    assert dict(validities) == {"a": False, "b": True}
+
+
+def test_extend_in_place():
+    validities = OptionsValidities(["a", "b"], {"a": False, "b": True})
+    options, other = validities.options, validities.with_validities()
+    validities.extend(["c", "d"], {"c": True})
+    assert validities.options is options
+    assert dict(validities) == {"a": False, "b": True, "c": True, "d": None}
+    assert validities.valid_options() == ["b", "c"]
+    # instances sharing the options are extended as well, with the new options unevaluated
+    assert dict(other) == {"a": None, "b": None, "c": None, "d": None}
+
+
+def test_duplicate_options():
+    with pytest.raises(AssertionError):
+        OptionsValidities(["a", "b", "a"])
+    validities = OptionsValidities(["a", "b"], {"a": True})
+    with pytest.raises(AssertionError):
+        validities.extended(["c", "b"])
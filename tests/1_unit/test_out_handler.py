@@ -0,0 +1,115 @@
+"""Unit tests for the logging output handler that displays logs in an Output widget."""
+
+import asyncio
+import logging
+
+from ProConPy.out_handler import OutHandler
+
+
+class _FakeOutput:
+    """Minimal stand-in for the ipywidgets Output widget."""
+
+    def __init__(self):
+        self._outputs = ()
+        self.num_updates = 0
+
+    @property
+    def outputs(self):
+        return self._outputs
+
+    @outputs.setter
+    def outputs(self, value):
+        self._outputs = value
+        self.num_updates += 1
+
+    def clear_output(self):
+        self.outputs = ()
+
+
+class _CountingFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(message)s")
+        self.count = 0
+
+    def format(self, record):
+        self.count += 1
+        return super().format(record)
+
+
+def _build(**kwargs):
+    handler = OutHandler(**kwargs)
+    handler.out._widget = _FakeOutput()
+    handler.setFormatter(_CountingFormatter())
+    logger = logging.getLogger(f"test_out_handler_{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return handler, logger
+
+
+def _displayed_lines(handler):
+    return handler.out._widget.outputs[0]["text"].splitlines()
+
+
+def test_ring_buffer():
+    handler, logger = _build(max_records=3, flush_interval=0.0)
+    handler.setLevel(logging.INFO)
+
+    for i in range(5):
+        logger.info("record %d", i)
+        logger.debug("skipped %d", i)
+
+    # Only the most recent records are displayed, the most recent first.
+    assert _displayed_lines(handler) == ["record 4", "record 3", "record 2"]
+    # Records below the level of the handler are never formatted.
+    assert handler.formatter.count == 5
+
+    handler.clear_logs()
+    assert handler.out._widget.outputs == ()
+
+
+def test_throttled_flush():
+    handler, logger = _build(flush_interval=0.05)
+
+    async def log_burst():
+        for i in range(100):
+            logger.info("record %d", i)
+        num_updates = handler.out._widget.num_updates
+        await asyncio.sleep(0.1)
+        return num_updates
+
+    num_updates_during_burst = asyncio.run(log_burst())
+
+    # The first record is flushed right away, and the rest at once after the flush interval.
+    assert num_updates_during_burst == 1
+    assert handler.out._widget.num_updates == 2
+    assert len(_displayed_lines(handler)) == 100
+
+
+def test_module_loggers_reach_widget():
+    handler = OutHandler(flush_interval=0.0)
+    handler.out._widget = _FakeOutput()
+    root = logging.getLogger()
+    level = root.level
+    handler.attach_to_root_logger()
+    try:
+        root.setLevel(logging.INFO)
+        # Log the way the other modules do, e.g., case_tools:
+        logging.getLogger("\t" + "case_tools").info("case created")
+        assert _displayed_lines(handler) == ["INFO:\tcase_tools:case created"]
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(level)
+
+
+def test_headless_logs_reach_console(capsys):
+    handler = OutHandler()
+    root = logging.getLogger()
+    level = root.level
+    handler.attach_console_handler()
+    try:
+        logging.getLogger("\t" + "case_tools").info("case created")
+        assert "INFO:\tcase_tools:case created" in capsys.readouterr().err
+    finally:
+        root.removeHandler(handler._console_handler)
+        root.setLevel(level)
@@ -0,0 +1,66 @@
+"""Unit tests for the content-addressed cache of runoff to ocean mapping files."""
+
+import json
+
+import pytest
+
+from visualCaseGen.custom_widget_types import rof_ocn_map_cache as cache
+from visualCaseGen.custom_widget_types.case_tools import run_command
+from visualCaseGen.custom_widget_types.runoff_mapping_generator import gen_rof_maps_cmd
+
+
+@pytest.fixture
+def meshes(tmp_path, monkeypatch):
+    monkeypatch.setenv(cache.CACHE_DIR_ENV_VAR, (tmp_path / "cache").as_posix())
+    rof_mesh, ocn_mesh = tmp_path / "rof_mesh.nc", tmp_path / "ocn_mesh.nc"
+    rof_mesh.write_bytes(b"rof mesh")
+    ocn_mesh.write_bytes(b"ocn mesh")
+    return rof_mesh, ocn_mesh
+
+
+def test_store_and_fetch(tmp_path, meshes):
+    nn_map, nnsm_map = tmp_path / "a_nn.nc", tmp_path / "a_nnsm_r300_f1000.nc"
+    nn_map.write_text("nn")
+    nnsm_map.write_text("nnsm")
+
+    assert cache.lookup(*meshes, 300.0, 1000.0) is None
+    assert cache.fetch(*meshes, 300.0, 1000.0, tmp_path / "x", tmp_path / "y") is False
+
+    cache.store(*meshes, 300.0, 1000.0, nn_map, nnsm_map)
+    assert cache.cached_params(*meshes) == [(300.0, 1000.0)]
+    assert cache.lookup(*meshes, 300.0, 1000.0) is not None
+    assert cache.lookup(*meshes, 300.0, 500.0) is None
+
+    # Entries are keyed by the mesh contents, not paths
+    mesh_copy = tmp_path / "copy" / "ocn.nc"
+    mesh_copy.parent.mkdir()
+    mesh_copy.write_bytes(b"ocn mesh")
+    out_dir = tmp_path / "mapping"
+    out_dir.mkdir()
+    nn_dst, nnsm_dst = out_dir / "b_nn.nc", out_dir / "b_nnsm.nc"
+    assert cache.fetch(meshes[0], mesh_copy, 300, 1000, nn_dst, nnsm_dst) is True
+    assert nn_dst.read_text() == "nn" and nnsm_dst.read_text() == "nnsm"
+
+    # Rewriting the fetched files in place, e.g., by gen_rof_maps, leaves the cache intact
+    nn_dst.write_text("regenerated nn")
+    cached_nn_map, _ = cache.lookup(meshes[0], mesh_copy, 300, 1000)
+    assert cached_nn_map.read_text() == "nn"
+
+    # Changing a mesh invalidates its entries
+    mesh_copy.write_bytes(b"modified ocn mesh")
+    assert cache.lookup(meshes[0], mesh_copy, 300, 1000) is None
+
+
+
+def test_gen_rof_maps_cmd(tmp_path):
+    # The mapping generator is run in a separate python process, with the arguments quoted
+    cmd = gen_rof_maps_cmd(output_dir=tmp_path / "it's", rmax=300.0, fold=1000.0)
+    cmd = cmd.replace(
+        "from mom6_forge import mapping; mapping.gen_rof_maps",
+        "import json; (lambda **kwargs: print(json.dumps(kwargs)))",
+    )
+    result = run_command(cmd)
+    assert result.returncode == 0
+    assert json.loads(result.stdout) == {
+        "output_dir": (tmp_path / "it's").as_posix(), "rmax": 300.0, "fold": 1000.0
+    }
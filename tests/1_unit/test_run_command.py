@@ -0,0 +1,67 @@
+"""Unit tests for running external commands with streamed outputs."""
+
+import asyncio
+import time
+
+import pytest
+
+from visualCaseGen.custom_widget_types.case_tools import run_command, run_command_async
+
+
+class _RecordingOutput:
+    """A stand-in for the Output widget recording the lines printed, and creating the given
+    file once the line "first" is displayed."""
+
+    def __init__(self, capsys, flag):
+        self.capsys = capsys
+        self.flag = flag
+        self.lines = []
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        self.lines.extend(self.capsys.readouterr().out.splitlines())
+        if "first" in self.lines:
+            self.flag.touch()
+
+
+def test_run_command_streams_output(capsys, tmp_path):
+    flag = tmp_path / "first_displayed"
+    out = _RecordingOutput(capsys, flag)
+    # The command prints its second line only after the first one is displayed, so it would
+    # time out if the output were not streamed.
+    cmd = f"echo first; echo oops >&2; while [ ! -e {flag} ]; do sleep 0.05; done; echo second"
+    result = run_command(cmd, out, timeout=30)
+    assert result.returncode == 0
+    assert result.stdout == "first\nsecond" and result.stderr == "oops"
+    assert sorted(out.lines) == ["first", "oops", "second"]
+    assert out.lines.index("first") < out.lines.index("second")
+
+
+def test_run_sync_in_running_loop():
+    async def call_run_sync():
+        run_command("true")
+
+    with pytest.raises(RuntimeError, match="Cannot block a running event loop"):
+        asyncio.run(call_run_sync())
+
+
+def test_run_command_timeout():
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="did not finish"):
+        run_command("sleep 10", timeout=0.2)
+    assert time.perf_counter() - start < 5
+
+
+def test_run_command_cancel():
+    async def cancel_soon():
+        task = asyncio.ensure_future(run_command_async("sleep 10"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.perf_counter()
+    asyncio.run(cancel_soon())
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,77 @@
+"""Unit tests for applying multiple xml changes to a case at once."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from visualCaseGen.custom_widget_types import case_tools
+from visualCaseGen.custom_widget_types.case_tools import xmlchange_cmds, xmlchanges
+from tests.utils import FakeCase, FakeCime
+
+
+@pytest.fixture
+def commands_run(monkeypatch, tmp_path):
+    """Point CASEROOT to a temporary directory and record the shell commands run."""
+    monkeypatch.setattr(case_tools, "cvars", {"CASEROOT": SimpleNamespace(value=str(tmp_path))})
+    cmds = []
+    monkeypatch.setattr(
+        case_tools.subprocess,
+        "run",
+        lambda cmd, **kwargs: cmds.append(cmd) or SimpleNamespace(returncode=0),
+    )
+    return cmds
+
+
+@pytest.fixture
+def case_status(monkeypatch):
+    """Record the CaseStatus entries appended."""
+    entries = []
+    monkeypatch.setattr(
+        case_tools, "_append_case_status", lambda caseroot, msg: entries.append(msg)
+    )
+    return entries
+
+
+def test_xmlchange_cmds():
+    changes = [
+        ("NTASKS_OCN", 128), ("OCN_NX", 10), ("CUSTOM_OPTS", "a,b"), ("RUN_REFDATE", "a b")
+    ]
+    # Values with commas are passed via --val so that xmlchange does not split them
+    assert xmlchange_cmds(changes) == [
+        "./xmlchange 'NTASKS_OCN=128,OCN_NX=10,RUN_REFDATE=a b'",
+        "./xmlchange --id CUSTOM_OPTS --val a,b",
+    ]
+    assert xmlchange_cmds(changes[:1], is_non_local=True) == [
+        "./xmlchange NTASKS_OCN=128 --non-local"
+    ]
+
+
+def test_xmlchanges_in_process(commands_run, case_status):
+    case = FakeCase(known_vars={"OCN_NX", "OCN_NY"})
+    cime = FakeCime(case)
+    xmlchanges([("OCN_NX", 10), ("OCN_NY", 20)], cime=cime)
+    assert cime.read_only == [False]
+    assert case.values == {"OCN_NX": "10", "OCN_NY": "20"}
+    assert case.num_flushes == 1
+    assert commands_run == []
+    # The equivalent xmlchange commands are recorded as if they were run
+    assert case.recorded_cmds == [["./xmlchange", "OCN_NX=10,OCN_NY=20"]]
+    assert case_status == ["<command> ./xmlchange OCN_NX=10,OCN_NY=20 </command>"]
+
+
+def test_xmlchanges_fallback(commands_run):
+    # An unknown variable aborts the in-process application before anything is written
+    case = FakeCase(known_vars={"OCN_NX"})
+    xmlchanges([("OCN_NX", 10), ("OCN_NY", 20)], cime=FakeCime(case))
+    assert case.num_flushes == 0
+    assert commands_run == ["./xmlchange OCN_NX=10,OCN_NY=20"]
+
+    # Without a CIME interface, the changes are applied via a single xmlchange command
+    commands_run.clear()
+    xmlchanges([("OCN_NX", 10), ("OCN_NY", 20)])
+    assert commands_run == ["./xmlchange OCN_NX=10,OCN_NY=20"]
+
+    # Nothing is executed if do_exec is False
+    commands_run.clear()
+    xmlchanges([("OCN_NX", 10)], do_exec=False, cime=FakeCime(case))
+    assert commands_run == [] and case.num_flushes == 0
@@ -1,4 +1,3 @@
-from ipywidgets import Widget
 import shutil
 from pathlib import Path
 from ProConPy.config_var import ConfigVar
@@ -6,8 +5,10 @@ from ProConPy.config_var import ConfigVar
 def frontend_change(cvar, new_val):
     """This method simulates a frontend value change for a widget. It is useful for testing purposes."""
 
+    from ipywidgets import Widget
+
     assert isinstance(cvar, ConfigVar), "cvar must be an instance of ConfigVar"
-    widget = cvar._widget
+    widget = cvar.widget
     assert isinstance(widget, Widget), "widget must be an instance of ipywidgets.Widget"
 
     widget.value = new_val
@@ -46,3 +47,65 @@ def safe_create_case(srcroot, case_creator):
             Path(srcroot) / "ccs_config/component_grids_nuopc.xml.bak",
             Path(srcroot) / "ccs_config/component_grids_nuopc.xml",
         )
+
+
+class FakeStageWidget:
+    """Minimal stand-in for StageWidget exercising only what Stage calls on its widget."""
+
+    def __init__(self):
+        self._stage = None
+
+    @property
+    def stage(self):
+        return self._stage
+
+    @stage.setter
+    def stage(self, value):
+        self._stage = value
+
+    def add_child_stages(self, first_child=None):
+        pass
+
+    def remove_child_stages(self):
+        pass
+
+
+class FakeCase:
+    """A stand-in for the CIME Case object recording the values set, the flushes, and the
+    commands recorded. If known_vars is given, only those variables can be set."""
+
+    def __init__(self, rundir=None, known_vars=None):
+        self.rundir = rundir
+        self.known_vars = known_vars
+        self.values = {}
+        self.num_flushes = 0
+        self.recorded_cmds = []
+
+    def get_value(self, var):
+        assert var == "RUNDIR"
+        return str(self.rundir)
+
+    def set_value(self, var, val):
+        if self.known_vars is not None and var not in self.known_vars:
+            return None
+        self.values[var] = val
+        return val
+
+    def flush(self):
+        self.num_flushes += 1
+
+    def record_cmd(self, cmd=None, init=False):
+        self.recorded_cmds.append(cmd)
+
+
+class FakeCime:
+    """A stand-in for the CIME interface returning the given case, and recording whether it was
+    opened read-only."""
+
+    def __init__(self, case):
+        self.case = case
+        self.read_only = []
+
+    def get_case(self, caseroot, read_only=True, non_local=False):
+        self.read_only.append(read_only)
+        return self.case
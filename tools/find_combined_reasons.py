@@ -34,7 +34,7 @@ def set_preliminary_vars():
 
 def valid_options(var):
     """Returns the valid options for a ConfigVar"""
-    return [opt for opt in var.options if var._options_validities[opt] is True]
+    return [opt for opt, validity in var.iter_options_validities() if validity is True]
 
 
 def main(ntrial=10, nselect=5, minreason=3):
@@ -82,8 +82,8 @@ def main(ntrial=10, nselect=5, minreason=3):
 
             for comp_other in set(comps) - set([comp]):
                 var = cvars[comp_other]
-                for option in var.options:
-                    if var._options_validities[option] is False:
+                for option, validity in var.iter_options_validities():
+                    if validity is False:
                         err_msg = csp.retrieve_error_msg(var, option)
                         nreason = (
                             err_msg.count(".") - 1
@@ -16,7 +16,7 @@ def get_models(compset_lname):
     for comp_class, compset_component in compset_components.items():
         if not compset_component.startswith('X'):
             phys = compset_component.split('%')[0]
-            model = next((model for model in cime.models[comp_class] if phys in cime.comp_phys[model]), None)
+            model = cime.phys_model.get((comp_class, phys))
             model_list.append(model)
     return model_list
 
@@ -41,11 +41,7 @@ def compset_pattern_finder():
 
     # From never, remove the models that are in the same component class as the model:
     for model, never_coupled in never.items():
-        comp_class = None
-        for cc, models in cime.models.items():
-            if model in models:
-                comp_class = cc
-                break
+        comp_class = cime.model_comp_class.get(model)
         if comp_class:
             never[model] = never_coupled - set(cime.models[comp_class])
 
@@ -1,2 +1,10 @@
-from visualCaseGen.gui import GUI 
-gui = GUI()
\ No newline at end of file
+def __getattr__(name):
+    """Construct the GUI upon first access, i.e., `from visualCaseGen import gui`, rather than at
+    import time, so that the backend modules of visualCaseGen can be imported without the GUI."""
+    if name == "gui":
+        from visualCaseGen.gui import GUI
+
+        # Importing the gui submodule above binds its name to this package. Rebind it to the GUI.
+        globals()["gui"] = GUI()
+        return globals()["gui"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -40,6 +40,13 @@ class CIME_interface:
         are 4xCO2, 1PCT, etc.
     resolutions: list of tuples
         List of resolutions (alias, compset, not_compset)
+    phys_model : dict of str (with tuple keys)
+        Reverse lookup from (component class, component physics) to the model that owns it, e.g.,
+        phys_model["ATM", "CAM60"] = "cam"
+    model_comp_class : dict of str (with str keys)
+        Reverse lookup from model to its component class, e.g., model_comp_class["cam"] = "ATM"
+    compset_descriptions : dict of str (with str keys)
+        A mapping from compset alias to its (pre-rendered) long description.
     """
 
     def __init__(self, cesmroot=None):
@@ -61,8 +68,14 @@ class CIME_interface:
         self.comp_phys_desc = dict()  # component physics descriptions
         self.comp_options = dict()  # component options(4xCO2, 1PCT, etc.)
         self.comp_options_desc = dict()  # component options descriptions
+        self.phys_model = dict()  # reverse lookup: (component class, component physics) -> model
+        self.model_comp_class = dict()  # reverse lookup: model -> component class
+        self._phys_desc = dict()  # reverse lookup: component physics -> description
+        self._phys_opt_desc = dict()  # reverse lookup: (component physics, option) -> description
         self.resolutions = []  # model grids (alias, compset, not_compset)
         self.compsets = dict()  # default compsets where keys are aliases
+        self.compset_descriptions = dict()  # compset long descriptions where keys are aliases
+        self._compsets_by_filter = dict()  # inverted index: comp_class -> filter -> set of aliases
         self._files = None
         self._grids_obj = None
         self.din_loc_root = None
@@ -76,6 +89,7 @@ class CIME_interface:
         self._retrieve_domains_and_resolutions()
         self._retrieve_maps()
         self._retrieve_compsets()
+        self._index_compsets()
         self._retrieve_machines()
         self._retrieve_clm_data()
 
@@ -226,6 +240,13 @@ class CIME_interface:
         self.comp_phys[model] = comp_physics
         self.comp_phys_desc[model] = comp_physics_desc
 
+        # Reverse lookups (If a physics or option is listed more than once, the first occurrence wins.)
+        self.model_comp_class[model] = comp_class
+        for phys_ix, phys in enumerate(comp_physics):
+            self.phys_model.setdefault((comp_class, phys), model)
+            if phys_ix < len(comp_physics_desc):
+                self._phys_desc.setdefault(phys, comp_physics_desc[phys_ix])
+
         # Model physics options
         for phys in comp_physics:
             # options are defined for this physics.
@@ -240,6 +261,8 @@ class CIME_interface:
                 self.comp_options_desc[phys] = (
                     phys_descriptions  # phys options descriptions
                 )
+                for opt, opt_desc in reversed(list(zip(comp_physics_options[phys], phys_descriptions))):
+                    self._phys_opt_desc[(phys, opt)] = opt_desc
             else:  # no options defined for this model physics
                 logger.debug("No options defined for physics %s...", phys)
                 self.comp_options[phys] = []
@@ -259,37 +282,29 @@ class CIME_interface:
             long description of the component string, e.g., "CAM: Specialized SCAM: Super-parameterized"
         """
 
-        # Component physics
+        # Component physics and its description
         comp_phys = comp_str.split("%")[0]
-
-        # Find model for this component physics
-        model = None
-        for model in self.comp_phys:
-            if comp_phys in self.comp_phys[model]:
-                break
-        assert model is not None, f"Model not found for {comp_str}"
-
-        # Component physics description
-        try:
-            comp_phys_ix = self.comp_phys[model].index(comp_phys)
-            comp_phys_desc = ": " + self.comp_phys_desc[model][comp_phys_ix]
-        except (KeyError, IndexError, ValueError):
-            comp_phys_desc = ""
+        comp_phys_desc = self._phys_desc.get(comp_phys)
+        comp_phys_desc = "" if comp_phys_desc is None else ": " + comp_phys_desc
 
         # Component options
-        try:
-            comp_opt = comp_str.split("%")[1]
-            comp_opt_ix = self.comp_options[comp_phys].index(comp_opt)
-            comp_opt_desc = ": " + self.comp_options_desc[comp_phys][comp_opt_ix]
-        except (KeyError, IndexError, ValueError):
+        comp_opt = comp_str.split("%")[1] if "%" in comp_str else ""
+        comp_opt_desc = self._phys_opt_desc.get((comp_phys, comp_opt))
+        if comp_opt_desc is None:
             comp_opt = ""
             comp_opt_desc = ""
+        else:
+            comp_opt_desc = ": " + comp_opt_desc
 
         return ' | ' + comp_phys + comp_phys_desc + ' ' + comp_opt + comp_opt_desc
 
     def long_compset_desc(self, compset):
         """Generates a long description of a given compset long name."""
 
+        # Standard compset descriptions are rendered once at initialization.
+        if (desc := self.compset_descriptions.get(compset.alias)) is not None:
+            return desc
+
         compset_lname_split = compset.lname.split("_")
         desc = "Initialization: " + compset_lname_split[0]
         desc += ''.join([self.long_comp_desc(comp_str) for comp_str in compset_lname_split[1:8]])
@@ -703,6 +718,52 @@ class CIME_interface:
                         self.sci_supported_grids[alias].append(c.get(snode, "grid"))
                     self.compsets[alias] = Compset(alias, lname, component)
 
+    def _index_compsets(self):
+        """Builds the lookup tables used to filter standard compsets. This method is called by the
+        __init__ method after the compsets are retrieved. The long description of each compset is
+        rendered once. For each component class, an inverted index maps each filter value (a model
+        name or "none") to the set of compset aliases that the filter admits, so that filtering
+        reduces to set intersections."""
+
+        for alias, compset in self.compsets.items():
+            self.compset_descriptions[alias] = self.long_compset_desc(compset)
+
+        for comp_class in self.comp_classes:
+            index = {}
+            for model in self.models[comp_class]:
+                index[model] = {
+                    alias
+                    for alias, compset in self.compsets.items()
+                    if model.upper() in compset.lname
+                }
+            index["none"] = {
+                alias
+                for alias, compset in self.compsets.items()
+                if "S" + comp_class in compset.lname or "X" + comp_class in compset.lname
+            }
+            self._compsets_by_filter[comp_class] = index
+
+    def get_compsets_by_filter(self, comp_class, comp_filter):
+        """Returns the set of compset aliases admitted by a given component filter.
+
+        Parameters
+        ----------
+        comp_class : str
+            component class, e.g., "ATM", "ICE", etc.
+        comp_filter : str
+            a model name, e.g., "cam", or "none" for stub/excluded components, or "any".
+
+        Returns
+        -------
+        set or None
+            The set of compset aliases that match the filter. None if the filter is "any",
+            i.e., if the filter doesn't exclude any compsets.
+        """
+
+        if comp_filter == "any":
+            return None
+        return self._compsets_by_filter[comp_class].get(comp_filter, set())
+
     def _retrieve_machines(self):
 
         from CIME.XML.machines import Machines
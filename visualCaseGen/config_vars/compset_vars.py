@@ -3,6 +3,7 @@
 import logging
 from ProConPy.out_handler import handler as owh
 from ProConPy.config_var import cvars
+from ProConPy.csp_solver import csp
 from ProConPy.config_var_str import ConfigVarStr
 from ProConPy.config_var_str_ms import ConfigVarStrMS
 
@@ -43,7 +44,7 @@ def initialize_standard_compset_variables(cime):
         )
 
     # Compset Alias
-    cv_compset_alias = ConfigVarStrMS("COMPSET_ALIAS")
+    cv_compset_alias = ConfigVarStrMS("COMPSET_ALIAS", lazy_validities=True)
 
     def reset_all_comp_vars():
         """Reset all component variables to None. This gets called every time the compset alias is changed."""
@@ -59,21 +60,24 @@ def initialize_standard_compset_variables(cime):
 
     @owh.out.capture()
     def compset_alias_tracker(change):
-        """If the compset alias is changed, then set the compset lname automatically."""
+        """If the compset alias is changed, then set the compset lname automatically.
+        The component variables are assigned in a single batch so that the assignments are
+        checked and propagated at once rather than one at a time."""
         new_compset_alias = change['new']
-        reset_all_comp_vars()
-        if new_compset_alias not in [None, ()]:
-            new_compset_lname = cime.compsets[new_compset_alias].lname
-            compset_lname_parts = cime.get_components_from_compset_lname(new_compset_lname)
-            for comp_class in cime.comp_classes:
-                compset_lname_x = compset_lname_parts.get(comp_class, None)
-                assert compset_lname_x is not None, f"Component for {comp_class} not found in {new_compset_lname}"
-                phys = compset_lname_x.split("%")[0]
-                opt = compset_lname_x.split("%")[1] if "%" in compset_lname_x else None
-                cvars[f'COMP_{comp_class}'].value = next((model for model in cime.models[comp_class] if phys in cime.comp_phys[model]))
-                cvars[f'COMP_{comp_class}_PHYS'].value = phys
-                cvars[f'COMP_{comp_class}_OPTION'].value = opt
-            cvars['COMPSET_LNAME'].value = new_compset_lname
+        with csp.batch():
+            reset_all_comp_vars()
+            if new_compset_alias not in [None, ()]:
+                new_compset_lname = cime.compsets[new_compset_alias].lname
+                compset_lname_parts = cime.get_components_from_compset_lname(new_compset_lname)
+                for comp_class in cime.comp_classes:
+                    compset_lname_x = compset_lname_parts.get(comp_class, None)
+                    assert compset_lname_x is not None, f"Component for {comp_class} not found in {new_compset_lname}"
+                    phys = compset_lname_x.split("%")[0]
+                    opt = compset_lname_x.split("%")[1] if "%" in compset_lname_x else None
+                    cvars[f'COMP_{comp_class}'].value = cime.phys_model[comp_class, phys]
+                    cvars[f'COMP_{comp_class}_PHYS'].value = phys
+                    cvars[f'COMP_{comp_class}_OPTION'].value = opt
+                cvars['COMPSET_LNAME'].value = new_compset_lname
 
 
     cv_compset_alias.observe(compset_alias_tracker, names="value", type="change")
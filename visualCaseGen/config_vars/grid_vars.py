@@ -24,7 +24,7 @@ def initialize_grid_variables(cime):
 
 def initialize_standard_grid_variables(cime):
 
-    ConfigVarStrMS("GRID")
+    ConfigVarStrMS("GRID", lazy_validities=True)
 
     # component grids
     ConfigVarStr("MASK_GRID")
@@ -1,17 +1,14 @@
 import os
 import logging
 from pathlib import Path
-import subprocess
-import shutil
-from xml.etree.ElementTree import SubElement
-import xml.etree.ElementTree as ET
-import xarray as xr
 import math 
 
 from ProConPy.config_var import cvars
-from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+from ProConPy.event_loop import running_event_loop
+from visualCaseGen.nc_metadata import global_attrs, dim_size
 from visualCaseGen.custom_widget_types.dummy_output import DummyOutput
-from visualCaseGen.custom_widget_types.case_tools import xmlchange, run_case_setup, append_user_nl, is_ccs_config_writeable
+from visualCaseGen.custom_widget_types.case_tools import is_ccs_config_writeable, dedup_user_nl_blocks
+from visualCaseGen.custom_widget_types.case_plan import CasePlan, RUNDIR, revert_ccs_config
 
 COMMENT = "\033[01;96m"  # bold, cyan
 SUCCESS = "\033[1;32m"  # bold, green
@@ -42,34 +39,23 @@ class CaseCreator:
         self._allow_xml_override = allow_xml_override
         self._add_grids_to_ccs_config = add_grids_to_ccs_config # By default, visualCaseGen assigns grids through ccs_config, if not possible (which can happen if the user does not own the sandbox), it is possible to apply grid changes through xmlchanges instead.
         assert is_ccs_config_writeable or not add_grids_to_ccs_config, "Cannot write to ccs_config xml files. Please set add_grids_to_ccs_config to False to apply grid changes through xmlchanges."
+        self._plan = None # the CasePlan being built, see plan_case
+        self._queued_xmlchanges = [] # (var, val) pairs to be applied at once, see _xmlchange
+        self._xmlchange_headers = {} # messages to log before the queued xml changes, by index
+        self._staged_user_nl_changes = {} # model -> blocks of user_nl changes, see _apply_user_nl_changes
+        self._cached_plan = None # (key, plan) displayed by the last Show Commands click
+        self._ccs_config_journal = [] # ccs_config changes to revert if case creation fails
 
     def revert_launch(self, do_exec=True):
         """This function is called when the case creation fails. It reverts the changes made
         to the ccs_config xml files."""
-        if self._add_grids_to_ccs_config:
-            mg = "ccs_config/modelgrid_aliases_nuopc.xml"
-            if (Path(self._cime.srcroot) / f"{mg}.orig").exists():
-                shutil.move(
-                    Path(self._cime.srcroot) / f"{mg}.orig",
-                    Path(self._cime.srcroot) / f"{mg}"
-                )
-            cg = "ccs_config/component_grids_nuopc.xml"
-            if (Path(self._cime.srcroot) / f"{cg}.orig").exists():
-                shutil.move(
-                    Path(self._cime.srcroot) / f"{cg}.orig",
-                    Path(self._cime.srcroot) / f"{cg}"
-                )
+        revert_ccs_config(self._ccs_config_journal)
 
-    def _remove_orig_xml_files(self):
+    def _keep_ccs_config_changes(self):
         """This function is called when the case creation and modification process is successful.
-        It removes the backup xml files created before modifying the ccs_config xml files."""
-
-        mg = "ccs_config/modelgrid_aliases_nuopc.xml"
-        if (Path(self._cime.srcroot) / f"{mg}.orig").exists():
-            os.remove(Path(self._cime.srcroot) / f"{mg}.orig")
-        cg = "ccs_config/component_grids_nuopc.xml"
-        if (Path(self._cime.srcroot) / f"{cg}.orig").exists():
-            os.remove(Path(self._cime.srcroot) / f"{cg}.orig")
+        It discards the record of the changes made to the ccs_config xml files, so that they are
+        no longer reverted."""
+        self._ccs_config_journal.clear()
 
     def _is_non_local(self):
         """Check if the case is being created on a machine different from the one
@@ -95,22 +81,144 @@ class CaseCreator:
         ):
             raise RuntimeError("No project specified yet.")
 
-    def create_case(self, do_exec):
-        """Create and configure the case by running the necessary tools.
+    def create_case(self, do_exec, timeout=None):
+        """Create and configure the case by building the case plan and executing it.
+
+        Within a running event loop, e.g., in a notebook cell, the case is created without
+        blocking the kernel in a task running create_case_async, which is returned and may be
+        awaited. If do_exec is False, the commands are printed right away.
 
         Parameters
         ----------
-        cime : CIME
-            The CIME instance.
         do_exec : bool, optional
             If True, print and execute the commands. If False, only print them
+        timeout : float, optional
+            The maximum time, in seconds, to wait for each CIME tool, e.g., case.setup.
         """
 
+        loop = running_event_loop()
+        if do_exec and loop is not None:
+            return loop.create_task(self.create_case_async(do_exec, timeout))
+
+        plan = self._begin_case_creation(do_exec)
+        plan.execute(self._cime, do_exec, self._out, journal=self._ccs_config_journal, timeout=timeout)
+        self._end_case_creation(do_exec)
+
+    async def create_case_async(self, do_exec, timeout=None):
+        """Create and configure the case without blocking the event loop, e.g., that of the
+        notebook kernel, while the CIME tools run. The outputs of the tools are streamed as they
+        run. Cancelling the awaiting task terminates the running tool. See create_case for the
+        parameters."""
+
+        plan = self._begin_case_creation(do_exec)
+        await plan.execute_async(
+            self._cime, do_exec, self._out, journal=self._ccs_config_journal, timeout=timeout
+        )
+        self._end_case_creation(do_exec)
+
+    def _begin_case_creation(self, do_exec):
+        """Perform final checks and return the plan of the case to create."""
+
         self._out.clear_output()
 
         # Perform final checks before creating the case:
         self._final_checks()
 
+        # Begin case creation:
+        with self._out:
+            print(f"{COMMENT}Creating case...{RESET}\n")
+
+        if do_exec:
+            return self.plan_case()
+
+        # Show Commands: always rebuild the plan, and keep it for the Create Case click that
+        # follows, so that the displayed commands are the ones executed.
+        self._cached_plan = None
+        plan = self.plan_case()
+        self._cached_plan = (self._plan_key(), plan)
+        return plan
+
+    def _end_case_creation(self, do_exec):
+        """Clean up after the case is created successfully."""
+        if do_exec:
+            if self._add_grids_to_ccs_config:
+                self._keep_ccs_config_changes()
+            cvars["CASE_CREATOR_STATUS"].value = "OK"
+            with self._out:
+                caseroot = cvars["CASEROOT"].value
+                print(
+                    f"{SUCCESS}Case created successfully at {caseroot}.{RESET}\n\n"
+                    f"{COMMENT}To further customize, build, and run the case, "
+                    f"navigate to the case directory in your terminal. To create "
+                    f"another case, restart the notebook.{RESET}\n"
+                )
+
+    def create_cases(self, members, do_exec=True, max_workers=4, clone=False, progress=None):
+        """Create multiple cases with the current configuration, e.g., the members of an
+        ensemble, concurrently. See case_ensemble.create_ensemble for the parameters.
+
+        Parameters
+        ----------
+        members : list of dict
+            The overrides of each case, e.g., {"CASEROOT": ..., "NINST": 2,
+            "user_nl": {"mom": {"DT": 900.0}}}. CASEROOT is required.
+
+        Returns
+        -------
+        list of MemberResult
+            The results, in the order of the members.
+        """
+        from visualCaseGen.custom_widget_types.case_ensemble import create_ensemble
+
+        self._out.clear_output()
+        with self._out:
+            print(f"{COMMENT}Creating {len(members)} cases...{RESET}\n")
+
+        results = create_ensemble(
+            self.plan_case(), members, self._cime, do_exec, max_workers, clone, progress, self._out,
+            self._ccs_config_journal,
+        )
+
+        if do_exec and self._add_grids_to_ccs_config:
+            if any(result.ok for result in results):
+                self._keep_ccs_config_changes()
+            else:
+                self.revert_launch()
+        with self._out:
+            for result in results:
+                if result.ok:
+                    print(f"{SUCCESS}Case created successfully at {result.caseroot}.{RESET}")
+                else:
+                    print(f"{ERROR}Error creating case at {result.caseroot}: {result.error}{RESET}")
+        return results
+
+    def _plan_key(self):
+        """Return a key identifying the configuration that a case plan is built from."""
+        return (
+            self._add_grids_to_ccs_config,
+            self._allow_xml_override,
+            self._is_non_local(),
+            tuple((name, repr(var.value)) for name, var in cvars.items()),
+        )
+
+    def plan_case(self):
+        """Build the plan to create and configure the case, i.e., the ccs_config edits, the
+        create_newcase arguments, the xml changes, the user_nl appends and the file copies,
+        as determined by the current values of the ConfigVars. The plan displayed by Show
+        Commands is reused by the next call only if the configuration has not changed in
+        between. Otherwise, the plan is rebuilt, since it also depends on the contents of files,
+        e.g., the topography, vertical grid, and mesh files, which may have changed since.
+
+        Returns
+        -------
+        CasePlan
+            The plan, which may be executed via CasePlan.execute, here or elsewhere.
+        """
+
+        cached, self._cached_plan = self._cached_plan, None
+        if cached is not None and cached[0] == self._plan_key():
+            return cached[1]
+
         # Determine compset:
         if cvars["COMPSET_MODE"].value == "Standard":
             compset = cvars["COMPSET_ALIAS"].value
@@ -139,31 +247,36 @@ class CaseCreator:
         else:
             raise RuntimeError(f"Unknown grid mode: {cvars['GRID_MODE'].value}")
 
-        # Begin case creation:
-        with self._out:
-            print(f"{COMMENT}Creating case...{RESET}\n")
+        ninst = 1 if cvars["NINST"].value is None else cvars["NINST"].value
+        self._plan = CasePlan(caseroot, ninst, self._is_non_local())
+        self._queued_xmlchanges = []
+        self._xmlchange_headers = {}
 
         # First, update ccs_config xml files to add custom grid information if needed:
         if self._add_grids_to_ccs_config:
-            self._update_ccs_config(do_exec)
+            self._update_ccs_config()
 
         # Run create_newcase
-        self._run_create_newcase(caseroot, compset, resolution, do_exec)
+        self._plan_create_newcase(caseroot, compset, resolution)
+
+        # Navigate to the case directory:
+        self._plan.add_message(f"{COMMENT}Navigating to the case directory:{RESET}\n\ncd {caseroot}\n")
 
         # If we don't pick the grids through ccs_config, use xml changes
         if not self._add_grids_to_ccs_config: 
-            self._update_grids_via_xmlchange(do_exec)
-
-        # Navigate to the case directory:
-        with self._out:
-            print(f"{COMMENT}Navigating to the case directory:{RESET}\n")
-            print(f"cd {caseroot}\n")
+            self._update_grids_via_xmlchange()
 
         # Apply case modifications, e.g., xmlchanges and user_nl changes
-        self._apply_all_xmlchanges(do_exec)
+        self._apply_all_xmlchanges()
+        if self._queued_xmlchanges:
+            self._plan.add_step(
+                "xmlchanges",
+                changes=[[var, str(val)] for var, val in self._queued_xmlchanges],
+                headers=self._xmlchange_headers,
+            )
 
         # Run case.setup
-        run_case_setup(do_exec, self._is_non_local(), self._out)
+        self._plan.add_step("case_setup")
 
         # Copy ww3 input files to RUNDIR if needed (only when the custom ocean grid is reused as
         # the wave grid, which is where the *.inp files are generated):
@@ -176,37 +289,23 @@ class CaseCreator:
             # copy all *.inp files under the ocnice grid directory to RUNDIR:
             inp_files = list(Path(custom_grid_path_val).glob("ocnice/*.inp"))
             if inp_files:
-                print(f"{COMMENT}Copying WW3 input files to the case RUNDIR{RESET}\n")
-                if do_exec:
-                    case = self._cime.get_case(caseroot.as_posix(), non_local=self._is_non_local())
-                    rundir = Path(case.get_value("RUNDIR"))
-                    if not os.access(rundir.as_posix(), os.W_OK):
-                        raise RuntimeError(
-                            f"Cannot write to {rundir}. Please check permissions for the case directory."
-                        )
-                    ww3_moddef_dir = rundir / "ww3_moddef_create"
-                    ww3_moddef_dir.mkdir(parents=True, exist_ok=True)
-                    for inp_file in inp_files:
-                        shutil.copy(inp_file, ww3_moddef_dir / inp_file.name)
+                self._plan.add_message(f"{COMMENT}Copying WW3 input files to the case RUNDIR{RESET}\n")
+                for inp_file in inp_files:
+                    self._plan.add_step(
+                        "copy",
+                        src=inp_file.as_posix(),
+                        dst=f"{RUNDIR}/ww3_moddef_create/{inp_file.name}",
+                    )
 
         # Apply user_nl changes
-        self._apply_all_namelist_changes(do_exec)
+        self._staged_user_nl_changes = {}
+        self._apply_all_namelist_changes()
+        self._plan_staged_user_nl_changes()
 
-        # Clean up:
-        if do_exec:
-            if self._add_grids_to_ccs_config:
-                self._remove_orig_xml_files()
-            cvars["CASE_CREATOR_STATUS"].value = "OK"
-            with self._out:
-                caseroot = cvars["CASEROOT"].value
-                print(
-                    f"{SUCCESS}Case created successfully at {caseroot}.{RESET}\n\n"
-                    f"{COMMENT}To further customize, build, and run the case, "
-                    f"navigate to the case directory in your terminal. To create "
-                    f"another case, restart the notebook.{RESET}\n"
-                )
+        plan, self._plan = self._plan, None
+        return plan
 
-    def _update_ccs_config(self, do_exec):
+    def _update_ccs_config(self):
         """Update the modelgrid_aliases and component_grids xml files with custom grid
         information if needed. This function is called before running create_newcase."""
 
@@ -236,12 +335,12 @@ class CaseCreator:
         if ocn_grid is None:
             raise RuntimeError("No ocean grid specified.")
 
-        self._update_modelgrid_aliases(custom_grid_path, ocn_grid, do_exec)
-        self._update_component_grids(custom_grid_path, ocn_grid, ocn_grid_mode, do_exec)
+        self._update_modelgrid_aliases(custom_grid_path, ocn_grid)
+        self._update_component_grids(custom_grid_path, ocn_grid, ocn_grid_mode)
 
-    def _update_modelgrid_aliases(self, custom_grid_path, ocn_grid, do_exec):
-        """Update the modelgrid_aliases xml file with custom resolution information.
-        This function is called before running create_newcase.
+    def _update_modelgrid_aliases(self, custom_grid_path, ocn_grid):
+        """Plan the update of the modelgrid_aliases xml file with custom resolution information.
+        This step precedes create_newcase.
 
         Parameters
         ----------
@@ -249,8 +348,6 @@ class CaseCreator:
             The path to the custom grid directory.
         ocn_grid : str
             The name of the custom ocean grid.
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
             """
 
         resolution_name = custom_grid_path.name
@@ -260,22 +357,6 @@ class CaseCreator:
         lnd_grid = cvars["CUSTOM_LND_GRID"].value
         rof_grid = cvars["CUSTOM_ROF_GRID"].value
 
-        # modelgrid_aliases xml file that stores resolutions:
-        srcroot = self._cime.srcroot
-        ccs_config_root = Path(srcroot) / "ccs_config"
-        assert (
-            ccs_config_root.exists()
-        ), f"ccs_config_root {ccs_config_root} does not exist."
-        modelgrid_aliases_xml = ccs_config_root / "modelgrid_aliases_nuopc.xml"
-        assert (
-            modelgrid_aliases_xml.exists()
-        ), f"modelgrid_aliases_xml {modelgrid_aliases_xml} does not exist."
-        modelgrid_aliases_xml = modelgrid_aliases_xml.as_posix()
-
-        # confirm that modelgrid_aliases xml file is writeable:
-        if not is_ccs_config_writeable(self._cime):
-            raise RuntimeError(f"Cannot write to {modelgrid_aliases_xml}.")
-
         # Construct the component grids string to be logged:
         component_grids_str = f' atm grid: "{atm_grid}" \n'
         component_grids_str += f' lnd grid: "{lnd_grid}" \n'
@@ -283,69 +364,10 @@ class CaseCreator:
         if rof_grid is not None and rof_grid != "":
             component_grids_str += f' rof grid: "{rof_grid}".\n'
 
-        # log the modification of modelgrid_aliases.xml:
-        with self._out:
-            print(
-                f'{BPOINT} Updating ccs_config/modelgrid_aliases_nuopc.xml file to include the new '
-                f'resolution "{resolution_name}" consisting of the following component grids.\n'
-                f'{component_grids_str}'
-            )
-
-        # Read in xml file and generate grids object file:
-        parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
-        grids_tree = ET.parse(modelgrid_aliases_xml, parser=parser)
-        grids_root = grids_tree.getroot()
-
-        # Check if a resp;iton with the same name already exists. If so, remove it or raise an error
-        # depending on the value of self._allow_xml_override:
-        for resolution in grids_root.findall("model_grid"):
-            if resolution.attrib["alias"] == resolution_name:
-                if self._allow_xml_override:
-                    grids_root.remove(resolution)
-                else:
-                    raise RuntimeError(
-                        f"Resolution {resolution_name} already exists in modelgrid_aliases."
-                    )
-
-        # Create new resolution entry in xml file:
-        new_resolution = SubElement(
-            grids_root,
-            "model_grid",
-            attrib={"alias": resolution_name},
-        )
-
-        # Add component grids to resolution entry:
-        new_atm_grid = SubElement(
-            new_resolution,
-            "grid",
-            attrib={"name": "atm"},
-        )
-        new_atm_grid.text = atm_grid
-
-        # Add lnd grid to resolution entry:
-        new_lnd_grid = SubElement(
-            new_resolution,
-            "grid",
-            attrib={"name": "lnd"},
-        )
-        new_lnd_grid.text = lnd_grid
-
-        # Add ocn grid to resolution entry:
-        new_ocnice_grid = SubElement(
-            new_resolution,
-            "grid",
-            attrib={"name": "ocnice"},
-        )
-        new_ocnice_grid.text = ocn_grid
-
-        # Add rof grid to resolution entry if it exists:
+        # Component grids of the new resolution entry:
+        grids = [["atm", atm_grid], ["lnd", lnd_grid], ["ocnice", ocn_grid]]
         if rof_grid is not None and rof_grid != "":
-            new_rof_grid = SubElement(
-                new_resolution,
-                "grid",
-                attrib={"name": "rof"},
-            )
-            new_rof_grid.text = rof_grid
+            grids.append(["rof", rof_grid])
 
         # Add wav grid to resolution entry for an active wave component.
         wav_grid = None
@@ -355,32 +377,23 @@ class CaseCreator:
             elif (custom_wav_grid := cvars["CUSTOM_WAV_GRID"].value) not in (None, "", "null"):
                 wav_grid = custom_wav_grid
         if wav_grid is not None:
-            new_wav_grid = SubElement(
-                new_resolution,
-                "grid",
-                attrib={"name": "wav"},
-            )
-            new_wav_grid.text = wav_grid
-
-
-        if not do_exec:
-            return
+            grids.append(["wav", wav_grid])
 
-        # back up modelgrid_aliases.xml in case case creation fails:
-        shutil.copy(
-            Path(self._cime.srcroot) / "ccs_config/modelgrid_aliases_nuopc.xml",
-            Path(self._cime.srcroot) / "ccs_config/modelgrid_aliases_nuopc.xml.orig",
+        self._plan.add_step(
+            "modelgrid_alias",
+            message=(
+                f'{BPOINT} Updating ccs_config/modelgrid_aliases_nuopc.xml file to include the new '
+                f'resolution "{resolution_name}" consisting of the following component grids.\n'
+                f'{component_grids_str}'
+            ),
+            alias=resolution_name,
+            grids=grids,
+            allow_override=self._allow_xml_override,
         )
 
-        # update modelgrid_aliases.xml to include new resolution:
-        ET.indent(grids_tree)
-        grids_tree.write(modelgrid_aliases_xml, encoding="utf-8", xml_declaration=True)
-
-    def _update_component_grids(
-        self, custom_grid_path, ocn_grid, ocn_grid_mode, do_exec
-    ):
-        """Update the component_grids xml file with custom ocnice grid information.
-        This function is called before running create_newcase.
+    def _update_component_grids(self, custom_grid_path, ocn_grid, ocn_grid_mode):
+        """Plan the update of the component_grids xml file with custom ocnice grid information.
+        This step precedes create_newcase.
 
         Parameters
         ----------
@@ -390,8 +403,6 @@ class CaseCreator:
             The name of the custom ocean grid.
         ocn_grid_mode : str
             The ocean grid mode. It can be "Standard", "Modify Existing", or "Create New".
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
         """
 
         if ocn_grid_mode == "Create New":
@@ -403,95 +414,24 @@ class CaseCreator:
             )
             assert ocn_mesh.exists(), f"Ocean mesh file {ocn_mesh} does not exist."
 
-            # component_grids xml file that stores resolutions:
-            srcroot = self._cime.srcroot
-            ccs_config_root = Path(srcroot) / "ccs_config"
-            assert (
-                ccs_config_root.exists()
-            ), f"ccs_config_root {ccs_config_root} does not exist."
-            component_grids_xml = ccs_config_root / "component_grids_nuopc.xml"
-            assert (
-                component_grids_xml.exists()
-            ), f"component_grids_xml {component_grids_xml} does not exist."
-            component_grids_xml = component_grids_xml.as_posix()
-
-            # confirm that component_grids xml file is writeable:
-            if not os.access(component_grids_xml, os.W_OK):
-                raise RuntimeError(f"Cannot write to {component_grids_xml}.")
-
-            # log the modification of component_grids.xml:
-            with self._out:
-                print(
+            self._plan.add_step(
+                "component_grid",
+                message=(
                     f'{BPOINT} Updating ccs_config/component_grids_nuopc.xml file to include '
                     f'newly generated ocean grid "{ocn_grid}" with the following properties:\n'
                     f' nx: {cvars["OCN_NX"].value}, ny: {cvars["OCN_NY"].value}.'
                     f' ocean mesh: {ocn_mesh}.{RESET}\n'
-                )
-
-            # Read in xml file and generate component_grids object file:
-            parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
-            domains_tree = ET.parse(component_grids_xml, parser=parser)
-            # ET.indent(domains_tree, space="  ", level=0)
-            domains_root = domains_tree.getroot()
-
-            # Check if a domain with the same name already exists. If so, remove it or raise an error
-            # depending on the value of self._allow_xml_override:
-            for domain in domains_root.findall("domain"):
-                if domain.attrib["name"] == ocn_grid:
-                    if self._allow_xml_override:
-                        domains_root.remove(domain)
-                    else:
-                        raise RuntimeError(
-                            f"Ocean grid {ocn_grid} already exists in component_grids."
-                        )
-
-            # Create new domain entry in xml file:
-            new_domain = SubElement(
-                domains_root,
-                "domain",
-                attrib={"name": ocn_grid},
+                ),
+                name=ocn_grid,
+                nx=str(cvars["OCN_NX"].value),
+                ny=str(cvars["OCN_NY"].value),
+                mesh=ocn_mesh.as_posix(),
+                desc=f"New ocean grid {ocn_grid} generated by mom6_forge",
+                allow_override=self._allow_xml_override,
             )
 
-            nx = SubElement(
-                new_domain,
-                "nx",
-            )
-            nx.text = str(cvars["OCN_NX"].value)
-
-            ny = SubElement(
-                new_domain,
-                "ny",
-            )
-            ny.text = str(cvars["OCN_NY"].value)
-
-            mesh = SubElement(
-                new_domain,
-                "mesh",
-            )
-            mesh.text = ocn_mesh.as_posix()
-
-            desc = SubElement(
-                new_domain,
-                "desc",
-            )
-            desc.text = f"New ocean grid {ocn_grid} generated by mom6_forge"
-
-            if not do_exec:
-                return
-
-            shutil.copy(
-                Path(self._cime.srcroot) / "ccs_config/component_grids_nuopc.xml",
-                Path(self._cime.srcroot) / "ccs_config/component_grids_nuopc.xml.orig",
-            )
-
-            # write to xml file:
-            ET.indent(domains_tree)
-            domains_tree.write(
-                component_grids_xml, encoding="utf-8", xml_declaration=True
-            )
-
-    def _run_create_newcase(self, caseroot, compset, resolution, do_exec):
-        """Run CIME's create_newcase tool to create a new case instance.
+    def _plan_create_newcase(self, caseroot, compset, resolution):
+        """Plan running CIME's create_newcase tool to create a new case instance.
 
         Parameters
         ----------
@@ -501,72 +441,31 @@ class CaseCreator:
             The compset to use for the new case.
         resolution : str
             The resolution to use for the new case.
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
         """
 
-        # Determine machine:
-        machine = cvars["MACHINE"].value
-        if do_exec and machine in [None, "CESM_NOT_PORTED"]:
-            raise RuntimeError("CESM is not ported to the current machine. "
-                               "Therefore, case creation is disabled. "
-                               "You can instead click 'Show Commands' to see the necessary steps "
-                               "to create a case on a supported machine.")
-
-        # create new case command:
-        cmd = (
-            f"{self._cime.cimeroot}/scripts/create_newcase "
-            + f"--compset {compset} "
-            + f"--res {resolution} "
-            + f"--case {caseroot} "
-            + f"--machine {machine} "
-            + "--run-unsupported "
+        self._plan.add_step(
+            "create_newcase",
+            compset=compset,
+            res=resolution,
+            case=caseroot.as_posix(),
+            machine=cvars["MACHINE"].value,
+            pecount=cvars["PECOUNT"].value,
+            project=cvars["PROJECT"].value,
+            ninst=self._plan.ninst,
+            non_local=self._is_non_local(),
         )
 
-        # append pecount if provided:
-        if pecount := cvars["PECOUNT"].value:
-            cmd += f"--pecount {pecount} "
-
-        # append project id if needed:
-        if project := cvars["PROJECT"].value:
-            cmd += f"--project {project} "
-
-        # append number of model instances if needed:
-        ninst = 1 if cvars["NINST"].value is None else cvars["NINST"].value
-        if ninst != 1:
-            cmd += f"--ninst {ninst} "
+    def _xmlchange(self, var, val):
+        """Queue an xml change to be applied along with all the other xml changes of the case
+        in a single plan step."""
+        self._queued_xmlchanges.append((var, val))
 
-        # append --nonlocal if needed:
-        if self._is_non_local():
-            cmd += "--non-local "
+    def _xmlchange_header(self, message):
+        """Log the given message before the xml changes queued next."""
+        self._xmlchange_headers[str(len(self._queued_xmlchanges))] = message
 
-        # log the command:
-        with self._out:
-            print(
-                f"{COMMENT}Running the create_newcase tool with the following command:{RESET}\n"
-            )
-            print(f"{cmd}\n")
-
-        # Run the create_newcase command:
-        if do_exec:
-            runout = subprocess.run(cmd, shell=True, capture_output=True)
-            with self._out:
-                if runout.returncode == 0:
-                    print(f"{COMMENT}The create_newcase command was successful.{RESET}\n")
-                else:
-                    print(f"{ERROR}Error creating case.{RESET}\n")
-                    print(f"{runout.stderr}\n")
-            if runout.returncode != 0:
-                raise RuntimeError("Error creating case.")
-
-    def _apply_all_xmlchanges(self, do_exec):
-        """Apply all the necessary xmlchanges to the case.
-
-        Parameters
-        ----------
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
-        """
+    def _apply_all_xmlchanges(self):
+        """Queue all the necessary xmlchanges to the case."""
 
         # If standard grid is selected, no modifications are needed:
         grid_mode = cvars["GRID_MODE"].value
@@ -575,26 +474,25 @@ class CaseCreator:
         else:
             assert grid_mode == "Custom", f"Unknown grid mode: {grid_mode}"
 
-        self._apply_lnd_grid_xmlchanges(do_exec)
-        self._apply_ocn_grid_xmlchanges(do_exec)
-        self._apply_runoff_ocn_mapping_xmlchanges(do_exec)
-        self._apply_wav_coupling_xmlchanges(do_exec)
+        self._apply_lnd_grid_xmlchanges()
+        self._apply_ocn_grid_xmlchanges()
+        self._apply_runoff_ocn_mapping_xmlchanges()
+        self._apply_wav_coupling_xmlchanges()
 
 
-    def _apply_lnd_grid_xmlchanges(self, do_exec):
+    def _apply_lnd_grid_xmlchanges(self):
         """Apply xmlchanges related to custom land grid if needed."""
 
         lnd_grid_mode = cvars["LND_GRID_MODE"].value
         if self._add_grids_to_ccs_config and lnd_grid_mode == "Modified":
             if cvars["COMP_OCN"].value != "mom":
-                with self._out:
-                    print(f"{COMMENT}Apply custom land grid xml changes:{RESET}\n")
+                self._xmlchange_header(f"{COMMENT}Apply custom land grid xml changes:{RESET}\n")
 
                 # TODO: instead of xmlchanges, these changes should be made via adding the new lnd domain mesh to
                 # component_grids_nuopc.xml and modelgrid_aliases_nuopc.xml (just like how we handle new ocean grids)
 
                 # lnd domain mesh
-                xmlchange("LND_DOMAIN_MESH", cvars["INPUT_MASK_MESH"].value, do_exec, self._is_non_local(), self._out)
+                self._xmlchange("LND_DOMAIN_MESH", cvars["INPUT_MASK_MESH"].value)
 
                 # mask mesh (if modified)
                 base_lnd_grid = cvars["CUSTOM_LND_GRID"].value
@@ -602,32 +500,30 @@ class CaseCreator:
                 lnd_dir = custom_grid_path / "lnd"
                 modified_mask_mesh = lnd_dir / f"{base_lnd_grid}_mesh_mask_modifier.nc" # TODO: the way we get this filename is fragile
                 assert modified_mask_mesh.exists(), f"Modified mask mesh file {modified_mask_mesh} does not exist."
-                xmlchange("MASK_MESH", modified_mask_mesh, do_exec, self._is_non_local(), self._out)
+                self._xmlchange("MASK_MESH", modified_mask_mesh)
         else:
             assert lnd_grid_mode in [None, "", "Standard"], f"Unknown land grid mode: {lnd_grid_mode}"
     
-    def _apply_ocn_grid_xmlchanges(self, do_exec):
+    def _apply_ocn_grid_xmlchanges(self):
         """Apply xmlchanges related to custom ocean grid if needed."""
 
         # Set NTASKS based on grid size if custom ocn grid. e.g. NX * NY < max_pts_per_core
         if cvars["COMP_OCN"].value == "mom" and cvars["OCN_GRID_MODE"].value == "Custom":
             num_points = int(cvars["OCN_NX"].value) * int(cvars["OCN_NY"].value)
             cores = CaseCreator._calc_cores_based_on_grid(num_points)
-            with self._out:
-                print(f"{COMMENT}Apply NTASK grid xml changes:{RESET}\n")
-                xmlchange("NTASKS_OCN",cores, do_exec, self._is_non_local(), self._out)
+            self._xmlchange_header(f"{COMMENT}Apply NTASK grid xml changes:{RESET}\n")
+            self._xmlchange("NTASKS_OCN",cores)
         
-    def _apply_runoff_ocn_mapping_xmlchanges(self, do_exec):
+    def _apply_runoff_ocn_mapping_xmlchanges(self):
         """Apply xmlchanges related to runoff to ocean mapping files if custom mapping is selected."""
 
         if (rof_ocn_mapping_status := cvars["ROF_OCN_MAPPING_STATUS"].value) is not None:
             if rof_ocn_mapping_status.startswith("CUSTOM:"):
                 mapping_files = rof_ocn_mapping_status[7:] 
                 nn_map_file, nnsm_map_file = mapping_files.split(",")
-                with self._out:
-                    print(f"{COMMENT}Apply runoff to ocean mapping xml changes:{RESET}\n")
-                    xmlchange("ROF2OCN_ICE_RMAPNAME", nnsm_map_file, do_exec, self._is_non_local(), self._out)
-                    xmlchange("ROF2OCN_LIQ_RMAPNAME", nnsm_map_file, do_exec, self._is_non_local(), self._out)
+                self._xmlchange_header(f"{COMMENT}Apply runoff to ocean mapping xml changes:{RESET}\n")
+                self._xmlchange("ROF2OCN_ICE_RMAPNAME", nnsm_map_file)
+                self._xmlchange("ROF2OCN_LIQ_RMAPNAME", nnsm_map_file)
 
     def _wav_uses_custom_ocn_grid(self):
         """Return True if the wave component should use the newly created custom ocean grid as its
@@ -642,14 +538,13 @@ class CaseCreator:
         )
         return not picked_standard_wav_grid
 
-    def _apply_wav_coupling_xmlchanges(self, do_exec):
+    def _apply_wav_coupling_xmlchanges(self):
         """Use the legacy MOM6-WW3 wave coupling method when the custom ocean grid is reused as
         the wave grid."""
 
         if cvars["COMP_WAV"].value == "ww3" and self._wav_uses_custom_ocn_grid():
-            with self._out:
-                print(f"{COMMENT}Set wave coupling mode to legacy:{RESET}\n")
-                xmlchange("MOM6_WW3_CPL_METHOD", "legacy", do_exec, self._is_non_local(), self._out)
+            self._xmlchange_header(f"{COMMENT}Set wave coupling mode to legacy:{RESET}\n")
+            self._xmlchange("MOM6_WW3_CPL_METHOD", "legacy")
 
 
     @staticmethod
@@ -669,20 +564,23 @@ class CaseCreator:
         return ideal_cores
 
 
-    def _apply_user_nl_changes(self, model, var_val_pairs, do_exec, comment=None, log_title=True):
-        """Apply changes to a given user_nl file."""
-        append_user_nl(model, var_val_pairs, do_exec, comment, log_title, self._out)
+    def _apply_user_nl_changes(self, model, var_val_pairs, comment=None):
+        """Stage changes to a given user_nl file. The changes staged for each model are added
+        to the plan at once by _plan_staged_user_nl_changes."""
+        self._staged_user_nl_changes.setdefault(model, []).append(
+            {"pairs": [[var, str(val)] for var, val in var_val_pairs], "comment": comment}
+        )
 
-    def _apply_all_namelist_changes(self, do_exec):
-        """Apply all the necessary user_nl changes to the case.
+    def _plan_staged_user_nl_changes(self):
+        """Add a single step for each model with user_nl changes staged, so that each user_nl
+        file is written only once. Variables set more than once are only set to their last
+        staged values."""
+        for model, blocks in self._staged_user_nl_changes.items():
+            self._plan.add_step("user_nl", model=model, blocks=dedup_user_nl_blocks(blocks))
+        self._staged_user_nl_changes = {}
 
-        Parameters
-        ----------
-        caseroot : Path
-            The path to the case directory.
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
-        """
+    def _apply_all_namelist_changes(self):
+        """Plan all the necessary user_nl changes to the case."""
 
         # If standard grid is selected, no modifications are needed:
         grid_mode = cvars["GRID_MODE"].value
@@ -691,11 +589,11 @@ class CaseCreator:
         else:
             assert grid_mode == "Custom", f"Unknown grid mode: {grid_mode}"
 
-        self._apply_mom_namelist_changes(do_exec)
-        self._apply_cice_namelist_changes(do_exec)
-        self._apply_clm_namelist_changes(do_exec)
+        self._apply_mom_namelist_changes()
+        self._apply_cice_namelist_changes()
+        self._apply_clm_namelist_changes()
 
-    def _apply_mom_namelist_changes(self, do_exec):
+    def _apply_mom_namelist_changes(self):
         """Apply all necessary changes to user_nl_mom and user_nl_cice files."""
 
         ocn_grid_mode = cvars["OCN_GRID_MODE"].value
@@ -708,18 +606,20 @@ class CaseCreator:
                 ocn_grid_mode == "Create New"
             ), f"Unknown ocean grid mode: {ocn_grid_mode}"
 
+        from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+
         supergrid_file_path = MOM6ForgeLauncher.supergrid_file_path()
         topo_file_path = MOM6ForgeLauncher.topo_file_path()
         vgrid_file_path = MOM6ForgeLauncher.vgrid_file_path()
         ocn_grid_path = MOM6ForgeLauncher.get_custom_ocn_grid_path()
 
-        # read in min and max depth from the MOM6 topo file:
-        ds_topo = xr.open_dataset(topo_file_path)
-        min_depth = ds_topo.attrs["min_depth"]
-        max_depth = ds_topo.attrs["max_depth"]
+        # read in min and max depth from the MOM6 topo file header:
+        topo_attrs = global_attrs(topo_file_path)
+        min_depth = topo_attrs["min_depth"]
+        max_depth = topo_attrs["max_depth"]
 
         # number of vertical levels:
-        nk = len(xr.open_dataset(vgrid_file_path).dz)
+        nk = dim_size(vgrid_file_path, "dz")
 
         # Determine timesteps based on the grid resolution (assuming coupling frequency of 1800.0 sec):
         res_x = float(cvars['OCN_LENX'].value) / int(cvars["OCN_NX"].value)
@@ -751,7 +651,6 @@ class CaseCreator:
                 ("ALE_COORDINATE_CONFIG", f"FILE:{vgrid_file_path.name}"),
                 ("REGRIDDING_COORDINATE_MODE", "Z*"),
             ],
-            do_exec,
             comment="Custom Horizonal Grid, Topography, and Vertical Grid",
         )
 
@@ -761,9 +660,7 @@ class CaseCreator:
                 ("DT", str(dt)),
                 ("DT_THERM", str(dt_therm)),
             ],
-            do_exec,
             comment="Timesteps (based on grid resolution)",
-            log_title=False,
         )
 
         # Set MOM6 Initial Conditions parameters:
@@ -775,9 +672,7 @@ class CaseCreator:
                     ("T_REF", cvars["T_REF"].value),
                     ("FIT_SALINITY", "True"),
                 ],
-                do_exec,
                 comment="Simple Initial Conditions",
-                log_title=False,
             )
         elif cvars["OCN_IC_MODE"].value == "From File":
             # First, copy the initial conditions file to INPUTDIR:
@@ -790,7 +685,11 @@ class CaseCreator:
             else:
                 # Copy the initial conditions file to INPUTDIR:
                 if temp_salt_z_init_file.name not in [f.name for f in ocn_grid_path.glob("*.nc")]:
-                    shutil.copy(temp_salt_z_init_file, ocn_grid_path / temp_salt_z_init_file.name)
+                    self._plan.add_step(
+                        "copy",
+                        src=temp_salt_z_init_file.as_posix(),
+                        dst=(ocn_grid_path / temp_salt_z_init_file.name).as_posix(),
+                    )
                 # Apply the user_nl changes:
                 self._apply_user_nl_changes(
                     "mom",
@@ -800,14 +699,12 @@ class CaseCreator:
                         ("Z_INIT_FILE_PTEMP_VAR", cvars["IC_PTEMP_NAME"].value),
                         ("Z_INIT_FILE_SALT_VAR", cvars["IC_SALT_NAME"].value),
                     ],
-                    do_exec,
                     comment="Initial Conditions from File",
-                    log_title=False,
                 )
         else:
             raise RuntimeError(f"Unknown ocean initial conditions mode: {cvars['OCN_IC_MODE'].value}")
 
-    def _apply_cice_namelist_changes(self, do_exec):
+    def _apply_cice_namelist_changes(self):
         """Apply all necessary changes to user_nl_cice file."""
 
         ocn_grid_mode = cvars["OCN_GRID_MODE"].value
@@ -818,6 +715,8 @@ class CaseCreator:
         if not comp_ice.startswith("cice"):
             return
 
+        from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+
         cice_grid_file_path = MOM6ForgeLauncher.cice_grid_file_path()
         self._apply_user_nl_changes(
             "cice",
@@ -826,10 +725,9 @@ class CaseCreator:
                 ("grid_file", f'"{cice_grid_file_path}"'),
                 ("kmt_file", f'"{cice_grid_file_path}"'),
             ],
-            do_exec,
         )
 
-    def _apply_clm_namelist_changes(self, do_exec):
+    def _apply_clm_namelist_changes(self):
         """Apply all necessary changes to user_nl_clm file."""
 
         lnd_grid_mode = cvars["LND_GRID_MODE"].value
@@ -869,11 +767,11 @@ class CaseCreator:
                 # cft dimensions included in clm namelist xml files don't match the dimensions that clm expects: 64 vs 2.
             ])
 
-        self._apply_user_nl_changes("clm", user_nl_clm_changes, do_exec)
+        self._apply_user_nl_changes("clm", user_nl_clm_changes)
 
-    def _update_grids_via_xmlchange(self, do_exec):
-        """Update the case with custom grid information if needed.
-         This function is called after running create_newcase."""
+    def _update_grids_via_xmlchange(self):
+        """Queue the xml changes to update the case with custom grid information if needed.
+         These are applied after running create_newcase."""
 
         if cvars["GRID_MODE"].value == "Standard":
             return
@@ -900,14 +798,13 @@ class CaseCreator:
         if ocn_grid is None:
             raise RuntimeError("No ocean grid specified.")
 
-        self._update_component_grids_xml(custom_grid_path, ocn_grid, ocn_grid_mode, do_exec)
+        self._update_component_grids_xml(custom_grid_path, ocn_grid, ocn_grid_mode)
 
 
     def _update_component_grids_xml(
-        self, custom_grid_path, ocn_grid, ocn_grid_mode, do_exec
+        self, custom_grid_path, ocn_grid, ocn_grid_mode
     ):
-        """Update the component_grids xml file with custom ocnice grid information.
-        This function is called before running create_newcase.
+        """Queue the xml changes to set the custom ocnice grid information of the case.
 
         Parameters
         ----------
@@ -917,8 +814,6 @@ class CaseCreator:
             The name of the custom ocean grid.
         ocn_grid_mode : str
             The ocean grid mode. It can be "Standard", "Modify Existing", or "Create New".
-        do_exec : bool
-            If True, execute the commands. If False, only print them.
         """
 
         if ocn_grid_mode == "Create New":
@@ -931,14 +826,13 @@ class CaseCreator:
             assert ocn_mesh.exists(), f"Ocean mesh file {ocn_mesh} does not exist."
 
 
-            # log the modification of component_grids.xml:
-            with self._out:
-                print(
-                    f'{BPOINT} Updating case xml variables to include '
-                    f'newly generated ocean grid "{ocn_grid}" with the following properties:\n'
-                    f' nx: {cvars["OCN_NX"].value}, ny: {cvars["OCN_NY"].value}.'
-                    f' ocean mesh: {ocn_mesh}.{RESET}\n'
-                )
+            # log the modification of the case xml variables:
+            self._xmlchange_header(
+                f'{BPOINT} Updating case xml variables to include '
+                f'newly generated ocean grid "{ocn_grid}" with the following properties:\n'
+                f' nx: {cvars["OCN_NX"].value}, ny: {cvars["OCN_NY"].value}.'
+                f' ocean mesh: {ocn_mesh}.{RESET}\n'
+            )
 
             # OCN and ICE share the custom ocean grid dimensions and mesh. WAV shares them too,
             # unless the user picked a standard wave grid (handled separately below).
@@ -946,42 +840,41 @@ class CaseCreator:
             if self._wav_uses_custom_ocn_grid():
                 comps_sharing_ocn_grid.append("WAV")
             for comp in comps_sharing_ocn_grid:
-                xmlchange(f"{comp}_NX", cvars["OCN_NX"].value, do_exec, self._is_non_local(), self._out)
-                xmlchange(f"{comp}_NY", cvars["OCN_NY"].value, do_exec, self._is_non_local(), self._out)
-                xmlchange(f"{comp}_DOMAIN_MESH", ocn_mesh.as_posix(), do_exec, self._is_non_local(), self._out)
+                self._xmlchange(f"{comp}_NX", cvars["OCN_NX"].value)
+                self._xmlchange(f"{comp}_NY", cvars["OCN_NY"].value)
+                self._xmlchange(f"{comp}_DOMAIN_MESH", ocn_mesh.as_posix())
 
             # If a standard wave grid was selected instead, set the wave grid and its mesh.
             wav_grid = cvars["CUSTOM_WAV_GRID"].value
             if not self._wav_uses_custom_ocn_grid() and wav_grid not in (None, "", "null"):
-                xmlchange("WAV_GRID", wav_grid, do_exec, self._is_non_local(), self._out)
-                xmlchange("WAV_DOMAIN_MESH", self._cime.get_mesh_path("wav", wav_grid), do_exec, self._is_non_local(), self._out)
+                self._xmlchange("WAV_GRID", wav_grid)
+                self._xmlchange("WAV_DOMAIN_MESH", self._cime.get_mesh_path("wav", wav_grid))
 
-            xmlchange("MASK_MESH", ocn_mesh.as_posix(), do_exec, self._is_non_local(), self._out)
+            self._xmlchange("MASK_MESH", ocn_mesh.as_posix())
 
-            xmlchange("ATM_GRID", cvars["CUSTOM_ATM_GRID"].value, do_exec, self._is_non_local(), self._out)
+            self._xmlchange("ATM_GRID", cvars["CUSTOM_ATM_GRID"].value)
 
-            xmlchange("LND_GRID", cvars["CUSTOM_LND_GRID"].value, do_exec, self._is_non_local(), self._out)
+            self._xmlchange("LND_GRID", cvars["CUSTOM_LND_GRID"].value)
             
-            xmlchange("ATM_DOMAIN_MESH", self._cime.get_mesh_path("atm",cvars["CUSTOM_ATM_GRID"].value), do_exec, self._is_non_local(), self._out)
+            self._xmlchange("ATM_DOMAIN_MESH", self._cime.get_mesh_path("atm",cvars["CUSTOM_ATM_GRID"].value))
 
-            xmlchange("LND_DOMAIN_MESH", self._cime.get_mesh_path("lnd",cvars["CUSTOM_LND_GRID"].value), do_exec, self._is_non_local(), self._out)
+            self._xmlchange("LND_DOMAIN_MESH", self._cime.get_mesh_path("lnd",cvars["CUSTOM_LND_GRID"].value))
             
             if cvars["CUSTOM_ROF_GRID"].value is not None and cvars["CUSTOM_ROF_GRID"].value != "" and cvars["CUSTOM_ROF_GRID"].value != "null":
-                xmlchange("ROF_GRID", cvars["CUSTOM_ROF_GRID"].value, do_exec, self._is_non_local(), self._out)
-                xmlchange("ROF_DOMAIN_MESH", self._cime.get_mesh_path("rof",cvars["CUSTOM_ROF_GRID"].value), do_exec, self._is_non_local(), self._out)
+                self._xmlchange("ROF_GRID", cvars["CUSTOM_ROF_GRID"].value)
+                self._xmlchange("ROF_DOMAIN_MESH", self._cime.get_mesh_path("rof",cvars["CUSTOM_ROF_GRID"].value))
 
 
         lnd_grid_mode = cvars["LND_GRID_MODE"].value
         if lnd_grid_mode == "Modified":
             if cvars["COMP_OCN"].value != "mom":
-                with self._out:
-                    print(f"{COMMENT}Apply custom land grid xml changes:{RESET}\n")
+                self._xmlchange_header(f"{COMMENT}Apply custom land grid xml changes:{RESET}\n")
 
                 # TODO: NO LONGER RELEVANT - OCEAN GRIDS ARE DONE THROUGH XML CHANGES AS WELL:  instead of xmlchanges, these changes should be made via adding the new lnd domain mesh to
                 # component_grids_nuopc.xml and modelgrid_aliases_nuopc.xml (just like how we handle new ocean grids)
 
                 # lnd domain mesh
-                xmlchange("LND_DOMAIN_MESH", cvars["INPUT_MASK_MESH"].value, do_exec, self._is_non_local(), self._out)
+                self._xmlchange("LND_DOMAIN_MESH", cvars["INPUT_MASK_MESH"].value)
 
                 # mask mesh (if modified)
                 base_lnd_grid = cvars["CUSTOM_LND_GRID"].value
@@ -989,6 +882,6 @@ class CaseCreator:
                 lnd_dir = custom_grid_path / "lnd"
                 modified_mask_mesh = lnd_dir / f"{base_lnd_grid}_mesh_mask_modifier.nc" # TODO: the way we get this filename is fragile
                 assert modified_mask_mesh.exists(), f"Modified mask mesh file {modified_mask_mesh} does not exist."
-                xmlchange("MASK_MESH", modified_mask_mesh, do_exec, self._is_non_local(), self._out)
+                self._xmlchange("MASK_MESH", modified_mask_mesh)
         else:
             assert lnd_grid_mode in [None, "", "Standard"], f"Unknown land grid mode: {lnd_grid_mode}"
\ No newline at end of file
@@ -1,9 +1,11 @@
 import logging
+import asyncio
 from ipywidgets import VBox, HBox, Button, Output
 
 from ProConPy.out_handler import handler as owh
 from ProConPy.config_var import cvars
 from ProConPy.dialog import alert_error
+from ProConPy.event_loop import running_event_loop
 from visualCaseGen.custom_widget_types.case_creator import CaseCreator, ERROR, RESET
 
 class CaseCreatorWidget(VBox, CaseCreator):
@@ -33,10 +35,19 @@ class CaseCreatorWidget(VBox, CaseCreator):
         )
         self._btn_show_commands.on_click(self._on_create_case_clicked)
 
+        # Cancels the case creation in progress. Displayed only while a case is being created.
+        self._btn_cancel = Button(
+            description="Cancel",
+            layout={"width": "160px", "margin": "5px", "display": "none"},
+            button_style="danger",
+        )
+        self._btn_cancel.on_click(self._on_cancel_clicked)
+        self._task = None
+
         self.children = [
             cvars["PROJECT"].widget,
             HBox(
-                [self._btn_create_case, self._btn_show_commands],
+                [self._btn_create_case, self._btn_show_commands, self._btn_cancel],
                 layout={"display": "flex", "justify_content": "center"},
             ),
             self._out,
@@ -87,13 +98,48 @@ class CaseCreatorWidget(VBox, CaseCreator):
         # Determine if the commands should be executed or just displayed
         do_exec = b is not self._btn_show_commands
 
+        # Within a running event loop, e.g., that of the notebook kernel, create the case in a
+        # task so that the kernel remains responsive and the outputs of the tools are streamed.
+        loop = running_event_loop()
+        if loop is not None and do_exec:
+            self._task = loop.create_task(self._create_case_task(do_exec))
+            return
+
         # Create the case. If an error occurs, display it in the output widget
         # and revert the launch.
         try:
             self.create_case(do_exec)
         except Exception as e:
-            with owh.out:
-                alert_error(str(e))
+            self._on_create_case_error(e, do_exec)
+
+    async def _create_case_task(self, do_exec):
+        """Create the case asynchronously, displaying the Cancel button in the meantime."""
+        self._btn_create_case.disabled = True
+        self._btn_show_commands.disabled = True
+        self._btn_cancel.layout.display = "flex"
+        try:
+            await self.create_case_async(do_exec)
+        except asyncio.CancelledError:
             with self._out:
-                print(f"{ERROR}{str(e)}{RESET}")
+                print(f"{ERROR}Case creation cancelled.{RESET}")
             self.revert_launch(do_exec)
+        except Exception as e:
+            self._on_create_case_error(e, do_exec)
+        finally:
+            self._btn_cancel.layout.display = "none"
+            self._btn_create_case.disabled = False
+            self._btn_show_commands.disabled = False
+            self._task = None
+
+    def _on_cancel_clicked(self, b=None):
+        """Cancel the case creation in progress, terminating the running tool, if any."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def _on_create_case_error(self, e, do_exec):
+        """Display the error in the output widget and revert the launch."""
+        with owh.out:
+            alert_error(str(e))
+        with self._out:
+            print(f"{ERROR}{str(e)}{RESET}")
+        self.revert_launch(do_exec)
@@ -0,0 +1,300 @@
+"""Bulk creation of cases that share a configuration, e.g., the members of an ensemble, and
+differ only in CASEROOT, PECOUNT, NINST, or a few xml and namelist values. The cases are
+created concurrently in a bounded pool of worker processes, each executing a CasePlan derived
+from the plan of the shared configuration. The failure of a case does not affect the others."""
+
+import io
+import sys
+import copy
+import time
+import queue
+import logging
+import contextlib
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from visualCaseGen.custom_widget_types.case_plan import CasePlan, RUNDIR
+from visualCaseGen.custom_widget_types.case_tools import dedup_user_nl_blocks
+
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
+# The result of creating an ensemble member.
+MemberResult = namedtuple("MemberResult", ["caseroot", "ok", "error", "log", "elapsed"])
+
+# The kinds of steps that modify files shared by all members, e.g., the ccs_config xml files.
+_SHARED_KINDS = ("modelgrid_alias", "component_grid")
+
+# The member overrides that are applied via create_newcase arguments.
+_CREATE_NEWCASE_OVERRIDES = {"PECOUNT": "pecount", "NINST": "ninst"}
+
+
+def _is_shared_step(step):
+    """Return True if the given step is to be executed only once for all members."""
+    if step.kind in _SHARED_KINDS:
+        return True
+    # Copies to locations other than the RUNDIR of the case, e.g., to the custom grid directory:
+    return step.kind == "copy" and not step.args["dst"].startswith(RUNDIR)
+
+
+def shared_plan(plan):
+    """Return the plan of the steps to be executed only once for all members, i.e., the
+    ccs_config edits and the copies to locations outside the case directories."""
+    return CasePlan(
+        plan.caseroot,
+        plan.ninst,
+        plan.non_local,
+        [copy.deepcopy(step) for step in plan.steps if _is_shared_step(step)],
+    )
+
+
+def member_plan(plan, overrides, clone=None):
+    """Derive the plan of an ensemble member from the plan of the shared configuration.
+
+    Parameters
+    ----------
+    plan : CasePlan
+        The plan of the shared configuration, as returned by CaseCreator.plan_case.
+    overrides : dict
+        The member overrides. CASEROOT is required. PECOUNT and NINST are passed to
+        create_newcase. Any other uppercase keys are applied as xml changes. The "user_nl"
+        key, if any, maps model names to dicts of namelist variables and values.
+    clone : str, optional
+        If provided, the member is created by cloning the case at this path instead of running
+        create_newcase. The cloned case must have been created with the same overrides (other
+        than CASEROOT), since its xml and user_nl changes, including those of its overrides,
+        are inherited as is.
+
+    Returns
+    -------
+    CasePlan
+        The plan of the member, excluding the shared steps (see shared_plan).
+    """
+
+    assert "CASEROOT" in overrides, "Each ensemble member must specify a CASEROOT."
+    caseroot = Path(overrides["CASEROOT"])
+    if not caseroot.is_absolute():
+        caseroot = Path.home() / caseroot
+    caseroot = caseroot.as_posix()
+    ninst = int(overrides.get("NINST", plan.ninst) or 1)
+
+    member = CasePlan(caseroot, ninst, plan.non_local)
+    xml_overrides = [
+        [var, str(val)]
+        for var, val in overrides.items()
+        if var.isupper() and var != "CASEROOT" and var not in _CREATE_NEWCASE_OVERRIDES
+    ]
+    if clone is not None:
+        xml_overrides = []  # inherited from the clone
+
+    for step in plan.steps:
+        if _is_shared_step(step):
+            continue
+        step = copy.deepcopy(step)
+        if step.message is not None:
+            step.message = step.message.replace(plan.caseroot, caseroot)
+        if step.kind == "create_newcase":
+            if clone is not None:
+                member.add_step(
+                    "create_clone", case=caseroot, clone=clone, project=step.args.get("project")
+                )
+                continue
+            step.args["case"] = caseroot
+            for var, arg in _CREATE_NEWCASE_OVERRIDES.items():
+                if var in overrides:
+                    step.args[arg] = overrides[var]
+            step.args["ninst"] = ninst
+        elif step.kind in ("xmlchanges", "user_nl") and clone is not None:
+            continue  # inherited from the clone
+        elif step.kind == "xmlchanges":
+            step.args["changes"] = step.args["changes"] + xml_overrides
+            xml_overrides = []
+        elif step.kind == "case_setup" and xml_overrides:
+            member.add_step("xmlchanges", changes=xml_overrides)
+            xml_overrides = []
+        member.steps.append(step)
+
+    # Merge the user_nl overrides into the user_nl steps of the shared configuration, if any,
+    # so that each user_nl file is still written once and each variable is set only once.
+    user_nl_overrides = overrides.get("user_nl", {}) if clone is None else {}
+    for model, var_vals in user_nl_overrides.items():
+        block = {
+            "pairs": [[var, str(val)] for var, val in var_vals.items()],
+            "comment": "Ensemble member overrides",
+        }
+        step = next(
+            (
+                step
+                for step in member.steps
+                if step.kind == "user_nl" and step.args["model"] == model and "blocks" in step.args
+            ),
+            None,
+        )
+        if step is None:
+            member.add_step("user_nl", model=model, blocks=[block])
+        else:
+            step.args["blocks"] = dedup_user_nl_blocks(step.args["blocks"] + [block])
+
+    return member
+
+
+class _PlanCime:
+    """The subset of the CIME interface needed to execute case plans. Unlike CIME_interface,
+    it is cheap to construct and can be sent to worker processes."""
+
+    def __init__(self, cimeroot, srcroot):
+        self.cimeroot = Path(cimeroot)
+        self.srcroot = srcroot
+
+    def get_case(self, caseroot, read_only=True, record=False, non_local=False):
+        if self.cimeroot.as_posix() not in sys.path:
+            sys.path.append(self.cimeroot.as_posix())
+        from CIME.case.case import Case
+
+        return Case(caseroot, read_only=read_only, record=record, non_local=non_local)
+
+
+def _create_member(plan_dict, cimeroot, srcroot, do_exec, events):
+    """Execute the plan of an ensemble member in a worker process. The outputs of the plan are
+    captured and returned as part of the result, and the exceptions, if any, are caught so that
+    the failure of a member does not affect the others."""
+
+    plan = CasePlan.from_dict(plan_dict)
+    cime = _PlanCime(cimeroot, srcroot)
+
+    def progress(group):
+        events.put((plan.caseroot, ", ".join(step.kind for step in group)))
+
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            plan.execute(cime, do_exec, progress=progress)
+    except Exception as e:
+        return MemberResult(plan.caseroot, False, str(e), log.getvalue(), time.perf_counter() - start)
+    return MemberResult(plan.caseroot, True, None, log.getvalue(), time.perf_counter() - start)
+
+
+def _member_key(overrides):
+    """Return the overrides of a member other than CASEROOT, in a comparable form."""
+    return repr(sorted((var, val) for var, val in overrides.items() if var != "CASEROOT"))
+
+
+def _default_mp_context():
+    """Return the multiprocessing context for the worker processes. Worker processes are not
+    forked from the calling process, which may be multi-threaded, e.g., a Jupyter kernel,
+    since forking a multi-threaded process may deadlock."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def create_ensemble(
+    plan, members, cime, do_exec=True, max_workers=4, clone=False, progress=None, out=None,
+    journal=None, mp_context=None,
+):
+    """Create the cases of an ensemble concurrently.
+
+    Parameters
+    ----------
+    plan : CasePlan
+        The plan of the shared configuration, as returned by CaseCreator.plan_case.
+    members : list of dict
+        The overrides of each member (see member_plan).
+    cime : CIME_interface
+        The CIME interface of the CESM instance to create the cases with.
+    do_exec : bool, optional
+        If False, the plans are only logged.
+    max_workers : int, optional
+        The maximum number of cases to create concurrently, each in a separate process.
+    clone : bool, optional
+        If True, the first member is created via create_newcase and the members with the
+        same overrides (other than CASEROOT) are then cloned from it via create_clone. The
+        remaining members are created via create_newcase.
+    progress : callable, optional
+        A function to call with (caseroot, message) as the creation of each member progresses.
+    out : Output, optional
+        The output widget to use for displaying the log messages of the shared steps.
+    journal : list, optional
+        If provided, the ccs_config changes made are recorded in this list (see CasePlan.execute).
+    mp_context : multiprocessing context, optional
+        The context to start the worker processes with. By default, forkserver (or spawn, if
+        forkserver is not available).
+
+    Returns
+    -------
+    list of MemberResult
+        The results, in the order of the members.
+    """
+
+    assert max_workers > 0, "max_workers must be positive."
+    progress = (lambda caseroot, message: None) if progress is None else progress
+
+    plans = [member_plan(plan, overrides) for overrides in members]
+    for member in plans:
+        if do_exec and Path(member.caseroot).exists():
+            raise RuntimeError(f"Case directory {member.caseroot} already exists.")
+    if len({member.caseroot for member in plans}) != len(plans):
+        raise RuntimeError("Ensemble members must have distinct CASEROOTs.")
+
+    # The steps shared by all members are executed once, before the members are created:
+    shared_plan(plan).execute(cime, do_exec, out, journal=journal)
+
+    results = [None] * len(plans)
+    remaining = list(range(len(plans)))
+    args = (Path(cime.cimeroot).as_posix(), cime.srcroot, do_exec)
+
+    mp_context = _default_mp_context() if mp_context is None else mp_context
+    with mp_context.Manager() as manager, ProcessPoolExecutor(
+        max_workers, mp_context=mp_context
+    ) as pool:
+        events = manager.Queue()
+
+        def run(indices):
+            futures = {
+                pool.submit(_create_member, plans[i].to_dict(), *args, events): i for i in indices
+            }
+            for i in indices:
+                progress(plans[i].caseroot, "queued")
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                _drain(events, progress)
+                for future in done:
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:  # e.g., the worker process died
+                        results[i] = MemberResult(plans[i].caseroot, False, str(e), "", 0.0)
+                    result = results[i]
+                    progress(result.caseroot, "done" if result.ok else f"failed: {result.error}")
+            _drain(events, progress)
+
+        if clone and len(plans) > 1:
+            # Create the first member from scratch, and clone the members with identical
+            # overrides from it. (A clone inherits all the xml and user_nl changes of the first
+            # member, so the members with different overrides must be created from scratch.)
+            run(remaining[:1])
+            remaining = remaining[1:]
+            if results[0].ok:
+                for i in remaining:
+                    if _member_key(members[i]) == _member_key(members[0]):
+                        plans[i] = member_plan(plan, members[i], clone=plans[0].caseroot)
+
+        run(remaining)
+
+    for result in results:
+        if not result.ok:
+            logger.error(f"Failed to create case {result.caseroot}: {result.error}")
+    return results
+
+
+def _drain(events, progress):
+    """Pass the progress events posted by the worker processes to the progress callback."""
+    while True:
+        try:
+            caseroot, message = events.get_nowait()
+        except queue.Empty:
+            return
+        progress(caseroot, message)
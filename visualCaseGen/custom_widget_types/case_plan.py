@@ -0,0 +1,539 @@
+"""A declarative plan for creating a case: the ccs_config edits, the create_newcase arguments,
+the xml changes, the user_nl appends and the file copies, as determined from the ConfigVars by
+the CaseCreator. A plan is executed (or only logged) by CasePlan.execute. Plans are serializable,
+so the same plan can be executed elsewhere, e.g., in another process, without re-running the
+configurator."""
+
+import os
+import json
+import logging
+import time
+import shutil
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from visualCaseGen.custom_widget_types.dummy_output import DummyOutput
+from visualCaseGen.custom_widget_types.case_tools import (
+    xmlchanges,
+    case_setup_cmd,
+    log_user_nl,
+    write_user_nl,
+    is_ccs_config_writeable,
+    run_command_async,
+    run_sync,
+)
+from visualCaseGen.custom_widget_types.ccs_config_updater import (
+    update_entry,
+    revert_entry,
+    model_grid_entry,
+    domain_entry,
+)
+
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
+COMMENT = "\033[01;96m"  # bold, cyan
+ERROR = "\033[1;31m"  # bold, red
+RESET = "\033[0m"
+
+# The kinds of steps that are independent of each other (except for the user_nl appends to the
+# same model) and are therefore executed concurrently when they appear consecutively in a plan.
+_INDEPENDENT_KINDS = ("message", "copy", "user_nl")
+
+# Prefix of destination paths that are relative to the RUNDIR of the case, which is known only
+# after the case is created.
+RUNDIR = "$RUNDIR"
+
+
+class PlanStep:
+    """A single step of a CasePlan."""
+
+    def __init__(self, kind, args=None, message=None):
+        """
+        Parameters
+        ----------
+        kind : str
+            The kind of the step: "message", "modelgrid_alias", "component_grid",
+            "create_newcase", "create_clone", "xmlchanges", "case_setup", "copy", or "user_nl".
+        args : dict, optional
+            The (JSON serializable) arguments of the step.
+        message : str, optional
+            A message to log before the step.
+        """
+        assert kind in _STEP_RUNNERS, f"Unknown plan step kind: {kind}"
+        self.kind = kind
+        self.args = {} if args is None else args
+        self.message = message
+
+    def __repr__(self):
+        return f"PlanStep({self.kind}, {self.args})"
+
+    def to_dict(self):
+        return {"kind": self.kind, "args": self.args, "message": self.message}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["kind"], d.get("args"), d.get("message"))
+
+
+class CasePlan:
+    """An ordered list of steps to create and configure a case. Steps are executed in order,
+    except that consecutive independent steps (file copies and user_nl appends) are executed
+    concurrently."""
+
+    def __init__(self, caseroot, ninst=1, non_local=False, steps=None):
+        """
+        Parameters
+        ----------
+        caseroot : str
+            The path to the case directory.
+        ninst : int, optional
+            The number of model instances.
+        non_local : bool, optional
+            If True, the case is created on a machine different from the one that runs
+            visualCaseGen.
+        steps : list of PlanStep, optional
+            The steps of the plan. More steps may be added via add_step.
+        """
+        self.caseroot = str(caseroot)
+        self.ninst = ninst
+        self.non_local = non_local
+        self.steps = [] if steps is None else list(steps)
+
+    def add_step(self, kind, message=None, **args):
+        """Append a new step to the plan and return it."""
+        step = PlanStep(kind, args, message)
+        self.steps.append(step)
+        return step
+
+    def add_message(self, message):
+        """Append a step that only logs the given message."""
+        return self.add_step("message", message=message)
+
+    def to_dict(self):
+        return {
+            "caseroot": self.caseroot,
+            "ninst": self.ninst,
+            "non_local": self.non_local,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        steps = [PlanStep.from_dict(step) for step in d["steps"]]
+        return cls(d["caseroot"], d["ninst"], d["non_local"], steps)
+
+    def to_json(self, path=None):
+        """Serialize the plan to a JSON string, and write it to the given path, if any."""
+        s = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            Path(path).write_text(s)
+        return s
+
+    @classmethod
+    def from_json(cls, s=None, path=None):
+        """Deserialize a plan from a JSON string or a JSON file."""
+        assert (s is None) != (path is None), "Provide either a JSON string or a path."
+        return cls.from_dict(json.loads(Path(path).read_text() if s is None else s))
+
+    def _step_groups(self):
+        """Yield the groups of steps to execute in order. A group consists of either a single
+        step or consecutive independent steps that may be executed concurrently."""
+        group = []
+        for step in self.steps:
+            if step.kind in _INDEPENDENT_KINDS:
+                group.append(step)
+                continue
+            if group:
+                yield group
+                group = []
+            yield [step]
+        if group:
+            yield group
+
+    def execute(self, cime, do_exec=True, out=None, max_workers=4, progress=None, journal=None,
+                timeout=None):
+        """Execute the plan, logging each step along with the equivalent commands. This is the
+        blocking counterpart of execute_async. See execute_async for the parameters.
+
+        If the steps are only to be logged, or if none of the steps run external tools, e.g.,
+        create_newcase, the plan is executed directly in the calling thread. Otherwise, it is
+        executed via execute_async in a new event loop, which requires that there is no running
+        event loop in the calling thread, i.e., headless or command line use."""
+        if not do_exec or not any(_is_async(step) for step in self.steps):
+            ctx = self._context(cime, do_exec, out, max_workers, journal, timeout)
+            timings = []
+            for group in self._step_groups():
+                if progress is not None:
+                    progress(group)
+                _log_group(group, ctx)
+                start = time.perf_counter()
+                if len(group) == 1:
+                    if not _is_async(group[0]):  # tools are not run if do_exec is False
+                        _STEP_RUNNERS[group[0].kind](group[0].args, ctx)
+                elif do_exec:
+                    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                        list(pool.map(lambda steps: _run_steps(steps, ctx), _group_tasks(group)))
+                if do_exec:
+                    timings.append((_group_kinds(group), time.perf_counter() - start))
+            _log_timings(timings, ctx)
+            return timings
+        return run_sync(
+            self.execute_async(cime, do_exec, out, max_workers, progress, journal, timeout)
+        )
+
+    def _context(self, cime, do_exec, out, max_workers, journal, timeout):
+        ctx = _ExecutionContext(self, cime, do_exec, DummyOutput() if out is None else out)
+        ctx.journal = journal
+        ctx.timeout = timeout
+        ctx.max_workers = max_workers
+        return ctx
+
+    async def execute_async(self, cime, do_exec=True, out=None, max_workers=4, progress=None,
+                            journal=None, timeout=None):
+        """Execute the plan, logging each step along with the equivalent commands. The outputs
+        of the external tools, e.g., create_newcase and case.setup, are streamed to the output
+        as they run, and the event loop remains responsive in the meantime. If the awaiting task
+        is cancelled, the running tool is terminated.
+
+        Parameters
+        ----------
+        cime : CIME_interface
+            The CIME interface of the CESM instance to create the case with.
+        do_exec : bool, optional
+            If True, execute the steps. If False, only log them.
+        out : Output, optional
+            The output widget to use for displaying log messages.
+        max_workers : int, optional
+            The maximum number of independent steps to execute concurrently.
+        progress : callable, optional
+            A function to call with each group of steps before the group is executed.
+        journal : list, optional
+            If provided, the ccs_config changes made are appended to this list as
+            (xml_path, tag, key, previous) tuples, which may be passed to revert_ccs_config.
+        timeout : float, optional
+            The maximum time, in seconds, to wait for each external tool to finish.
+
+        Returns
+        -------
+        list of (str, float)
+            The kinds and the wall times, in seconds, of the executed groups of steps.
+        """
+        ctx = self._context(cime, do_exec, out, max_workers, journal, timeout)
+        timings = []
+        loop = asyncio.get_running_loop()
+        for group in self._step_groups():
+            if progress is not None:
+                progress(group)
+            _log_group(group, ctx)
+            start = time.perf_counter()
+            if len(group) == 1:
+                result = _STEP_RUNNERS[group[0].kind](group[0].args, ctx)
+                if inspect.isawaitable(result):
+                    await result
+            elif do_exec:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    await asyncio.gather(
+                        *(
+                            loop.run_in_executor(pool, _run_steps, steps, ctx)
+                            for steps in _group_tasks(group)
+                        )
+                    )
+            if do_exec:
+                timings.append((_group_kinds(group), time.perf_counter() - start))
+        _log_timings(timings, ctx)
+        return timings
+
+
+def _is_async(step):
+    """Return True if the given step runs an external tool, i.e., has a coroutine runner."""
+    return inspect.iscoroutinefunction(_STEP_RUNNERS[step.kind])
+
+
+def _log_group(group, ctx):
+    """Log all the steps of a group first, so that the log remains in the plan order."""
+    for step in group:
+        if step.message is not None:
+            with ctx.out:
+                print(step.message)
+        _STEP_LOGGERS.get(step.kind, _log_nothing)(step.args, ctx)
+
+
+def _group_tasks(group):
+    """Split a group of independent steps into lists of steps that may be run concurrently.
+    user_nl appends to the same model must be made in order."""
+    tasks = {}
+    for step in group:
+        key = step.args["model"] if step.kind == "user_nl" else id(step)
+        tasks.setdefault(key, []).append(step)
+    return list(tasks.values())
+
+
+def _group_kinds(group):
+    return ", ".join(dict.fromkeys(step.kind for step in group))
+
+
+def _log_timings(timings, ctx):
+    if ctx.do_exec and timings:
+        with ctx.out:
+            print(f"{COMMENT}Wall time of each step:{RESET}")
+            for kinds, elapsed in timings:
+                print(f"  {kinds}: {elapsed:.1f} s")
+            print("")
+
+
+def revert_ccs_config(journal):
+    """Revert the ccs_config changes recorded in the given journal by CasePlan.execute, in the
+    reverse order, and clear the journal."""
+    while journal:
+        revert_entry(*journal.pop())
+
+
+class _ExecutionContext:
+    """The state shared by the steps of a plan being executed."""
+
+    def __init__(self, plan, cime, do_exec, out):
+        self.plan = plan
+        self.cime = cime
+        self.do_exec = do_exec
+        self.out = out
+        self.journal = None
+        self.timeout = None
+        self.max_workers = 1
+        self._rundir = None
+
+    @property
+    def rundir(self):
+        """The RUNDIR of the case, which must have been created already."""
+        if self._rundir is None:
+            case = self.cime.get_case(self.plan.caseroot, non_local=self.plan.non_local)
+            self._rundir = Path(case.get_value("RUNDIR"))
+            if not os.access(self._rundir.as_posix(), os.W_OK):
+                raise RuntimeError(
+                    f"Cannot write to {self._rundir}. Please check permissions for the case directory."
+                )
+        return self._rundir
+
+    def resolve(self, path):
+        """Resolve the given path, which may be relative to the RUNDIR of the case."""
+        if path.startswith(RUNDIR):
+            return self.rundir / path[len(RUNDIR) :].lstrip("/")
+        return Path(path)
+
+
+def _run_steps(steps, ctx):
+    for step in steps:
+        _STEP_RUNNERS[step.kind](step.args, ctx)
+
+
+def _log_nothing(args, ctx):
+    pass
+
+
+def _run_nothing(args, ctx):
+    pass
+
+
+def _ccs_config_xml(ctx, filename):
+    """Return the path to the given ccs_config xml file after confirming that it is writeable.
+    Since the file is updated atomically, i.e., replaced by a new file, its directory must be
+    writeable too."""
+    ccs_config_root = Path(ctx.cime.srcroot) / "ccs_config"
+    assert ccs_config_root.exists(), f"ccs_config_root {ccs_config_root} does not exist."
+    xml_path = ccs_config_root / filename
+    assert xml_path.exists(), f"{filename} {xml_path} does not exist."
+    if not is_ccs_config_writeable(ctx.cime) or not os.access(xml_path, os.W_OK):
+        raise RuntimeError(f"Cannot write to {xml_path}.")
+    return xml_path
+
+
+def _update_ccs_config_entry(ctx, xml_path, element, key, allow_override):
+    """Add the given entry to a ccs_config xml file and record the change so that it can be
+    reverted if the case creation fails. The file is checked even if the step is not to be
+    executed, so that conflicts are reported when only displaying commands."""
+    previous = update_entry(xml_path, element, allow_override, ctx.do_exec)
+    if ctx.do_exec and ctx.journal is not None:
+        ctx.journal.append((xml_path.as_posix(), element.tag, key, previous))
+
+
+def _run_modelgrid_alias(args, ctx):
+    """Add a new resolution to modelgrid_aliases_nuopc.xml."""
+    xml_path = _ccs_config_xml(ctx, "modelgrid_aliases_nuopc.xml")
+    element = model_grid_entry(args["alias"], args["grids"])
+    _update_ccs_config_entry(ctx, xml_path, element, args["alias"], args["allow_override"])
+
+
+def _run_component_grid(args, ctx):
+    """Add a new domain to component_grids_nuopc.xml."""
+    xml_path = _ccs_config_xml(ctx, "component_grids_nuopc.xml")
+    element = domain_entry(args["name"], args["nx"], args["ny"], args["mesh"], args["desc"])
+    _update_ccs_config_entry(ctx, xml_path, element, args["name"], args["allow_override"])
+
+
+def create_newcase_cmd(cime, args):
+    """Return the create_newcase command for the given create_newcase step arguments."""
+    cmd = (
+        f"{cime.cimeroot}/scripts/create_newcase "
+        + f"--compset {args['compset']} "
+        + f"--res {args['res']} "
+        + f"--case {args['case']} "
+        + f"--machine {args['machine']} "
+        + "--run-unsupported "
+    )
+    if args.get("pecount"):
+        cmd += f"--pecount {args['pecount']} "
+    if args.get("project"):
+        cmd += f"--project {args['project']} "
+    if args.get("ninst", 1) != 1:
+        cmd += f"--ninst {args['ninst']} "
+    if args.get("non_local"):
+        cmd += "--non-local "
+    return cmd
+
+
+def create_clone_cmd(cime, args):
+    """Return the create_clone command for the given create_clone step arguments."""
+    cmd = (
+        f"{cime.cimeroot}/scripts/create_clone "
+        + f"--case {args['case']} "
+        + f"--clone {args['clone']} "
+    )
+    if args.get("project"):
+        cmd += f"--project {args['project']} "
+    return cmd
+
+
+def _log_create_newcase(args, ctx):
+    with ctx.out:
+        print(f"{COMMENT}Running the create_newcase tool with the following command:{RESET}\n")
+        print(f"{create_newcase_cmd(ctx.cime, args)}\n")
+
+
+def _log_create_clone(args, ctx):
+    with ctx.out:
+        print(f"{COMMENT}Running the create_clone tool with the following command:{RESET}\n")
+        print(f"{create_clone_cmd(ctx.cime, args)}\n")
+
+
+async def _run_case_creation_cmd(tool, cmd, args, ctx):
+    """Run the given create_newcase or create_clone command, streaming its output."""
+    if not ctx.do_exec:
+        return
+    if args.get("machine", "") in [None, "CESM_NOT_PORTED"]:
+        raise RuntimeError(
+            "CESM is not ported to the current machine. "
+            "Therefore, case creation is disabled. "
+            "You can instead click 'Show Commands' to see the necessary steps "
+            "to create a case on a supported machine."
+        )
+    result = await run_command_async(cmd, ctx.out, timeout=ctx.timeout)
+    with ctx.out:
+        if result.returncode == 0:
+            print(f"\n{COMMENT}The {tool} command was successful.{RESET}\n")
+        else:
+            print(f"\n{ERROR}Error creating case.{RESET}\n")
+    if result.returncode != 0:
+        raise RuntimeError("Error creating case.")
+
+
+async def _run_create_newcase(args, ctx):
+    await _run_case_creation_cmd("create_newcase", create_newcase_cmd(ctx.cime, args), args, ctx)
+
+
+async def _run_create_clone(args, ctx):
+    await _run_case_creation_cmd("create_clone", create_clone_cmd(ctx.cime, args), args, ctx)
+
+
+def _log_xmlchanges(args, ctx):
+    # headers maps the indices of changes to the messages to log before them
+    headers = args.get("headers", {})
+    with ctx.out:
+        for i, (var, val) in enumerate(args["changes"]):
+            if str(i) in headers:
+                print(headers[str(i)])
+            print(f"./xmlchange {var}={val}" + (" --non-local" if ctx.plan.non_local else "") + "\n")
+
+
+def _run_xmlchanges(args, ctx):
+    xmlchanges(
+        [tuple(change) for change in args["changes"]],
+        ctx.do_exec,
+        ctx.plan.non_local,
+        ctx.out,
+        cime=ctx.cime,
+        log_cmds=False,
+        caseroot=ctx.plan.caseroot,
+    )
+
+
+def _log_case_setup(args, ctx):
+    with ctx.out:
+        print(f"{COMMENT}Running the case.setup script with the following command:{RESET}\n")
+        print(f"{case_setup_cmd(ctx.plan.non_local)}\n")
+
+
+async def _run_case_setup(args, ctx):
+    if not ctx.do_exec:
+        return
+    cmd = case_setup_cmd(ctx.plan.non_local)
+    result = await run_command_async(cmd, ctx.out, cwd=ctx.plan.caseroot, timeout=ctx.timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"Error running {cmd}.")
+
+
+def _log_copy(args, ctx):
+    with ctx.out:
+        print(f"cp {args['src']} {args['dst']}\n")
+
+
+def _run_copy(args, ctx):
+    if not ctx.do_exec:
+        return
+    dst = ctx.resolve(args["dst"])
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(args["src"], dst)
+
+
+def _user_nl_blocks(args):
+    """Return the blocks of changes of a user_nl step and whether to log the title. A step has
+    either a list of "blocks", or the "pairs" and the "comment" of a single block."""
+    if "blocks" in args:
+        return args["blocks"], True
+    return [{"pairs": args["pairs"], "comment": args.get("comment")}], args.get("log_title", True)
+
+
+def _log_user_nl(args, ctx):
+    blocks, log_title = _user_nl_blocks(args)
+    log_user_nl(args["model"], blocks, ctx.plan.ninst, log_title, ctx.out)
+
+
+def _run_user_nl(args, ctx):
+    if not ctx.do_exec:
+        return
+    blocks, _ = _user_nl_blocks(args)
+    write_user_nl(
+        args["model"], blocks, ctx.plan.caseroot, ctx.plan.ninst, max_workers=ctx.max_workers
+    )
+
+
+_STEP_LOGGERS = {
+    "create_newcase": _log_create_newcase,
+    "create_clone": _log_create_clone,
+    "xmlchanges": _log_xmlchanges,
+    "case_setup": _log_case_setup,
+    "copy": _log_copy,
+    "user_nl": _log_user_nl,
+}
+
+_STEP_RUNNERS = {
+    "message": _run_nothing,
+    "modelgrid_alias": _run_modelgrid_alias,
+    "component_grid": _run_component_grid,
+    "create_newcase": _run_create_newcase,
+    "create_clone": _run_create_clone,
+    "xmlchanges": _run_xmlchanges,
+    "case_setup": _run_case_setup,
+    "copy": _run_copy,
+    "user_nl": _run_user_nl,
+}
@@ -1,13 +1,120 @@
+import logging
 from pathlib import Path
 import subprocess
+import shlex
 import os
+import time
+import signal
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from ProConPy.config_var import cvars
+from ProConPy.event_loop import running_event_loop
 from visualCaseGen.custom_widget_types.dummy_output import DummyOutput
 
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
 COMMENT = "\033[01;96m"  # bold, cyan
 RESET = "\033[0m"
 
+# The outcome of a command run via run_command or run_command_async.
+CommandResult = namedtuple("CommandResult", ["cmd", "returncode", "stdout", "stderr", "elapsed"])
+
+# The time, in seconds, a terminated command is given to exit before it is killed.
+_TERMINATION_GRACE = 5.0
+
+
+async def run_command_async(cmd, out=None, cwd=None, timeout=None):
+    """Run a shell command asynchronously, streaming its stdout and stderr line by line to the
+    given output as they are produced. If the awaiting task is cancelled or the timeout expires,
+    the command (along with any processes it has started) is terminated.
+
+    Parameters
+    ----------
+    cmd : str
+        The shell command to run.
+    out : Output, optional
+        The output widget to stream the output of the command to.
+    cwd : str, optional
+        The working directory to run the command in.
+    timeout : float, optional
+        The maximum time, in seconds, to wait for the command to finish.
+
+    Returns
+    -------
+    CommandResult
+        The return code, the stdout and stderr outputs, and the wall time of the command.
+    """
+
+    out = DummyOutput() if out is None else out
+    start = time.perf_counter()
+    proc = await asyncio.create_subprocess_shell(
+        cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True,  # so that the whole process group can be terminated
+    )
+    stdout, stderr = [], []
+
+    async def pump(stream, lines):
+        async for raw_line in stream:
+            line = raw_line.decode(errors="replace").rstrip("\n")
+            lines.append(line)
+            with out:
+                print(line)
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(pump(proc.stdout, stdout), pump(proc.stderr, stderr), proc.wait()),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        await _terminate(proc)
+        raise RuntimeError(f"{cmd} did not finish in {timeout} seconds.")
+    except asyncio.CancelledError:
+        await _terminate(proc)
+        raise
+
+    elapsed = time.perf_counter() - start
+    logger.info("%s finished in %.2f s with return code %d.", cmd, elapsed, proc.returncode)
+    return CommandResult(cmd, proc.returncode, "\n".join(stdout), "\n".join(stderr), elapsed)
+
+
+async def _terminate(proc):
+    """Terminate the process group of the given process, and kill it if it does not exit."""
+    if proc.returncode is not None:
+        return
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(proc.wait(), _TERMINATION_GRACE)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+
+def run_sync(coro):
+    """Run the given coroutine to completion in a new event loop and return its result. This is
+    for headless and command line use only: in a thread with a running event loop, e.g., that
+    of the notebook kernel, blocking would freeze the loop, so the coroutine must be awaited or
+    scheduled as a task instead."""
+    if running_event_loop() is not None:
+        coro.close()
+        raise RuntimeError(
+            "Cannot block a running event loop. Await the coroutine or schedule it as a task."
+        )
+    return asyncio.run(coro)
+
+
+def run_command(cmd, out=None, cwd=None, timeout=None):
+    """Run a shell command, streaming its output. See run_command_async."""
+    return run_sync(run_command_async(cmd, out, cwd, timeout))
+
 
 def is_ccs_config_writeable(cime):
     srcroot = cime.srcroot
@@ -16,9 +123,18 @@ def is_ccs_config_writeable(cime):
         ccs_config_root.exists()
     ), f"ccs_config_root {ccs_config_root} does not exist."
     modelgrid_aliases_xml = ccs_config_root / "modelgrid_aliases_nuopc.xml"
-    return os.access(modelgrid_aliases_xml, os.W_OK)
+    # ccs_config xml files are updated atomically, i.e., replaced, so the directory must be writeable too.
+    return os.access(modelgrid_aliases_xml, os.W_OK) and os.access(ccs_config_root, os.W_OK)
 
-def run_case_setup(do_exec, is_non_local=False, out=None):
+def case_setup_cmd(is_non_local=False):
+    """Return the command to run the case.setup script."""
+    cmd = "./case.setup"
+    if is_non_local:
+        cmd += " --non-local"
+    return cmd
+
+
+def run_case_setup(do_exec, is_non_local=False, out=None, caseroot=None, timeout=None):
     """Run the case.setup script to set up the case instance.
 
     Parameters
@@ -28,14 +144,18 @@ def run_case_setup(do_exec, is_non_local=False, out=None):
     is_non_local : bool, optional
         If True, the case has been created on a machine different from the one
         that runs visualCaseGen.
+    out : Output, optional
+        The output widget to use for displaying log messages
+    caseroot : str, optional
+        The path to the case directory. If not provided, the value of CASEROOT is used.
+    timeout : float, optional
+        The maximum time, in seconds, to wait for case.setup to finish.
     """
 
-    caseroot = cvars["CASEROOT"].value
+    caseroot = cvars["CASEROOT"].value if caseroot is None else caseroot
 
     # Run ./case.setup
-    cmd = "./case.setup"
-    if is_non_local:
-        cmd += " --non-local"
+    cmd = case_setup_cmd(is_non_local)
 
     out = DummyOutput() if out is None else out
     with out:
@@ -44,11 +164,13 @@ def run_case_setup(do_exec, is_non_local=False, out=None):
         )
         print(f"{cmd}\n")
     if do_exec:
-        runout = subprocess.run(cmd, shell=True, capture_output=True, cwd=caseroot)
-        if runout.returncode != 0:
+        result = run_command(cmd, out, cwd=caseroot, timeout=timeout)
+        if result.returncode != 0:
             raise RuntimeError(f"Error running {cmd}.")
 
-def append_user_nl(model, var_val_pairs, do_exec, comment=None, log_title=True, out=None):
+def append_user_nl(
+    model, var_val_pairs, do_exec, comment=None, log_title=True, out=None, caseroot=None, ninst=None, log=True
+):
     """Apply changes to a given user_nl file.
 
     Parameters
@@ -65,6 +187,12 @@ def append_user_nl(model, var_val_pairs, do_exec, comment=None, log_title=True,
         If True, print the log title "Adding parameter changes to user_nl_filename".
     out : Output, optional
         The output widget to use for displaying log messages
+    caseroot : str, optional
+        The path to the case directory. If not provided, the value of CASEROOT is used.
+    ninst : int, optional
+        The number of model instances. If not provided, the value of NINST is used.
+    log : bool, optional
+        If False, the changes are not printed.
     """
 
     # confirm var_val_pairs is a list of tuples:
@@ -73,36 +201,118 @@ def append_user_nl(model, var_val_pairs, do_exec, comment=None, log_title=True,
 
     out = DummyOutput() if out is None else out
 
-    caseroot = cvars["CASEROOT"].value
-    ninst = cvars["NINST"].value
+    caseroot = cvars["CASEROOT"].value if caseroot is None else caseroot
+    ninst = cvars["NINST"].value if ninst is None else ninst
+    blocks = [{"pairs": var_val_pairs, "comment": comment}]
 
-    def _do_append_user_nl(user_nl_filename):
+    for user_nl_filename in user_nl_filenames(model, ninst):
         # Print the changes to the user_nl file:
-        with out:
-            if log_title:
-                print(f"{COMMENT}Adding parameter changes to {user_nl_filename}:{RESET}\n")
-            if comment:
-                print(f"  ! {comment}")
-            for var, val in var_val_pairs:
-                print(f"  {var} = {val}")
-            print("")
+        if log:
+            _log_user_nl_blocks(user_nl_filename, blocks, log_title, out)
 
         if not do_exec:
-            return
+            continue
 
         # Apply the changes to the user_nl file:
         with open(Path(caseroot) / user_nl_filename, "a") as f:
-            if comment:
-                f.write(f"\n! {comment}\n")
-            for var, val in var_val_pairs:
-                f.write(f"{var} = {val}\n")
+            f.write(_user_nl_text(blocks))
 
+
+def user_nl_filenames(model, ninst=1):
+    """Return the names of the user_nl files of the given model, one per model instance."""
     ninst = 1 if ninst is None else ninst
-    if ninst==1:
-        _do_append_user_nl(f"user_nl_{model}")
+    if ninst == 1:
+        return [f"user_nl_{model}"]
+    return [f"user_nl_{model}_{str(i).zfill(4)}" for i in range(1, ninst + 1)]
+
+
+def dedup_user_nl_blocks(blocks):
+    """Return the given blocks of user_nl changes such that each variable is set only once,
+    where it is set last. Namelist variable names are case-insensitive. The blocks that are
+    left with no changes are dropped.
+
+    Parameters
+    ----------
+    blocks : list of dict
+        The blocks of changes, each with a list of (var, val) "pairs" and an optional "comment".
+    """
+    last = {}
+    for i, block in enumerate(blocks):
+        for j, (var, _) in enumerate(block["pairs"]):
+            last[var.lower()] = (i, j)
+    deduped = []
+    for i, block in enumerate(blocks):
+        pairs = [
+            [var, val] for j, (var, val) in enumerate(block["pairs"]) if last[var.lower()] == (i, j)
+        ]
+        if pairs:
+            deduped.append({"pairs": pairs, "comment": block.get("comment")})
+    return deduped
+
+
+def _user_nl_text(blocks):
+    """Return the text to append to a user_nl file for the given blocks of changes."""
+    lines = []
+    for block in blocks:
+        if block.get("comment"):
+            lines.append(f"\n! {block['comment']}\n")
+        lines.extend(f"{var} = {val}\n" for var, val in block["pairs"])
+    return "".join(lines)
+
+
+def _log_user_nl_blocks(target, blocks, log_title, out):
+    with out:
+        if log_title:
+            print(f"{COMMENT}Adding parameter changes to {target}:{RESET}\n")
+        for block in blocks:
+            if block.get("comment"):
+                print(f"  ! {block['comment']}")
+            for var, val in block["pairs"]:
+                print(f"  {var} = {val}")
+            print("")
+
+
+def log_user_nl(model, blocks, ninst=1, log_title=True, out=None):
+    """Print the given blocks of changes to the user_nl files of a model. The changes are
+    printed once, rather than once per model instance."""
+    filenames = user_nl_filenames(model, ninst)
+    target = filenames[0] if len(filenames) == 1 else f"{filenames[0]} ... {filenames[-1]}"
+    _log_user_nl_blocks(target, blocks, log_title, DummyOutput() if out is None else out)
+
+
+def write_user_nl(model, blocks, caseroot=None, ninst=None, max_workers=1):
+    """Append the given blocks of changes to the user_nl files of a model, opening and writing
+    each file (one per model instance) only once.
+
+    Parameters
+    ----------
+    model : str
+        The model whose user_nl files will be modified.
+    blocks : list of dict
+        The blocks of changes, each with a list of (var, val) "pairs" and an optional "comment".
+    caseroot : str, optional
+        The path to the case directory. If not provided, the value of CASEROOT is used.
+    ninst : int, optional
+        The number of model instances. If not provided, the value of NINST is used.
+    max_workers : int, optional
+        The maximum number of files to write concurrently.
+    """
+
+    caseroot = Path(cvars["CASEROOT"].value if caseroot is None else caseroot)
+    ninst = cvars["NINST"].value if ninst is None else ninst
+    text = _user_nl_text(blocks)
+
+    def append(user_nl_filename):
+        with open(caseroot / user_nl_filename, "a") as f:
+            f.write(text)
+
+    filenames = user_nl_filenames(model, ninst)
+    if max_workers > 1 and len(filenames) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(append, filenames))
     else:
-        for i in range(1, ninst+1):
-            _do_append_user_nl(f"user_nl_{model}_{str(i).zfill(4)}")
+        for user_nl_filename in filenames:
+            append(user_nl_filename)
 
 def xmlchange(var, val, do_exec=True, is_non_local=False, out=None):
     """Apply custom xml changes to the case.
@@ -134,3 +344,129 @@ def xmlchange(var, val, do_exec=True, is_non_local=False, out=None):
     runout = subprocess.run(cmd, shell=True, capture_output=True, cwd=caseroot)
     if runout.returncode != 0:
         raise RuntimeError(f"Error running {cmd}.")
+
+
+def xmlchange_cmds(changes, is_non_local=False):
+    """Return the ./xmlchange commands to apply the given changes. Changes are combined into a
+    single command with a comma-separated list of VAR=VAL pairs, except for the values that
+    contain commas, which xmlchange would split at, and which are therefore applied via separate
+    --id/--val commands. Arguments are quoted for the shell.
+
+    Parameters
+    ----------
+    changes : list of tuples
+        A list of (var, val) tuples.
+    is_non_local : bool
+        If True, the case is being created on a machine different from the one
+        that runs visualCaseGen.
+
+    Returns
+    -------
+    list of str
+        The xmlchange commands.
+    """
+    combined = [f"{var}={val}" for var, val in changes if "," not in str(val)]
+    separate = [(var, str(val)) for var, val in changes if "," in str(val)]
+    cmds = [f"./xmlchange {shlex.quote(','.join(combined))}"] if combined else []
+    cmds += [
+        f"./xmlchange --id {shlex.quote(var)} --val {shlex.quote(val)}" for var, val in separate
+    ]
+    if is_non_local is True:
+        cmds = [cmd + " --non-local" for cmd in cmds]
+    return cmds
+
+
+def _apply_xmlchanges_in_process(cime, caseroot, changes, is_non_local, cmds):
+    """Apply the given changes through the CIME Case API and write the case xml files once.
+    The files are written only if all the changes are successfully set. As ./xmlchange does, the
+    equivalent commands are then recorded in the replay.sh and CaseStatus files of the case."""
+    case = cime.get_case(caseroot, read_only=False, non_local=is_non_local)
+    for var, val in changes:
+        if case.set_value(var, str(val)) is None:
+            raise RuntimeError(f'No variable "{var}" found in case {caseroot}.')
+    case.flush()
+    try:
+        for cmd in cmds:
+            case.record_cmd(cmd=shlex.split(cmd))
+            _append_case_status(caseroot, f"<command> {cmd} </command>")
+    except Exception as e:
+        # The changes are applied already, so only the provenance records are missing.
+        logger.warning("Cannot record the xml changes in replay.sh and CaseStatus (%s).", e)
+
+
+def _append_case_status(caseroot, msg):
+    """Append a successful xmlchange entry to the CaseStatus file of the case."""
+    from CIME.utils import append_case_status
+
+    append_case_status("xmlchange", "success", msg=msg, caseroot=caseroot)
+
+
+def xmlchanges(
+    changes, do_exec=True, is_non_local=False, out=None, cime=None, log_cmds=True, caseroot=None
+):
+    """Apply multiple xml changes to the case at once. If a CIME interface is provided, the
+    changes are applied within the current process through the CIME Case API, reading and
+    writing the case xml files only once. Otherwise, or if that fails, a single ./xmlchange
+    command with a comma-separated list of changes is executed (see xmlchange_cmds).
+
+    Parameters
+    ----------
+    changes : list of tuples
+        A list of (var, val) tuples.
+    do_exec : bool
+        If True, execute the commands. If False, only print them.
+    is_non_local : bool
+        If True, the case is being created on a machine different from the one
+        that runs visualCaseGen.
+    out : Output
+        The output widget to use for displaying log messages.
+    cime : CIME_interface, optional
+        The CIME interface to apply the changes in-process with.
+    log_cmds : bool, optional
+        If True, print the equivalent xmlchange commands.
+    caseroot : str, optional
+        The path to the case directory. If not provided, the value of CASEROOT is used.
+
+    Returns
+    -------
+    float
+        The wall time, in seconds, spent applying the changes.
+    """
+
+    assert isinstance(changes, list)
+    assert all(isinstance(change, tuple) and len(change) == 2 for change in changes)
+
+    caseroot = cvars["CASEROOT"].value if caseroot is None else caseroot
+    cmds = xmlchange_cmds(changes, is_non_local)
+
+    out = DummyOutput() if out is None else out
+    if log_cmds:
+        with out:
+            for cmd in cmds:
+                print(f"{cmd}\n")
+
+    if not do_exec or not changes:
+        return 0.0
+
+    start = time.perf_counter()
+    applied_in_process = False
+    if cime is not None:
+        try:
+            _apply_xmlchanges_in_process(cime, caseroot, changes, is_non_local, cmds)
+            applied_in_process = True
+        except Exception as e:
+            logger.warning("Cannot apply xml changes in-process (%s). Running xmlchange instead.", e)
+    if not applied_in_process:
+        for cmd in cmds:
+            runout = subprocess.run(cmd, shell=True, capture_output=True, cwd=caseroot)
+            if runout.returncode != 0:
+                raise RuntimeError(f"Error running {cmd}.")
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        "Applied %d xml changes %s in %.2f s.",
+        len(changes),
+        "in-process" if applied_in_process else f"via {len(cmds)} xmlchange command(s)",
+        elapsed,
+    )
+    return elapsed
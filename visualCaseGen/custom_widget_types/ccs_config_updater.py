@@ -0,0 +1,236 @@
+"""Incremental updates of ccs_config xml files, e.g., modelgrid_aliases_nuopc.xml and
+component_grids_nuopc.xml. A single model_grid or domain entry is appended, replaced, or
+removed in place, leaving the rest of the file untouched. Updates are made while holding an
+exclusive lock on the file and are written atomically (to a temporary file that is then renamed
+over the original), so that multiple users or processes sharing a sandbox can safely update
+the same file. The locations of the existing entries are indexed, and the index is cached until
+the file changes."""
+
+import os
+import re
+import fcntl
+import tempfile
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from xml.etree.ElementTree import Element, SubElement
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
+# The attribute that identifies each kind of entry
+_KEY_ATTRS = {"model_grid": "alias", "domain": "name"}
+
+# Cached entry indices: (path, tag) -> (text, {key: (start, end)})
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+
+def _lock_path(xml_path):
+    """Return the lock file of the given xml file, i.e., a hidden file next to it. Keeping the
+    lock on the same (shared) file system as the xml file serializes the updates made from all
+    the hosts sharing the sandbox, e.g., HPC login and compute nodes."""
+    xml_path = Path(xml_path)
+    return xml_path.parent / f".{xml_path.name}.lock"
+
+
+@contextmanager
+def locked(xml_path):
+    """Hold an exclusive lock on the given xml file. A separate lock file is used since the xml
+    file itself gets replaced when updated. The lock file is left in place, since removing it
+    would allow a waiting process to lock a file that no longer exists."""
+    fd = os.open(_lock_path(xml_path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        try:
+            os.fchmod(fd, 0o666)  # allow other users to lock the same file
+        except OSError:
+            pass  # the lock file is owned by another user
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _entry_pattern(tag):
+    # Comments are matched too, so that the entries commented out are skipped.
+    attr = _KEY_ATTRS[tag]
+    return re.compile(
+        rf"<!--.*?-->|<{tag}\b[^>]*?\b{attr}=([\"'])(.*?)\1[^>]*?(?:/>|>.*?</{tag}\s*>)",
+        re.DOTALL,
+    )
+
+
+def entry_index(xml_path, tag, text=None):
+    """Return a dict mapping the keys (aliases or names) of the entries of the given tag to
+    their (start, end) offsets in the given xml file. If given, the text of the file, e.g., as
+    read while holding the lock, is indexed instead of reading the file again. The index is
+    cached until the text of the file changes."""
+    xml_path = Path(xml_path)
+    if text is None:
+        text = xml_path.read_text()
+    cache_key = (xml_path.resolve().as_posix(), tag)
+    with _index_cache_lock:
+        cached = _index_cache.get(cache_key)
+    if cached is not None and cached[0] == text:
+        return cached[1]
+    index = _build_index(text, tag)
+    with _index_cache_lock:
+        _index_cache[cache_key] = (text, index)
+    return index
+
+
+def _build_index(text, tag):
+    index = {}
+    for match in _entry_pattern(tag).finditer(text):
+        if match.group(2) is not None:
+            index[match.group(2)] = (match.start(), match.end())
+    return index
+
+
+def model_grid_entry(alias, grids):
+    """Return a model_grid element for modelgrid_aliases_nuopc.xml.
+
+    Parameters
+    ----------
+    alias : str
+        The resolution alias.
+    grids : list of (str, str)
+        The (component, grid name) pairs of the resolution, e.g., [("atm", "0.9x1.25"), ...]
+    """
+    element = Element("model_grid", attrib={"alias": alias})
+    for comp, grid in grids:
+        SubElement(element, "grid", attrib={"name": comp}).text = grid
+    return element
+
+
+def domain_entry(name, nx, ny, mesh, desc):
+    """Return a domain element for component_grids_nuopc.xml."""
+    element = Element("domain", attrib={"name": name})
+    for field, value in (("nx", nx), ("ny", ny), ("mesh", mesh), ("desc", desc)):
+        SubElement(element, field).text = str(value)
+    return element
+
+
+def _indent_unit(text, index):
+    """Return the indentation of the existing entries, if any, or two spaces."""
+    for start, _ in index.values():
+        line_start = text.rfind("\n", 0, start) + 1
+        prefix = text[line_start:start]
+        if prefix and prefix.isspace():
+            return prefix
+    return "  "
+
+
+def _serialize(element, unit):
+    ET.indent(element, space=unit, level=1)
+    return ET.tostring(element, encoding="unicode")
+
+
+def _write_atomically(xml_path, text):
+    """Write the given text to a temporary file next to xml_path and rename it over xml_path."""
+    fd, tmp_path = tempfile.mkstemp(dir=xml_path.parent, prefix=f".{xml_path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, xml_path.stat().st_mode & 0o7777)
+        os.replace(tmp_path, xml_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_entry(xml_path, element, allow_override=False, do_exec=True):
+    """Append the given model_grid or domain entry to a ccs_config xml file, or replace the
+    existing entry with the same key. The rest of the file is left unchanged.
+
+    Parameters
+    ----------
+    xml_path : str or Path
+        The path to the xml file.
+    element : Element
+        The entry to add, e.g., as returned by model_grid_entry or domain_entry.
+    allow_override : bool, optional
+        If True, an existing entry with the same key is replaced. Otherwise, an error is raised.
+    do_exec : bool, optional
+        If False, only check whether the entry can be added.
+
+    Returns
+    -------
+    str or None
+        The text of the replaced entry, if any, which may be passed to revert_entry.
+    """
+
+    xml_path = Path(xml_path)
+    tag = element.tag
+    key = element.attrib[_KEY_ATTRS[tag]]
+
+    with locked(xml_path):
+        text = xml_path.read_text()
+        index = entry_index(xml_path, tag, text)
+        if key in index and not allow_override:
+            raise RuntimeError(f'A {tag} entry "{key}" already exists in {xml_path.name}.')
+        if not do_exec:
+            return None
+
+        new_entry = _serialize(element, _indent_unit(text, index))
+        if key in index:
+            start, end = index[key]
+            previous = text[start:end]
+            text = text[:start] + new_entry + text[end:]
+        else:
+            # Insert the new entry right before the closing tag of the root element:
+            previous = None
+            root_end = text.rstrip().rfind("</")
+            assert root_end != -1, f"Cannot find the root element closing tag in {xml_path}."
+            line_start = text.rfind("\n", 0, root_end) + 1
+            if text[line_start:root_end].isspace() or line_start == root_end:
+                root_end = line_start  # insert before the line of the closing tag
+                new_entry = f"{_indent_unit(text, index)}{new_entry}\n"
+            else:
+                new_entry = f"\n{_indent_unit(text, index)}{new_entry}\n"
+            text = text[:root_end] + new_entry + text[root_end:]
+        _write_atomically(xml_path, text)
+
+    logger.debug(f"Updated {tag} entry {key} in {xml_path}.")
+    return previous
+
+
+def revert_entry(xml_path, tag, key, previous=None):
+    """Revert an update made by update_entry: restore the previous text of the entry, or remove
+    the entry if it did not exist before.
+
+    Parameters
+    ----------
+    xml_path : str or Path
+        The path to the xml file.
+    tag : str
+        The entry tag, i.e., "model_grid" or "domain".
+    key : str
+        The alias or name of the entry.
+    previous : str, optional
+        The previous text of the entry, as returned by update_entry.
+    """
+
+    xml_path = Path(xml_path)
+    with locked(xml_path):
+        text = xml_path.read_text()
+        index = entry_index(xml_path, tag, text)
+        if key not in index:
+            return
+        start, end = index[key]
+        if previous is None:
+            # Remove the entry along with its line:
+            line_start = text.rfind("\n", 0, start) + 1
+            if text[line_start:start].isspace() or line_start == start:
+                start = line_start
+                if text[end : end + 1] == "\n":
+                    end += 1
+            previous = ""
+        _write_atomically(xml_path, text[:start] + previous + text[end:])
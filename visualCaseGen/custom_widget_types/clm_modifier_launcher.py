@@ -1,14 +1,16 @@
 import os
+import shlex
 import logging
+import asyncio
 from ipywidgets import VBox, Button, Output
 from pathlib import Path
-import subprocess
-import time
 
 from ProConPy.out_handler import handler as owh
 from ProConPy.stage import Stage
 from ProConPy.config_var import cvars
 from ProConPy.dialog import alert_warning
+from ProConPy.event_loop import running_event_loop
+from visualCaseGen.custom_widget_types.case_tools import run_command_async, run_sync
 
 
 class ClmModifierLauncher(VBox):
@@ -44,7 +46,7 @@ class ClmModifierLauncher(VBox):
 
         # observe changes in the required variables
         for var in self._required_vars:
-            var._widget.observe(
+            var.widget.observe(
                 self._on_required_var_change, names="_property_lock", type="change"
             )
 
@@ -56,10 +58,25 @@ class ClmModifierLauncher(VBox):
         )
         self._btn_launch.on_click(self._on_launch_clicked)
 
+        # Cancels the tool run in progress. Displayed only while the tool is running.
+        self._btn_cancel = Button(
+            description="Cancel",
+            button_style="danger",
+            layout={
+                "width": "max-content",
+                "margin": "10px",
+                "align_self": "center",
+                "display": "none",
+            },
+        )
+        self._btn_cancel.on_click(self._on_cancel_clicked)
+        self._task = None
+
         self._out = Output()
 
         self.children = [
             self._btn_launch,
+            self._btn_cancel,
             self._out,
         ]
 
@@ -73,9 +90,15 @@ class ClmModifierLauncher(VBox):
         self._btn_launch.disabled = value
 
     def _on_required_var_change(self, change):
+        self._on_cancel_clicked()
         self._status_var.value = None
         self._out.clear_output()
 
+    def _on_cancel_clicked(self, b=None):
+        """Cancel the tool run in progress, terminating the tool process."""
+        if self._task is not None:
+            self._task.cancel()
+
     @owh.out.capture()
     def _on_launch_clicked(self, b):
 
@@ -110,15 +133,40 @@ class ClmModifierLauncher(VBox):
         modified_file_path = lnd_dir / f"{base_lnd_grid}_{self._tool_name}.nc"
 
         self._write_config(config_file_path, modified_file_path)
-        success = self._run_tool(config_file_path, modified_file_path)
 
-        if success:
+        # Within a running event loop, e.g., that of the notebook kernel, run the tool in a task
+        # so that the kernel remains responsive while the tool output is streamed.
+        loop = running_event_loop()
+        if loop is not None:
+            self._task = loop.create_task(self._launch_task(config_file_path, modified_file_path))
+        elif run_sync(self._run_tool_async(config_file_path, modified_file_path)):
             self._status_var.value = "success"
 
+    async def _launch_task(self, config_file_path, modified_file_path):
+        """Run the tool asynchronously, displaying the Cancel button in the meantime, and set
+        the status variable on success."""
+        self._btn_launch.disabled = True
+        self._btn_cancel.layout.display = "flex"
+        try:
+            if await self._run_tool_async(config_file_path, modified_file_path):
+                self._status_var.value = "success"
+        except asyncio.CancelledError:
+            with self._out:
+                print(f"\n{self._tool_name} cancelled.")
+        except Exception as e:
+            with owh.out:
+                alert_warning(str(e))
+        finally:
+            self._btn_cancel.layout.display = "none"
+            self._btn_launch.disabled = False
+            self._task = None
+
     def _write_config(self, config_file_path, modified_file_path):
         raise NotImplementedError  # must be implemented by subclasses
 
-    def _run_tool(self, config_file_path, modified_file_path):
+    async def _run_tool_async(self, config_file_path, modified_file_path):
+        """Run the tool, streaming its stdout and stderr to the output widget as they are
+        produced, and return True if the modified file is generated."""
 
         # if an old file exists, remove it
         if modified_file_path.exists():
@@ -136,45 +184,31 @@ class ClmModifierLauncher(VBox):
         if not os.path.exists(exe_path):
             raise RuntimeError(f"Cannot find {self._tool_name} tool!")
 
-        cmd = f"{exe_path} {config_file_path}"
-
-        proc = subprocess.Popen(
-            cmd,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
+        cmd = f"{shlex.quote(exe_path)} {shlex.quote(str(config_file_path))}"
 
         success = False
 
         with self._out:
             print(
                 f"Running {self._tool_name}. This may take a while. visualCaseGen will "
-                f"be unresponsive until the process is complete, and will automatically "
-                f"proceed to the next stage when done.\n"
+                f"automatically proceed to the next stage when done.\n"
             )
-            while proc.poll() is None:
-                time.sleep(1)
-                print(".", end="")
 
-            stdout, stderr = proc.communicate()
+        result = await run_command_async(cmd, self._out)
 
+        with self._out:
             print(f"\nDone running {self._tool_name}.")
-            if stdout:
-                print(stdout)
-            if stderr:
+            if result.stderr:
                 if os.path.exists(modified_file_path):
                     print(
-                        f"The {self._tool_name} tool has generated the file  {modified_file_path}"
-                        "but the following warnings were issued:"
+                        f"The {self._tool_name} tool has generated the file {modified_file_path} "
+                        "but the above warnings were issued."
                     )
                     success = True
                 else:
                     print(
                         f"The {self._tool_name} tool has failed to generate the file."
                     )
-                print(stderr)
             elif os.path.exists(modified_file_path):
                 print(
                     f"The {self._tool_name} tool has generated the file {modified_file_path}"
@@ -296,13 +330,13 @@ class FsurdatModifierLauncher(ClmModifierLauncher):
             else:
                 raise ValueError("Invalid FSURDAT_AREA_SPEC value")
 
-            lai = " ".join([str(w.value) for w in cvars["FSURDAT_MATRIX"]._widget.lai])
-            sai = " ".join([str(w.value) for w in cvars["FSURDAT_MATRIX"]._widget.sai])
+            lai = " ".join([str(w.value) for w in cvars["FSURDAT_MATRIX"].widget.lai])
+            sai = " ".join([str(w.value) for w in cvars["FSURDAT_MATRIX"].widget.sai])
             hgt_top = " ".join(
-                [str(w.value) for w in cvars["FSURDAT_MATRIX"]._widget.hgt_top]
+                [str(w.value) for w in cvars["FSURDAT_MATRIX"].widget.hgt_top]
             )
             hgt_bot = " ".join(
-                [str(w.value) for w in cvars["FSURDAT_MATRIX"]._widget.hgt_bot]
+                [str(w.value) for w in cvars["FSURDAT_MATRIX"].widget.hgt_bot]
             )
 
             f.write(
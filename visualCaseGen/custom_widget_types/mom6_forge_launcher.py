@@ -36,7 +36,7 @@ class MOM6ForgeLauncher(VBox):
 
         # observe changes in the required variables
         for var in self.required_mom6_forge_vars:
-            var._widget.observe(self._on_required_var_change, names="_property_lock", type="change")
+            var.widget.observe(self._on_required_var_change, names="_property_lock", type="change")
 
         # Create the main child widgets: Launcg button, Output, and Confirm button
 
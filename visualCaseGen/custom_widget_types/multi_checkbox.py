@@ -4,19 +4,26 @@ from traitlets import Any, observe, validate
 from ipywidgets import trait_types
 from ProConPy.out_handler import handler as owh
 from ProConPy.dialog import alert_warning
+from ProConPy.event_loop import running_event_loop
+from visualCaseGen.custom_widget_types.options_search_index import OptionsSearchIndex
 
 _checkbox_width = "190px"
 _less_options = 16
+_max_rows = 64  # maximum number of option rows rendered at a time in "all" display mode
+_filter_delay = 0.25  # seconds to wait after the last keystroke before filtering the options
 
 
 class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
     """A multi-checkbox widget. The user may select multiple options from a list of options.
     The options are displayed as checkboxes. The user may filter the options by typing in a textbox.
     The user may also switch between displaying all options and displaying only a few options.
+    When displaying all options, at most _max_rows checkboxes are rendered at a time, and the user
+    pages through the rest. Checkboxes are pooled and reused as the displayed options change.
     """
 
     value = trait_types.TypedTuple(trait=Any(), help="Selected values").tag(sync=True)
-    options = Any((), help="Options to display.").tag(sync=True)
+    # (The options are rendered via checkboxes, so they need not be synced with the frontend.)
+    options = Any((), help="Options to display.")
 
     def __init__(
         self,
@@ -72,6 +79,17 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         self._display_less = display_mode == "less"
         self._filter = filter
 
+        # An optional callable that, given a tuple of options about to be displayed, returns the
+        # same options in their final form. This allows the owner of the widget, e.g., a ConfigVar
+        # with lazy validities, to determine the validities of the displayed options only.
+        self.options_resolver = None
+        self._patching_options = False
+
+        # Search index over options and tooltips, (re)built lazily when the filter is first used
+        # after a change in options or tooltips. Pending filter call (if any) is kept to debounce.
+        self._search_index = None
+        self._pending_filter = None
+
         # Auxiliary widgets
         self._mode_selection_btn = self._gen_mode_selection_btn()
         self._filter_textbox = self._gen_filter_textbox()
@@ -84,6 +102,7 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
             },
         )
         self._display_mode_btn = self._gen_display_mode_btn()
+        self._page_nav = self._gen_page_nav()
 
         # Options and tooltips widgets
         self._options_vbox = widgets.VBox(
@@ -91,6 +110,12 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         )
         self._tooltips_widget = widgets.HTML()
 
+        # Pool of checkboxes, of which the first _len_options_to_display() are displayed, and the
+        # index of the first filtered option displayed (in "all" display mode).
+        self._checkboxes = []
+        self._window_start = 0
+        self._paging = False
+
         # Options and tooltips
         # (Filtered options and tooltips correspond to the options and tooltips that are obtained
         # after filtering the full options and tooltips. If the number of filtered options is
@@ -117,6 +142,7 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
                 },
             ),
             self._placeholder_label,
+            self._page_nav,
             self._display_mode_btn,
         ]
 
@@ -146,7 +172,9 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         self._mode_selection_btn.disabled = self._disabled
         self._filter_textbox.disabled = self._disabled
         self._display_mode_btn.disabled = self._disabled
-        for checkbox in self._options_vbox.children:
+        for btn in self._page_nav.children[::2]:
+            btn.disabled = self._disabled
+        for checkbox in self._checkboxes:
             checkbox.disabled = self._disabled
 
     def _gen_mode_selection_btn(self):
@@ -209,11 +237,11 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         widgets.Text
             The filter textbox."""
 
-        def filtered_options_list(filter_text):
-            """Return the options that match the filter text. The filter text is split into exact
-            keywords and other keywords. The options must contain all exact keywords and at least one
-            of the other keywords. Exact keywords are enclosed in double quotes. The options are
-            compared case-insensitively."""
+        def filtered_options_ix(filter_text):
+            """Return the indices of options that match the filter text, ranked by relevance. The
+            filter text is split into exact keywords and other keywords. The options must contain
+            all exact keywords and at least one of the other keywords. Exact keywords are enclosed
+            in double quotes. The options are compared case-insensitively."""
 
             # all keywords
             filter_text_split_quotes = filter_text.split('"')
@@ -228,26 +256,15 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
                 if keyword.strip() != ""
             ]
 
-            return tuple(
-                opt
-                for opt in self.options
-                if (
-                    (
-                        opt_text_lower := opt.lower()
-                        + self._tooltips[self._options_ix[opt]].lower()
-                    )
-                    and any([keyword in opt_text_lower for keyword in other_keywords])
-                    or not other_keywords
-                )
-                and (
-                    all([keyword in opt_text_lower for keyword in exact_keywords])
-                    or not exact_keywords
-                )
-            )
+            if self._search_index is None:
+                self._search_index = OptionsSearchIndex(self.options, self._tooltips)
 
-        def on_filter_textbox_change(change):
-            """Callback for the filter textbox."""
-            filter_text = change["new"].lower().strip()
+            return self._search_index.search(exact_keywords, other_keywords)
+
+        def apply_filter(filter_text):
+            """Filter the options and refresh the options and tooltips widgets."""
+            self._pending_filter = None
+            self._window_start = 0
             old_value = self.value
 
             if filter_text == "":
@@ -260,16 +277,33 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
                     self._signal_value_to_backend()
 
                 # filter options must contain all exact keywords and at least one of the other keywords
-                self._filtered_options = filtered_options_list(filter_text)
-
+                filtered_ix = filtered_options_ix(filter_text)
+                self._filtered_options = tuple(self.options[ix] for ix in filtered_ix)
                 self._filtered_tooltips = tuple(
-                    self._tooltips[self._options_ix[opt]]
-                    for opt in self._filtered_options
+                    self._tooltips[ix] if self._tooltips else "" for ix in filtered_ix
                 )
 
             self._refresh_options_widgets()
             self._refresh_tooltips()
 
+        def on_filter_textbox_change(change):
+            """Callback for the filter textbox. Filtering is debounced, i.e., carried out only
+            after the user stops typing for _filter_delay seconds, if there is a running event
+            loop. Clearing the filter takes effect immediately."""
+            filter_text = change["new"].lower().strip()
+
+            if self._pending_filter is not None:
+                self._pending_filter.cancel()
+                self._pending_filter = None
+
+            loop = running_event_loop()
+            if filter_text == "" or loop is None:
+                apply_filter(filter_text)
+            else:
+                self._pending_filter = loop.call_later(
+                    _filter_delay, owh.out.capture()(apply_filter), filter_text
+                )
+
             # End of on_filter_textbox_change
 
         filter_textbox = widgets.Text(
@@ -301,6 +335,51 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         display_mode_btn.on_click(self._switch_display_mode)
         return display_mode_btn
 
+    def _gen_page_nav(self):
+        """Generate and return the page navigation widgets. These allow the user to page through
+        the options in "all" display mode when there are more than _max_rows (filtered) options.
+
+        Returns
+        -------
+        widgets.HBox
+            Previous page button, page label, and next page button.
+        """
+        prev_btn = widgets.Button(
+            icon="chevron-left", tooltip="Previous options", layout={"width": "40px"}
+        )
+        page_label = widgets.Label(layout={"margin": "0px 10px"})
+        next_btn = widgets.Button(
+            icon="chevron-right", tooltip="Next options", layout={"width": "40px"}
+        )
+        prev_btn.on_click(lambda b: self._show_page(self._window_start - _max_rows))
+        next_btn.on_click(lambda b: self._show_page(self._window_start + _max_rows))
+        return widgets.HBox(
+            [prev_btn, page_label, next_btn],
+            layout={"display": "none", "align_self": "center", "margin": "5px"},
+        )
+
+    @owh.out.capture()
+    def _show_page(self, start):
+        """Display the page of (filtered) options starting at the given index. The value of the
+        widget remains the same."""
+
+        self._window_start = max(0, min(start, len(self._filtered_options) - 1))
+
+        # The checkboxes are updated to display the new page, which is not a user change.
+        self._paging = True
+        try:
+            self._refresh_options_widgets()
+            self._refresh_tooltips()
+            for cb in self._options_vbox.children:
+                cb.value = cb.description in self.value
+        finally:
+            self._paging = False
+
+    def _page_start_of(self, opt):
+        """Return the start index of the page containing the given (filtered) option."""
+        ix = self._filtered_options.index(opt)
+        return ix - ix % _max_rows
+
     def _switch_display_mode(self, b=None):
         """Switch between displaying all options and displaying only a few options (_less_options)."""
 
@@ -314,15 +393,18 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         old_value = self.value
         self.value = ()
 
+        # display the page containing the old value, if any
+        self._window_start = 0
+        if not self._display_less and old_value and old_value[0] in self._filtered_options:
+            self._window_start = self._page_start_of(old_value[0])
+
         # refresh options and tooltips
         self._refresh_options_widgets()
         self._refresh_tooltips()
 
         # set to old value if it's still in the options
-        if all(
-            opt in self._filtered_options[: self._len_options_to_display()]
-            for opt in old_value
-        ):
+        displayed_options = self._displayed_options()
+        if all(opt in displayed_options for opt in old_value):
             self.value = old_value
 
         # signal value change to backend
@@ -359,14 +441,14 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         new_vals = change["new"]
 
         # check if the new vars are all displayed
-        if self._display_less or self._filter_textbox.value != "":
-            all_new_vals_displayed = all(
-                val in self._filtered_options[: self._len_options_to_display()]
-                for val in new_vals
-            )
-            if not all_new_vals_displayed:
+        displayed_options = self._displayed_options()
+        if not all(val in displayed_options for val in new_vals):
+            if self._display_less or self._filter_textbox.value != "":
                 self._filter_textbox.value = ""
                 self._switch_display_mode()
+            else:
+                # display the page containing the new value
+                self._show_page(self._page_start_of(new_vals[0]))
 
         # update checkboxes
         for cb in self._options_vbox.children:
@@ -386,62 +468,143 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         # release lock
         self._property_lock = {}
 
+    def _display_range(self):
+        """Return the start and end indices of the filtered options to display. In "less" mode,
+        these are the first _less_options options. In "all" mode, these are the (at most)
+        _max_rows options of the current page."""
+
+        if self._display_less:
+            return 0, min(len(self._filtered_options), _less_options)
+        if self._window_start >= len(self._filtered_options):
+            self._window_start = 0
+        return self._window_start, min(
+            len(self._filtered_options), self._window_start + _max_rows
+        )
+
+    def _displayed_options(self):
+        """Return the filtered options to display."""
+        start, end = self._display_range()
+        return self._filtered_options[start:end]
+
     def _len_options_to_display(self):
-        """Return the number of options to display. This number is either _less_options or the
-        length of the filtered options, depending on the display mode and the number of filtered
-        options."""
-
-        return (
-            min(len(self._filtered_options), _less_options)
-            if self._display_less
-            else len(self._filtered_options)
+        """Return the number of options to display. This number is at most _less_options or
+        _max_rows, depending on the display mode and the number of filtered options."""
+
+        start, end = self._display_range()
+        return end - start
+
+    def _rename_options(self, renames):
+        """Replace the given options (keys) with new ones (values) in place, i.e., without
+        resetting the value, the filter, or the display mode. This is meant for changes in option
+        strings that don't alter the options themselves, e.g., changes in validity chars, so the
+        search index is retained. The descriptions of the displayed checkboxes are renamed as well,
+        without triggering their callbacks, so that a renamed value remains checked."""
+
+        if not renames:
+            return
+
+        new_options = list(self.options)
+        for old, new in renames.items():
+            ix = self._options_ix.pop(old)
+            self._options_ix[new] = ix
+            new_options[ix] = new
+        self._filtered_options = tuple(renames.get(opt, opt) for opt in self._filtered_options)
+
+        # Patch the options trait without triggering a full refresh in _on_options_change.
+        self._patching_options = True
+        try:
+            self.options = tuple(new_options)
+        finally:
+            self._patching_options = False
+
+        # Rename the checkboxes before the value so that the value is propagated to the matching
+        # checkboxes. This is not a user change, so the checkbox callbacks are blocked.
+        paging, self._paging = self._paging, True
+        try:
+            for cb in self._options_vbox.children:
+                if cb.description in renames:
+                    cb.description = renames[cb.description]
+            if any(val in renames for val in self.value):
+                self.set_trait("value", tuple(renames.get(val, val) for val in self.value))
+        finally:
+            self._paging = paging
+
+    def _resolve_displayed_options(self):
+        """If an options resolver is provided, resolve the options to be displayed and patch the
+        options and filtered options with the resolved ones."""
+
+        if self.options_resolver is None:
+            return
+
+        displayed = self._displayed_options()
+        resolved = self.options_resolver(displayed)
+        self._rename_options(
+            {old: new for old, new in zip(displayed, resolved) if old != new}
+        )
+
+    def patch_options(self, patches):
+        """Replace the options at the given indices, e.g., to reflect changes in their validities,
+        and update the displayed checkboxes accordingly. Unlike assigning a new options tuple, this
+        retains the value, the filter, and the display mode, and the cost scales with the number of
+        patches rather than the number of options.
+
+        Parameters
+        ----------
+        patches : dict
+            Mapping of option indices to new options.
+        """
+
+        self._rename_options(
+            {
+                self.options[ix]: new_opt
+                for ix, new_opt in patches.items()
+                if self.options[ix] != new_opt
+            }
         )
+        self._resolve_displayed_options()
+        for cb, opt in zip(self._options_vbox.children, self._displayed_options()):
+            if cb.description != opt:
+                cb.description = opt
 
     def _refresh_options_widgets(self):
         """Update the options widget. This method should be called whenever the (filtered) options
         change. It either reuses the existing checkboxes and updates their descriptions, or generates
         new checkboxes. It also updates the display mode button."""
 
-        if (l := self._len_options_to_display()) <= len(self._options_vbox.children):
-            # reuse existing widgets and update their descriptions
-
-            # if needed, shrink the list of checkboxes and unobserve the leftover ones
-            if l < len(self._options_vbox.children):
-                self._options_vbox.children = self._options_vbox.children[:l]
-                for stale_cb in self._options_vbox.children[l:]:
-                    stale_cb.unobserve(
-                        self._on_checkbox_change, names="value", type="change"
-                    )
+        self._resolve_displayed_options()
 
-            self._refresh_checkbox_descriptions()
+        l = self._len_options_to_display()
 
-        else:  # need brand new checkboxes
+        # if needed, grow the pool of checkboxes. (The pool never exceeds _max_rows checkboxes.)
+        for _ in range(len(self._checkboxes), l):
+            cb = widgets.Checkbox(
+                value=False,
+                indent=False,
+                disabled=self._disabled,
+                layout={
+                    "max_width": _checkbox_width,
+                    "left": "10px",
+                    "margin": "0px",
+                },
+            )
+            cb.observe(self._on_checkbox_change, names="value", type="change")
+            self._checkboxes.append(cb)
 
-            # unobserve old widgets
-            for stale_cb in self._options_vbox.children:
-                stale_cb.unobserve(
-                    self._on_checkbox_change, names="value", type="change"
-                )
+        # display the first l checkboxes of the pool and update their descriptions
+        if len(self._options_vbox.children) != l:
+            self._options_vbox.children = self._checkboxes[:l]
+        self._refresh_checkbox_descriptions()
 
-            # generate new widgets
-            self._options_vbox.children = [
-                widgets.Checkbox(
-                    description=option,
-                    value=False,
-                    indent=False,
-                    disabled=self._disabled,
-                    layout={
-                        "max_width": _checkbox_width,
-                        "left": "10px",
-                        "margin": "0px",
-                    },
-                )
-                for option in self._filtered_options[:l]
-            ]
-
-            # observe new widgets
-            for cb in self._options_vbox.children:
-                cb.observe(self._on_checkbox_change, names="value", type="change")
+        # update the page navigation widgets
+        if self._display_less or len(self._filtered_options) <= _max_rows:
+            self._page_nav.layout.display = "none"
+        else:
+            start, end = self._display_range()
+            prev_btn, page_label, next_btn = self._page_nav.children
+            prev_btn.disabled = self._disabled or start == 0
+            next_btn.disabled = self._disabled or end == len(self._filtered_options)
+            page_label.value = f"{start + 1}-{end} of {len(self._filtered_options)}"
+            self._page_nav.layout.display = "flex"
 
         # update the display mode button
         if len(self._filtered_options) <= _less_options:
@@ -459,6 +622,9 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         """Callback for the checkboxes. This method is called whenever a checkbox is checked or
         unchecked. It updates the value of the main widget accordingly."""
 
+        if self._paging:
+            return  # checkboxes are being updated to display a new page
+
         opt = change["owner"].description
         new_val = change["new"]
 
@@ -482,9 +648,8 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
     def _refresh_tooltips(self):
         """Update the tooltips widget. This method should be called whenever the (filtered)
         options or the tooltips change."""
-        self._tooltips_widget.value = "<br>".join(
-            self._filtered_tooltips[: self._len_options_to_display()]
-        )
+        start, end = self._display_range()
+        self._tooltips_widget.value = "<br>".join(self._filtered_tooltips[start:end])
 
     @observe("options")
     def _on_options_change(self, change):
@@ -492,6 +657,9 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         updates the options and tooltips widgets accordingly. It also resets the value of the main
         widget if the old value is not in the new options."""
 
+        if self._patching_options:
+            return  # only some options have been patched in place. See _rename_options.
+
         new_options = change["new"]
         assert isinstance(new_options, tuple), "options must be a tuple"
 
@@ -502,10 +670,12 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         # update options
         self.options = tuple(new_options)
         self._options_ix = {opt: ix for ix, opt in enumerate(new_options)}
+        self._search_index = None
 
         # reset filter
         self._filter_textbox.value = ""
         self._filtered_options = new_options
+        self._window_start = 0
 
         # if there aren't enough options, hide the auxiliary widgets
         if len(new_options) < 2:
@@ -555,12 +725,13 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
         number of checkboxes remains the same, but the descriptions need to be updated.
         """
 
-        assert len(self._options_vbox.children) == (
-            l := self._len_options_to_display()
+        assert (
+            len(self._options_vbox.children) == self._len_options_to_display()
         ), "The number of checkboxes is not the same as the number of options to display."
-        for i in range(l):
-            self._options_vbox.children[i].description = self._filtered_options[i]
-            self._options_vbox.children[i].value = False
+        self._resolve_displayed_options()
+        for cb, opt in zip(self._options_vbox.children, self._displayed_options()):
+            cb.description = opt
+            cb.value = False
 
     @property
     def tooltips(self):
@@ -575,6 +746,7 @@ class MultiCheckbox(widgets.VBox, widgets.ValueWidget):
             self.options
         ), "tooltips must be the same length as options"
         self._tooltips = new_tooltips
+        self._search_index = None
         self._filtered_tooltips = tuple(
             self._tooltips[self._options_ix[filtered_opt]]
             for filtered_opt in self._filtered_options
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+
+class OptionsSearchIndex:
+    """A trigram inverted index over the options and tooltips of a widget. It allows finding the
+    options that contain given keywords without scanning all the options for each keyword. The
+    index must be rebuilt whenever the options or the tooltips change.
+    """
+
+    # Keywords shorter than this are looked up by scanning, since their posting lists would
+    # include most of the options anyway.
+    _ngram = 3
+
+    def __init__(self, options, tooltips=()):
+        """Build the index.
+
+        Parameters
+        ----------
+        options : tuple
+            The options to index.
+        tooltips : tuple, optional
+            The tooltips of the options. If not empty, must be the same length as options.
+        """
+        self._names = [opt.lower() for opt in options]
+        self._texts = [
+            name + (tooltips[i].lower() if tooltips else "")
+            for i, name in enumerate(self._names)
+        ]
+        self._postings = defaultdict(set)
+        n = self._ngram
+        for i, text in enumerate(self._texts):
+            for j in range(len(text) - n + 1):
+                self._postings[text[j : j + n]].add(i)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _matches(self, keyword):
+        """Return the set of indices of the options whose text contains the given keyword."""
+        n = self._ngram
+        if len(keyword) < n:
+            candidates = range(len(self._texts))
+        else:
+            postings = sorted(
+                (
+                    self._postings.get(keyword[j : j + n], set())
+                    for j in range(len(keyword) - n + 1)
+                ),
+                key=len,
+            )
+            candidates = set.intersection(*postings)
+        # The trigrams of a keyword may all appear in a text without the keyword itself
+        # appearing, so confirm each candidate.
+        return {i for i in candidates if keyword in self._texts[i]}
+
+    def search(self, exact_keywords=(), other_keywords=()):
+        """Return the indices of the options that contain all the exact keywords and at least one
+        of the other keywords (if any). The keywords must be lowercase. The indices are ranked by
+        the number of keywords matched, where a match in the option itself counts more than a
+        match in its tooltip. Ties are broken by the original order of the options.
+
+        Parameters
+        ----------
+        exact_keywords : list of str
+            Keywords that must all be present.
+        other_keywords : list of str
+            Keywords of which at least one must be present.
+
+        Returns
+        -------
+        list of int
+            The ranked indices of the matching options.
+        """
+        matches = {kw: self._matches(kw) for kw in (*exact_keywords, *other_keywords)}
+
+        found = set(range(len(self._texts)))
+        for kw in exact_keywords:
+            found &= matches[kw]
+        if other_keywords:
+            found &= set().union(*(matches[kw] for kw in other_keywords))
+
+        def score(i):
+            return sum(
+                2 if kw in self._names[i] else 1
+                for kw, matched in matches.items()
+                if i in matched
+            )
+
+        return sorted(found, key=lambda i: (-score(i), i))
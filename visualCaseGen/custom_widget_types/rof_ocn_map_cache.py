@@ -0,0 +1,157 @@
+"""A content-addressed cache of runoff to ocean mapping files. Entries are keyed by the hashes of
+the contents of the runoff and ocean meshes and by the smoothing parameters (rmax, fold), so
+that the same mapping files can be reused regardless of the grid names or paths, and by all the
+users sharing the cache directory. The cache directory may be set via the
+VISUALCASEGEN_MAPPING_CACHE environment variable, e.g., to a group-shared directory. Otherwise,
+it defaults to ~/.cache/visualCaseGen/rof_ocn_maps."""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+from visualCaseGen.nc_metadata import memoize_by_file
+
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
+CACHE_DIR_ENV_VAR = "VISUALCASEGEN_MAPPING_CACHE"
+
+_MANIFEST = "manifest.json"
+
+
+def cache_dir():
+    """Return the directory of the mapping cache, creating it if needed."""
+    if CACHE_DIR_ENV_VAR in os.environ:
+        path = Path(os.environ[CACHE_DIR_ENV_VAR])
+    else:
+        path = Path.home() / ".cache" / "visualCaseGen" / "rof_ocn_maps"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@memoize_by_file
+def file_digest(path):
+    """Return the sha256 hex digest of the contents of the given file. Memoized so that
+    (potentially large) mesh files are hashed only once unless they change."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _mesh_pair_dir(rof_mesh_path, ocn_mesh_path):
+    h = hashlib.sha256(f"{file_digest(rof_mesh_path)}:{file_digest(ocn_mesh_path)}".encode())
+    return cache_dir() / h.hexdigest()[:32]
+
+
+def _param_dirname(rmax, fold):
+    return f"rmax{float(rmax)!r}_fold{float(fold)!r}"
+
+
+def entry_dir(rof_mesh_path, ocn_mesh_path, rmax, fold):
+    """Return the cache entry directory of the given meshes and smoothing parameters. The
+    directory may not exist."""
+    return _mesh_pair_dir(rof_mesh_path, ocn_mesh_path) / _param_dirname(rmax, fold)
+
+
+def _read_manifest(entry):
+    try:
+        with open(entry / _MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def lookup(rof_mesh_path, ocn_mesh_path, rmax, fold):
+    """Return the (nn, nnsm) paths of the cached mapping files of the given meshes and smoothing
+    parameters, or None if the mapping is not cached."""
+    entry = entry_dir(rof_mesh_path, ocn_mesh_path, rmax, fold)
+    manifest = _read_manifest(entry)
+    if manifest is None:
+        return None
+    nn_map, nnsm_map = entry / manifest["nn"], entry / manifest["nnsm"]
+    if not (nn_map.is_file() and nnsm_map.is_file()):
+        return None
+    return nn_map, nnsm_map
+
+
+def cached_params(rof_mesh_path, ocn_mesh_path):
+    """Return the list of (rmax, fold) pairs for which mappings between the given meshes are
+    cached."""
+    pair_dir = _mesh_pair_dir(rof_mesh_path, ocn_mesh_path)
+    if not pair_dir.is_dir():
+        return []
+    params = []
+    for entry in sorted(pair_dir.iterdir()):
+        if (manifest := _read_manifest(entry)) is not None:
+            params.append((manifest["rmax"], manifest["fold"]))
+    return params
+
+
+def store(rof_mesh_path, ocn_mesh_path, rmax, fold, nn_map_path, nnsm_map_path):
+    """Add the given mapping files to the cache. The files are copied to a temporary directory
+    that is then renamed to the entry directory, so that partially written entries are never
+    visible to other users. If the entry already exists, e.g., added concurrently by another
+    user, it is left as is."""
+
+    entry = entry_dir(rof_mesh_path, ocn_mesh_path, rmax, fold)
+    if lookup(rof_mesh_path, ocn_mesh_path, rmax, fold) is not None:
+        return entry
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=entry.parent, prefix=f".{entry.name}."))
+    try:
+        nn_map_path, nnsm_map_path = Path(nn_map_path), Path(nnsm_map_path)
+        shutil.copy2(nn_map_path, tmp_dir / nn_map_path.name)
+        shutil.copy2(nnsm_map_path, tmp_dir / nnsm_map_path.name)
+        manifest = {
+            "nn": nn_map_path.name,
+            "nnsm": nnsm_map_path.name,
+            "rmax": rmax,
+            "fold": fold,
+            "rof_mesh": Path(rof_mesh_path).as_posix(),
+            "ocn_mesh": Path(ocn_mesh_path).as_posix(),
+        }
+        with open(tmp_dir / _MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+        # Allow the other users of a shared cache to read the entry:
+        os.chmod(tmp_dir, 0o755)
+        try:
+            os.rename(tmp_dir, entry)
+        except OSError:
+            # The entry was created concurrently
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logger.info(f"Cached the runoff to ocean mapping files in {entry}")
+    return entry
+
+
+def _copy(src, dst):
+    dst = Path(dst)
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    shutil.copy2(src, dst)
+
+
+def fetch(rof_mesh_path, ocn_mesh_path, rmax, fold, nn_map_dst, nnsm_map_dst):
+    """Copy the cached mapping files of the given meshes and smoothing parameters to the given
+    destination paths. The files are copied rather than (hard) linked, since the mapping
+    generator may later rewrite the destination files in place, which would corrupt the cache.
+
+    Returns
+    -------
+    bool
+        True if the mapping files were found in the cache, False otherwise.
+    """
+    cached = lookup(rof_mesh_path, ocn_mesh_path, rmax, fold)
+    if cached is None:
+        return False
+    for src, dst in zip(cached, (nn_map_dst, nnsm_map_dst)):
+        _copy(src, dst)
+    logger.info(f"Reused the cached runoff to ocean mapping files in {cached[0].parent}")
+    return True
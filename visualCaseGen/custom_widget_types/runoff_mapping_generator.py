@@ -1,12 +1,37 @@
 import os
+import sys
+import shlex
+import asyncio
 from ipywidgets import HBox, VBox, Button, Output, Label
 from pathlib import Path
 
 from ProConPy.out_handler import handler as owh
 from ProConPy.config_var import cvars
 from ProConPy.dialog import alert_warning
-from mom6_forge import mapping
+from ProConPy.event_loop import running_event_loop
+from visualCaseGen.custom_widget_types.case_tools import run_command_async, run_sync
 from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+from visualCaseGen.custom_widget_types import rof_ocn_map_cache
+from visualCaseGen.nc_metadata import memoize_by_file
+
+
+@memoize_by_file
+def _suggested_smoothing_params(ocn_mesh_path):
+    """Return the (rmax, fold) smoothing parameters suggested by mom6_forge for the given ocean
+    mesh. Memoized so that the mesh is read only once unless it changes."""
+    from mom6_forge import mapping
+
+    return mapping.get_suggested_smoothing_params(ocn_mesh_path)
+
+
+def gen_rof_maps_cmd(**kwargs):
+    """Return a shell command that runs mapping.gen_rof_maps with the given keyword arguments
+    in a separate python process, so that the (potentially long) mapping generation neither
+    blocks the kernel nor can crash it."""
+    kwargs = {k: v.as_posix() if isinstance(v, Path) else v for k, v in kwargs.items()}
+    code = f"from mom6_forge import mapping; mapping.gen_rof_maps(**{kwargs!r})"
+    return f"{shlex.quote(sys.executable)} -u -c {shlex.quote(code)}"
+
 
 class RunoffMappingGenerator(VBox):
     """Widget to generate runoff to ocean mapping for custom grids.
@@ -44,10 +69,21 @@ class RunoffMappingGenerator(VBox):
         )
         self._btn_run_generate.on_click(self.on_btn_run_generate_clicked)
 
+        # Cancels the mapping generation in progress. Displayed only while generating.
+        self._btn_cancel = Button(
+            description="Cancel",
+            button_style="danger",
+            tooltip="Cancel the mapping generation in progress.",
+            layout={"width": "260px", "align_self": "center", "display": "none"},
+        )
+        self._btn_cancel.on_click(self.on_btn_cancel_clicked)
+        self._task = None
+
         self._generate_new_dialog = VBox([
             cvars["ROF_OCN_MAPPING_RMAX"].widget,
             cvars["ROF_OCN_MAPPING_FOLD"].widget,
             self._btn_run_generate,
+            self._btn_cancel,
             self._out
         ],
         layout={"display": "none"}
@@ -77,10 +113,12 @@ class RunoffMappingGenerator(VBox):
         self._btn_generate_new.disabled = value
         for child in self._generate_new_dialog.children:
             child.disabled = value
+        self._btn_cancel.disabled = False
 
     def reset(self, change):
         """Reset all widget children and auxiliary config variables. To be called
         when the runoff grid changes."""
+        self.on_btn_cancel_clicked()
         self._out.clear_output()
         self._generate_new_dialog.layout.display = "none"
         cvars["ROF_OCN_MAPPING_RMAX"].value = None
@@ -101,6 +139,17 @@ class RunoffMappingGenerator(VBox):
 
         return False
 
+    def cached_map_params(self):
+        """Return the (rmax, fold) pairs for which a mapping between the selected runoff grid
+        and the custom ocean grid was previously generated and cached, e.g., by another user
+        sharing the mapping cache."""
+        try:
+            _, rof_mesh_path = self.get_rof_grid_and_mesh()
+            _, ocn_mesh_path = self.get_ocn_grid_and_mesh()
+            return rof_ocn_map_cache.cached_params(rof_mesh_path, ocn_mesh_path)
+        except OSError:
+            return []
+
     @owh.out.capture()
     def on_btn_use_standard_clicked(self, b):
         """Handler for the 'Use Standard Map' button click event.
@@ -157,10 +206,20 @@ class RunoffMappingGenerator(VBox):
         rmax = cvars["ROF_OCN_MAPPING_RMAX"].value
         fold = cvars["ROF_OCN_MAPPING_FOLD"].value
 
-        # Suggest default values for RMAX and FOLD if not set
+        # Suggest default values for RMAX and FOLD if not set, preferring the values of a
+        # previously generated mapping so that the cached mapping files can be reused.
         if rmax is None and fold is None:
-            _, ocn_mesh_path = self.get_ocn_grid_and_mesh()
-            suggested_rmax, suggested_fold = mapping.get_suggested_smoothing_params(ocn_mesh_path)
+            if cached_params := self.cached_map_params():
+                suggested_rmax, suggested_fold = cached_params[-1]
+                with self._out:
+                    print(
+                        f"Found cached mapping files for RMAX={suggested_rmax}, "
+                        f"FOLD={suggested_fold}. These will be reused unless the parameters "
+                        "are changed."
+                    )
+            else:
+                _, ocn_mesh_path = self.get_ocn_grid_and_mesh()
+                suggested_rmax, suggested_fold = _suggested_smoothing_params(ocn_mesh_path)
 
             cvars["ROF_OCN_MAPPING_RMAX"].value = suggested_rmax
             cvars["ROF_OCN_MAPPING_FOLD"].value = suggested_fold
@@ -188,45 +247,100 @@ class RunoffMappingGenerator(VBox):
         rof_grid, rof_mesh_path = self.get_rof_grid_and_mesh()
         ocn_grid, ocn_mesh_path = self.get_ocn_grid_and_mesh()
 
-        try:
-            # disable the widget ahead of running the mapping generator
-            self.disabled = True
+        from mom6_forge import mapping
 
-            mapping_file_prefix = f"{rof_grid}_to_{ocn_grid}_map"
-            output_dir = RunoffMappingGenerator.mapping_dir()
+        mapping_file_prefix = f"{rof_grid}_to_{ocn_grid}_map"
+        output_dir = RunoffMappingGenerator.mapping_dir()
 
-            # Run the mapping generator
-            with self._out:
-                mapping.gen_rof_maps(
-                    rof_mesh_path=rof_mesh_path,
-                    ocn_mesh_path=ocn_mesh_path,
-                    output_dir=output_dir,
-                    mapping_file_prefix=mapping_file_prefix,
-                    rmax=rmax,
-                    fold=fold
-                )
-            
-            nn_map_filepath = mapping.get_nn_map_filepath(
-                mapping_file_prefix=mapping_file_prefix,
-                output_dir=output_dir,
-            )
+        nn_map_filepath = mapping.get_nn_map_filepath(
+            mapping_file_prefix=mapping_file_prefix,
+            output_dir=output_dir,
+        )
 
-            nnsm_map_filepath = mapping.get_smoothed_map_filepath(
-                mapping_file_prefix=mapping_file_prefix,
-                output_dir=output_dir,
-                rmax=rmax,
-                fold=fold
-            )
+        nnsm_map_filepath = mapping.get_smoothed_map_filepath(
+            mapping_file_prefix=mapping_file_prefix,
+            output_dir=output_dir,
+            rmax=rmax,
+            fold=fold
+        )
 
-            # Set the mapping status to CUSTOM after successful generation
-            cvars["ROF_OCN_MAPPING_STATUS"].value = f"CUSTOM:{nn_map_filepath},{nnsm_map_filepath}"
+        # disable the widget ahead of running the mapping generator
+        self.disabled = True
 
-        except Exception as e:
-            alert_warning(
-                f"An error occurred while generating the mapping: {e}"
-            )
+        # Reuse the mapping files previously generated for the same meshes and parameters,
+        # if any. Otherwise, run the mapping generator and cache its output.
+        cache_args = (rof_mesh_path, ocn_mesh_path, rmax, fold)
+        try:
+            cached = rof_ocn_map_cache.fetch(*cache_args, nn_map_filepath, nnsm_map_filepath)
+        except OSError as e:
+            alert_warning(f"An error occurred while reading the mapping cache: {e}")
             self.disabled = False
+            return
+
+        if cached:
+            with self._out:
+                print("Reusing previously generated mapping files.")
+            self._set_mapping_status(nn_map_filepath, nnsm_map_filepath)
+            return
 
+        cmd = gen_rof_maps_cmd(
+            rof_mesh_path=rof_mesh_path,
+            ocn_mesh_path=ocn_mesh_path,
+            output_dir=output_dir,
+            mapping_file_prefix=mapping_file_prefix,
+            rmax=rmax,
+            fold=fold
+        )
+        generate = self._generate_task(cmd, cache_args, nn_map_filepath, nnsm_map_filepath)
+
+        # Within a running event loop, e.g., that of the notebook kernel, generate the mapping in
+        # a task so that the kernel, and so the other stages and the log, remain responsive.
+        loop = running_event_loop()
+        if loop is not None:
+            self._task = loop.create_task(generate)
+        else:
+            run_sync(generate)
+
+    async def _generate_task(self, cmd, cache_args, nn_map_filepath, nnsm_map_filepath):
+        """Run the mapping generator in a separate process, streaming its output, and set the
+        mapping status on completion. The Cancel button is displayed in the meantime."""
+        self._btn_cancel.layout.display = ""
+        try:
+            with self._out:
+                print("Generating the runoff to ocean mapping files...")
+            result = await run_command_async(cmd, self._out)
+            if result.returncode != 0:
+                errors = result.stderr.strip().splitlines()
+                raise RuntimeError(errors[-1] if errors else f"Exit code {result.returncode}")
+            try:
+                rof_ocn_map_cache.store(*cache_args, nn_map_filepath, nnsm_map_filepath)
+            except OSError as e:
+                # Caching is an optimization only, so failures are not fatal.
+                with self._out:
+                    print(f"Warning: could not cache the mapping files: {e}")
+            self._set_mapping_status(nn_map_filepath, nnsm_map_filepath)
+        except asyncio.CancelledError:
+            with self._out:
+                print("Mapping generation cancelled.")
+            self.disabled = False
+        except Exception as e:
+            with owh.out:
+                alert_warning(
+                    f"An error occurred while generating the mapping: {e}"
+                )
+            self.disabled = False
+        finally:
+            self._btn_cancel.layout.display = "none"
+            self._task = None
+
+    def on_btn_cancel_clicked(self, b=None):
+        """Cancel the mapping generation in progress, terminating the generator process."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def _set_mapping_status(self, nn_map_filepath, nnsm_map_filepath):
+        """Set the mapping status to CUSTOM after successful generation."""
+        cvars["ROF_OCN_MAPPING_STATUS"].value = f"CUSTOM:{nn_map_filepath},{nnsm_map_filepath}"
 
     @staticmethod
     def mapping_dir():
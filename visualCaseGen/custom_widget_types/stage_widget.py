@@ -191,8 +191,8 @@ class StageWidget(VBox):
             # widgets of stages that are irrelevant under the current configuration so they
             # don't briefly appear as empty boxes before traversal reaches (and skips) them.
             for stage in [first_child, *first_child.siblings_to_right()]:
-                stage._widget.layout.display = "" if stage.is_relevant() else "none"
-                main_body_children.append(stage._widget)
+                stage.widget.layout.display = "" if stage.is_relevant() else "none"
+                main_body_children.append(stage.widget)
         self._main_body.children = tuple(main_body_children)
 
     def _refresh_main_body(self):
@@ -5,6 +5,7 @@ from ProConPy.out_handler import handler as owh
 from ProConPy.config_var import cvars
 from ProConPy.dialog import alert_warning
 from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+from visualCaseGen.nc_metadata import global_attrs
 
 logger = logging.getLogger("\t" + __name__.split(".")[-1])
 
@@ -54,7 +55,6 @@ class WW3InputGenerator(VBox):
     @owh.out.capture()
     def on_btn_generate_clicked(self, b):
         """Reconstruct the custom ocean grid/topography and write the WW3 input files."""
-        import xarray as xr
         from mom6_forge.grid import Grid
         from mom6_forge.topo import Topo
 
@@ -83,15 +83,15 @@ class WW3InputGenerator(VBox):
                 # matches the ocean mask. mom6_forge persists it as an attribute of the topog
                 # file -- the same source the case creator uses for MOM6's MINIMUM_DEPTH -- so
                 # this stays correct even if the user edited min_depth in the mom6_forge notebook.
-                with xr.open_dataset(topo_file) as ds_topo:
-                    if "min_depth" not in ds_topo.attrs:
-                        alert_warning(
-                            f"The topography file {topo_file} does not record a 'min_depth' "
-                            "attribute. Please regenerate the custom ocean grid with mom6_forge."
-                        )
-                        self.disabled = False
-                        return
-                    min_depth = float(ds_topo.attrs["min_depth"])
+                topo_attrs = global_attrs(topo_file)
+                if "min_depth" not in topo_attrs:
+                    alert_warning(
+                        f"The topography file {topo_file} does not record a 'min_depth' "
+                        "attribute. Please regenerate the custom ocean grid with mom6_forge."
+                    )
+                    self.disabled = False
+                    return
+                min_depth = float(topo_attrs["min_depth"])
                 grid = Grid.from_supergrid(supergrid_file.as_posix())
                 topo = Topo.from_topo_file(grid, topo_file.as_posix(), min_depth=min_depth)
                 topo.write_ww3_input(ocnice_dir.as_posix(), grid_alias=grid_alias)
@@ -7,6 +7,9 @@ from visualCaseGen.gui_help_dialog import GUI_help_dialog
 
 logger = logging.getLogger('\t'+__name__.split('.')[-1])
 
+# Create the log output widget upfront so that the outputs of the GUI get captured in it.
+owh.widget
+
 class GUI(widgets.VBox):
     """The main GUI class. This class contains two components:
          1. menubar: title, help button, reset button, return button
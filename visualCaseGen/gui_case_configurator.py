@@ -72,6 +72,6 @@ class GUI_case_configurator(widgets.VBox):
         csp.initialize(cvars, get_relational_constraints(cvars), Stage.first()) ; pb(2)
 
         # Display all top-level stages:
-        self.children = [stage._widget for stage in Stage.top_level()]
+        self.children = [stage.widget for stage in Stage.top_level()]
 
 
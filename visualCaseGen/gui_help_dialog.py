@@ -46,7 +46,7 @@ class GUI_help_dialog(widgets.VBox):
                 help_description,
                 widgets.HBox([self.verbose_widget, self.btn_clear_log]
                     ,layout={'display':'flex', 'justify_content':'flex-end'}),
-                owh.out ],
+                owh.widget ],
                 layout = {'display':'none'}
         )
 
@@ -60,7 +60,7 @@ class GUI_help_dialog(widgets.VBox):
     def on_verbose_change(self, change):
         if change['type'] == 'change' and change['name'] == 'value':
             new_verbose = change['new']
-            owh.out.clear_output()
+            owh.clear_logs()
             if new_verbose=='On (slow)':
                 logger.info("Verbose Mode On")
                 owh.set_verbosity(verbose=True)
@@ -69,4 +69,4 @@ class GUI_help_dialog(widgets.VBox):
                 owh.set_verbosity(verbose=False)
 
     def clear_log(self, b):
-        owh.out.clear_output()
\ No newline at end of file
+        owh.clear_logs()
\ No newline at end of file
@@ -3,9 +3,9 @@ import logging
 from ProConPy.config_var import ConfigVar, cvars
 from ProConPy.stage import Stage
 from ProConPy.csp_solver import csp
+from ProConPy.out_handler import handler as owh
 from visualCaseGen.cime_interface import CIME_interface
 from visualCaseGen.initialize_configvars import initialize_configvars
-from visualCaseGen.initialize_widgets import initialize_widgets
 from visualCaseGen.initialize_stages import initialize_stages
 from visualCaseGen.specs.options import set_options
 from visualCaseGen.specs.relational_constraints import get_relational_constraints
@@ -13,13 +13,18 @@ from visualCaseGen.specs.relational_constraints import get_relational_constraint
 logger = logging.getLogger('\t'+__name__.split('.')[-1])
 
 
-def initialize(cesmroot=None):
+def initialize(cesmroot=None, headless=False):
     """Initialize the visualCaseGen system by setting up configuration variables, stages, and widgets.
 
     Parameters:
     -----------
     cesmroot : str, optional
         The path to the CESM root directory. If not provided, it will be determined automatically.
+    headless : bool, optional
+        If True, no widgets are constructed: the ConfigVars retain their DummyWidget instances,
+        the stages are given DummyStageWidget instances, and ipywidgets is never imported. The
+        logs are displayed on the console instead of the output widget. This is useful for
+        batch validation of configurations, e.g., in many worker processes.
     
     Returns:
     --------
@@ -27,14 +32,19 @@ def initialize(cesmroot=None):
         An instance of the CIME_interface class, initialized with the provided CESM root directory.
     """
 
+    if headless:
+        owh.attach_console_handler()
+
     logger.info("Initializing the visualCaseGen system...")
 
     ConfigVar.reboot()
     Stage.reboot()
     cime = CIME_interface(cesmroot=cesmroot)
     initialize_configvars(cime)
-    initialize_widgets(cime)
-    initialize_stages(cime)
+    if not headless:
+        from visualCaseGen.initialize_widgets import initialize_widgets
+        initialize_widgets(cime)
+    initialize_stages(cime, headless=headless)
     set_options(cime)
     csp.initialize(cvars, get_relational_constraints(cvars), Stage.first())
 
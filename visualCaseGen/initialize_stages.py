@@ -1,10 +1,7 @@
 import logging
-from ipywidgets import VBox, HBox, Tab
 
-from ProConPy.config_var import cvars
-from ProConPy.stage import Stage
 from ProConPy.out_handler import handler as owh
-from visualCaseGen.custom_widget_types.stage_widget import StageWidget
+from visualCaseGen.stages.stage_widget_factory import set_headless
 from visualCaseGen.stages.compset_stages import initialize_compset_stages
 from visualCaseGen.stages.grid_stages import initialize_grid_stages
 from visualCaseGen.stages.launcher_stages import initialize_launcher_stages
@@ -13,10 +10,19 @@ logger = logging.getLogger("\t" + __name__.split(".")[-1])
 
 
 @owh.out.capture()
-def initialize_stages(cime):
-    """Initialize the stages for the case configurator."""
+def initialize_stages(cime, headless=False):
+    """Initialize the stages for the case configurator.
+
+    Parameters
+    ----------
+    cime : CIME_interface
+        The CIME interface object.
+    headless : bool, optional
+        If True, the stages are given dummy widgets and no ipywidgets are constructed.
+    """
 
     logger.debug("Initializing stages...")
+    set_headless(headless)
     initialize_compset_stages(cime)
     initialize_grid_stages(cime)
     initialize_launcher_stages(cime)
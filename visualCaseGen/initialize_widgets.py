@@ -10,7 +10,8 @@ description_width = "160px"
 
 
 def initialize_widgets(cime):
-    """Construct all widgets for the case configurator."""
+    """Set the widget factories of all ConfigVars of the case configurator. The widgets are
+    constructed upon first access, i.e., when the stages containing them are first displayed."""
 
     initialize_compset_widgets(cime)
     initialize_grid_widgets(cime)
@@ -0,0 +1,127 @@
+"""A cached reader of NetCDF file metadata, e.g., the global attributes and the dimensions of
+MOM6 topography, vertical grid, and ESMF mesh files. Only the file headers are read, i.e., no
+variable data is loaded and no xarray indexes are built. The metadata of each file is memoized
+by the (path, modification time, size) of the file, so it is re-read only when the file changes."""
+
+import logging
+import functools
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from types import MappingProxyType
+
+logger = logging.getLogger("\t" + __name__.split(".")[-1])
+
+# The metadata of a NetCDF file, as read-only mappings shared by all the callers:
+#   attrs: global attributes,
+#   dims: dimension sizes,
+#   variables: variable names mapped to their dimension names.
+NcHeader = namedtuple("NcHeader", ["attrs", "dims", "variables"])
+
+# The maximum number of files whose metadata are cached, and of results cached by each function
+# decorated with memoize_by_file.
+MAX_CACHED_FILES = 64
+
+_cache = OrderedDict()  # (path, mtime_ns, size) -> NcHeader
+_cache_lock = threading.Lock()
+
+
+def _file_key(path):
+    path = Path(path).resolve()
+    st = path.stat()
+    return (path.as_posix(), st.st_mtime_ns, st.st_size)
+
+
+def _to_python(value):
+    """Convert numpy scalars, e.g., those of numerical attributes, to python scalars."""
+    return value.item() if hasattr(value, "item") and getattr(value, "size", 1) == 1 else value
+
+
+def read_header(path):
+    """Return the metadata of the given NetCDF file. The result is memoized until the
+    modification time or the size of the file changes.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path to the NetCDF file.
+
+    Returns
+    -------
+    NcHeader
+        The global attributes, the dimension sizes, and the variable dimensions of the file.
+    """
+
+    key = _file_key(path)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    import netCDF4
+
+    with netCDF4.Dataset(key[0], "r") as ds:
+        header = NcHeader(
+            attrs=MappingProxyType({name: _to_python(ds.getncattr(name)) for name in ds.ncattrs()}),
+            dims=MappingProxyType({name: len(dim) for name, dim in ds.dimensions.items()}),
+            variables=MappingProxyType({name: var.dimensions for name, var in ds.variables.items()}),
+        )
+    logger.debug(f"Read the header of {key[0]}.")
+
+    with _cache_lock:
+        # Drop the stale entries of the same file, if any, and the least recently used entries.
+        for stale_key in [k for k in _cache if k[0] == key[0]]:
+            del _cache[stale_key]
+        _cache[key] = header
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+    return header
+
+
+def global_attrs(path):
+    """Return the (read-only) global attributes of the given NetCDF file."""
+    return read_header(path).attrs
+
+
+def dim_size(path, var):
+    """Return the size of the (first) dimension of the given variable in a NetCDF file, i.e.,
+    the len() of the variable."""
+    header = read_header(path)
+    return header.dims[header.variables[var][0]]
+
+
+def memoize_by_file(func):
+    """Decorator to memoize a function whose first argument is a file path, by the (path,
+    modification time, size) of the file and the remaining (hashable) arguments. This allows
+    sharing the results of functions that read NetCDF files other than via read_header. The
+    results are shared by all the callers, so they should not be mutated. At most
+    MAX_CACHED_FILES results are kept, the least recently used ones being dropped first."""
+
+    cache = OrderedDict()  # (path, args) -> ((path, mtime_ns, size), result)
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(path, *args):
+        file_key = _file_key(path)
+        key = (file_key[0], args)
+        with lock:
+            if key in cache and cache[key][0] == file_key:
+                cache.move_to_end(key)
+                return cache[key][1]
+        result = func(path, *args)
+        with lock:
+            # Replaces the stale result of the same file and arguments, if any.
+            cache[key] = (file_key, result)
+            cache.move_to_end(key)
+            while len(cache) > MAX_CACHED_FILES:
+                cache.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+def clear_cache():
+    """Clear the cached metadata of all files."""
+    with _cache_lock:
+        _cache.clear()
@@ -60,36 +60,30 @@ def set_standard_compset_options(cime):
             ("WAV", wav_filter),
         )
 
-        # Determine available compset aliases. Take support level and filters into account
-        available_compsets = [
-            compset
-            for compset in cime.compsets.values()
-            if (
-                support_level == "All"
-                and all(
-                    [
-                        comp_filter == "any"
-                        or comp_filter.upper() in compset.lname
-                        or (
-                            comp_filter == "none"
-                            and (
-                                "S" + comp_class in compset.lname
-                                or "X" + comp_class in compset.lname
-                            )
-                        )
-                        for comp_class, comp_filter in filters
-                    ]
-                )
-            )
-            or (
-                support_level == "Supported"
-                and len(cime.sci_supported_grids[compset.alias]) > 0
-            )
+        # Determine available compset aliases. Take support level and filters into account.
+        # The filters are applied via set intersections over the inverted index of compsets.
+        if support_level == "Supported":
+            selected = {
+                alias
+                for alias in cime.compsets
+                if len(cime.sci_supported_grids[alias]) > 0
+            }
+        elif support_level == "All":
+            selected = None
+            for comp_class, comp_filter in filters:
+                admitted = cime.get_compsets_by_filter(comp_class, comp_filter)
+                if admitted is None:
+                    continue  # "any" filter
+                selected = admitted if selected is None else selected & admitted
+        else:
+            selected = set()
+
+        # Preserve the original ordering of compsets
+        available_compset_aliases = [
+            alias for alias in cime.compsets if selected is None or alias in selected
         ]
-
-        available_compset_aliases = [ac.alias for ac in available_compsets]
         available_compset_descriptions = [
-            cime.long_compset_desc(ac) for ac in available_compsets
+            cime.compset_descriptions[alias] for alias in available_compset_aliases
         ]
         return available_compset_aliases, available_compset_descriptions
 
@@ -106,6 +100,7 @@ def set_standard_compset_options(cime):
             cvars["COMP_GLC_FILTER"],
             cvars["COMP_WAV_FILTER"],
         ],
+        pure=True,
     )
 
 
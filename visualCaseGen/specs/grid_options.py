@@ -1,4 +1,5 @@
 import re
+from itertools import islice
 from ProConPy.config_var import cvars
 from ProConPy.options_spec import OptionsSpec
 from ProConPy.dev_utils import ConstraintViolation
@@ -23,19 +24,10 @@ def set_grid_options(cime):
 
 def set_standard_grid_options(cime):
 
-    def grid_options_func(compset_lname, grid_mode):
-
-        if grid_mode != "Standard":
-            return None, None
-
-        compatible_grids = []
-        grid_descriptions = []
-        support_level = cvars["SUPPORT_LEVEL"].value
-        compset_alias = cvars["COMPSET_ALIAS"].value
-
-        assert (
-            support_level != "Supported" or compset_alias is not None
-        ), "Support level is 'Supported', but no compset alias is selected."
+    def compatible_grids(compset_lname, support_level, compset_alias):
+        """Generator of (alias, description) pairs of the grids compatible with the given compset.
+        Candidate grids are checked by the CSP solver in chunks, each within its own solver scope,
+        so that no solver scope is left open while the generator is suspended."""
 
         comp_grid_vars = [
             cvars["ATM_GRID"],
@@ -48,40 +40,60 @@ def set_standard_grid_options(cime):
             cvars["MASK_GRID"],
         ]
 
-        with csp._solver as s:
+        candidates = (
+            (alias, desc)
+            for alias, compset_attr, not_compset_attr, desc in cime.resolutions
+            if not (
+                support_level == "Supported"
+                and alias not in cime.sci_supported_grids[compset_alias]
+            )
+            and not (compset_attr and not re.search(compset_attr, compset_lname))
+            and not (not_compset_attr and re.search(not_compset_attr, compset_lname))
+        )
 
-            csp.apply_assignment_assertions(s, exclude_vars=comp_grid_vars)
-            csp.apply_options_assertions(s, exclude_vars=comp_grid_vars)
+        while chunk := list(islice(candidates, 16)):
 
-            for alias, compset_attr, not_compset_attr, desc in cime.resolutions:
-                if (
-                    support_level == "Supported"
-                    and alias not in cime.sci_supported_grids[compset_alias]
-                ):
-                    continue
-                if compset_attr and not re.search(compset_attr, compset_lname):
-                    continue
-                if not_compset_attr and re.search(not_compset_attr, compset_lname):
-                    continue
+            compatible_chunk = []
+            with csp._solver as s:
+
+                csp.apply_assignment_assertions(s, exclude_vars=comp_grid_vars)
+                csp.apply_options_assertions(s, exclude_vars=comp_grid_vars)
 
-                grid_lname_parts = cime.get_grid_lname_parts(alias, compset_lname)
+                for alias, desc in chunk:
 
-                if s.check([
-                    cvars["ATM_GRID"] == grid_lname_parts["a%"],
-                    cvars["LND_GRID"] == grid_lname_parts["l%"],
-                    cvars["OCN_GRID"] == grid_lname_parts["oi%"],
-                    cvars["ICE_GRID"] == grid_lname_parts["oi%"],
-                    cvars["ROF_GRID"] == grid_lname_parts["r%"],
-                    cvars["GLC_GRID"] == grid_lname_parts["g%"],
-                    cvars["WAV_GRID"] == grid_lname_parts["w%"],
-                    cvars["MASK_GRID"] == grid_lname_parts["m%"],
-                ]) == unsat:
-                    continue # Skip this grid if it is deemed invalid by the CSP solver
+                    grid_lname_parts = cime.get_grid_lname_parts(alias, compset_lname)
 
-                compatible_grids.append(alias)
-                grid_descriptions.append(desc)
+                    if s.check([
+                        cvars["ATM_GRID"] == grid_lname_parts["a%"],
+                        cvars["LND_GRID"] == grid_lname_parts["l%"],
+                        cvars["OCN_GRID"] == grid_lname_parts["oi%"],
+                        cvars["ICE_GRID"] == grid_lname_parts["oi%"],
+                        cvars["ROF_GRID"] == grid_lname_parts["r%"],
+                        cvars["GLC_GRID"] == grid_lname_parts["g%"],
+                        cvars["WAV_GRID"] == grid_lname_parts["w%"],
+                        cvars["MASK_GRID"] == grid_lname_parts["m%"],
+                    ]) == unsat:
+                        continue # Skip this grid if it is deemed invalid by the CSP solver
+
+                    compatible_chunk.append((alias, desc))
+
+            yield from compatible_chunk
+
+    def grid_options_func(compset_lname, grid_mode):
+
+        if grid_mode != "Standard":
+            return None, None
+
+        support_level = cvars["SUPPORT_LEVEL"].value
+        compset_alias = cvars["COMPSET_ALIAS"].value
+
+        assert (
+            support_level != "Supported" or compset_alias is not None
+        ), "Support level is 'Supported', but no compset alias is selected."
 
-        return compatible_grids, grid_descriptions
+        # The (possibly very long) list of grids is streamed, so that the first page of
+        # compatible grids can be displayed before the remaining grids are checked.
+        return compatible_grids(compset_lname, support_level, compset_alias)
 
     cv_grid = cvars["GRID"]
     cv_grid.options_spec = OptionsSpec(
@@ -288,6 +300,7 @@ def set_custom_wav_grid_options(cime):
     cv_wav_grid_mode.options_spec = OptionsSpec(
         func=wav_grid_mode_options_func,
         args=(cvars["GRID_MODE"], cvars["COMP_WAV"], cvars["OCN_GRID_MODE"]),
+        pure=True,
     )
 
     # CUSTOM_WAV_GRID options: the existing wave grid to use when WAV_GRID_MODE == "Standard".
@@ -1,10 +1,9 @@
 import logging
-from ipywidgets import VBox, HBox, Tab
 
 from ProConPy.config_var import cvars
 from ProConPy.stage import Stage, Guard
 from ProConPy.out_handler import handler as owh
-from visualCaseGen.custom_widget_types.stage_widget import StageWidget
+from visualCaseGen.stages.stage_widget_factory import stage_widget, is_headless
 
 logger = logging.getLogger("\t" + __name__.split(".")[-1])
 
@@ -20,7 +19,7 @@ def initialize_compset_stages(cime):
         "If you choose to pick a standard compset, you will be prompted to select from a list "
         "of compsets already defined within CESM. If you choose to build a custom compset, "
         "you will be prompted to mix and match individual models and their options.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         varlist=[cvars["COMPSET_MODE"]],
     )
 
@@ -32,7 +31,7 @@ def initialize_compset_stages(cime):
         "all standard compsets or only those that are scientifically supported, i.e., "
         "validated by the CESM developers. The former options is useful for testing and "
         "development. The latter option is recommended for production runs.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title= "Standard",
             parent=stg_compset,
@@ -54,7 +53,7 @@ def initialize_compset_stages(cime):
         "useful when you are only interested in compsets that include a specific model or set of "
         "models. If you are interested in all compsets, you can click *any* buttons for all "
         "component classes. ",
-        widget=StageWidget(HBox),
+        widget=stage_widget("HBox"),
         parent=guard_support_level_all,
         varlist=[
             cvars[f"COMP_{comp_class}_FILTER"] for comp_class in cime.comp_classes
@@ -69,7 +68,7 @@ def initialize_compset_stages(cime):
         "the models included. You can type keywords in the search box to narrow down the list. "
         "For exact matches, you can use double quotes. Otherwise, the search will display all "
         "compsets containing one or more of the words in the search box.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_support_level_all,
         varlist=[
             cvars["COMPSET_ALIAS"],
@@ -88,7 +87,7 @@ def initialize_compset_stages(cime):
         "the models included. You can type keywords in the search box to narrow down the list. "
         "For exact matches, you can use double quotes. Otherwise, the search will display all "
         "compsets containing one or more of the words in the search box.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Supported",
             parent=stg_support_level,
@@ -120,7 +119,7 @@ def initialize_compset_stages(cime):
         "runs, e.g., for spinning up the model. 2000 is similarly appropriate for "
         "fixed-time-period runs, but with present-day conditions. HIST is appropriate for "
         "transient runs, e.g., for simulations from 1850 through 2015.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_compset,
         varlist=[cvars["INITTIME"]],
     )
@@ -131,7 +130,7 @@ def initialize_compset_stages(cime):
         "Models beginning with the letter d (e.g., datm) are data models. Models beginning with "
         "the letter s, (e.g., sice) are stub models (placeholders that have no impact). Others "
         "are fully active models.",
-        widget=StageWidget(HBox),
+        widget=stage_widget("HBox"),
         parent=guard_custom_compset,
         varlist=[cvars[f"COMP_{comp_class}"] for comp_class in cime.comp_classes],
     )
@@ -141,11 +140,20 @@ def initialize_compset_stages(cime):
         description="For each component, select the physics configuration. The physics "
         "configuration determines the complexity of the model and the computational cost. "
         "Refer to individual model documentations for more information.",
-        widget=StageWidget(HBox),
+        widget=stage_widget("HBox"),
         parent=guard_custom_compset,
         varlist=[cvars[f"COMP_{comp_class}_PHYS"] for comp_class in cime.comp_classes],
     )
 
+    def comp_option_widget():
+        """Construct the widget of the component options stage, whose tab titles get refreshed
+        whenever the tabs are (re)set."""
+        widget = stage_widget("Tab")()
+        widget._main_body.observe(
+            lambda change: refresh_comp_options_tab_titles(), names="children", type="change"
+        )
+        return widget
+
     stg_comp_option = Stage(
         title="Component Options",
         description="Component options, which are also known as modifiers, allow users to "
@@ -154,7 +162,7 @@ def initialize_compset_stages(cime):
         "the components for which no options have been selected yet. You have the option to "
         "apply more than one modifier by switching to multi selection mode, but be aware that "
         "visualCaseGen does not check for compatibility between multiple modifiers.",
-        widget=StageWidget(Tab),
+        widget=stage_widget("Tab") if is_headless() else comp_option_widget,
         parent=guard_custom_compset,
         varlist=[
             cvars[f"COMP_{comp_class}_OPTION"] for comp_class in cime.comp_classes
@@ -162,27 +170,23 @@ def initialize_compset_stages(cime):
         aux_varlist= [cvars["COMPSET_LNAME"]],
     )
 
-    comp_class_ix = {comp_class: i for i, comp_class in enumerate(cime.comp_classes)}
-
-    def refresh_comp_options_tab_title(change):
-        """Refresh the title of the component options tab when the value changes:
-        If a value is set, display a checkmark; otherwise, display a question mark."""
-        comp_class = change["owner"].name.split("_")[1]
-        new_title = f"{comp_class} {chr(int('2714', base=16)) if change['new'] else chr(int('2753', base=16))}"
-        stg_comp_option._widget._main_body.set_title(
-            comp_class_ix[comp_class], new_title
-        )
-
-    # Explicitly call refresh_comp_options_tab_title to initialize the tab titles
-    # and set up the observers for the component options to update the tab titles.
+    if is_headless():
+        return  # No tab titles to refresh.
+
+    def refresh_comp_options_tab_titles(change=None):
+        """Refresh the titles of the component options tabs: If a value is set, display a
+        checkmark; otherwise, display a question mark. The titles are refreshed only if the
+        stage widget is already constructed. Otherwise, they are set once it is constructed."""
+        if stg_comp_option._widget is None:
+            return
+        for i, comp_class in enumerate(cime.comp_classes):
+            value = cvars[f"COMP_{comp_class}_OPTION"].value
+            mark = chr(int("2714", base=16)) if value else chr(int("2753", base=16))
+            stg_comp_option._widget._main_body.set_title(i, f"{comp_class} {mark}")
+
+    # Set up the observers for the component options to update the tab titles.
     for comp_class in cime.comp_classes:
-        refresh_comp_options_tab_title(
-            {
-                "owner": cvars[f"COMP_{comp_class}_OPTION"],
-                "new": cvars[f"COMP_{comp_class}_OPTION"].value,
-            }
-        )
         cv_comp_option = cvars[f"COMP_{comp_class}_OPTION"]
         cv_comp_option.observe(
-            refresh_comp_options_tab_title, names="value", type="change"
+            refresh_comp_options_tab_titles, names="value", type="change"
         )
@@ -1,22 +1,31 @@
 import logging
-from ipywidgets import VBox, HBox
 from pathlib import Path
 import time
 import os
+from functools import cache
 from z3 import And
 
 from ProConPy.config_var import cvars
 from ProConPy.stage import Stage, Guard
 from ProConPy.out_handler import handler as owh
-from visualCaseGen.custom_widget_types.stage_widget import StageWidget
-from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
-from visualCaseGen.custom_widget_types.clm_modifier_launcher import MeshMaskModifierLauncher, FsurdatModifierLauncher
-from visualCaseGen.custom_widget_types.runoff_mapping_generator import RunoffMappingGenerator
-from visualCaseGen.custom_widget_types.ww3_input_generator import WW3InputGenerator
+from visualCaseGen.stages.stage_widget_factory import stage_widget
 
 logger = logging.getLogger("\t" + __name__.split(".")[-1])
 
 
+# Factories of the supplementary widgets of grid stages. The widget modules are imported only
+# when the widgets are constructed, i.e., not at all when the stages are initialized headless.
+
+def _mom6_forge_launcher():
+    from visualCaseGen.custom_widget_types.mom6_forge_launcher import MOM6ForgeLauncher
+    return MOM6ForgeLauncher()
+
+
+def _ww3_input_generator():
+    from visualCaseGen.custom_widget_types.ww3_input_generator import WW3InputGenerator
+    return WW3InputGenerator()
+
+
 @owh.out.capture()
 def initialize_grid_stages(cime):
     """Initialize the stages for grid configuration."""
@@ -28,7 +37,7 @@ def initialize_grid_stages(cime):
         "You may choose to use a standard, out-of-the-box resolution or create a custom one by "
         "mixing and matching readily available model grids. In custom mode, you may also create "
         "new CLM and/or MOM6 grids using the auxiliary tools that come with visualCaseGen.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         varlist=[cvars["GRID_MODE"]],
     )
 
@@ -39,7 +48,7 @@ def initialize_grid_stages(cime):
         "chosen in the first step. You may use the search box to further narrow down the list. For "
         "exact matches, you can use double quotes. Otherwise, the search will display all grids "
         "containing one or more of the words in the search box.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Standard ",
             parent=stg_grid,
@@ -62,7 +71,7 @@ def initialize_grid_stages(cime):
         "Before creating the new grid, specify a path where the new grid files will be stored. Also, "
         "specify the grid (resolution) name that will be used to refer to the new grid in the rest of "
         "the configuration process and afterwards.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_grid,
         varlist=[cvars["CUSTOM_GRID_PATH"]],
     )
@@ -71,7 +80,7 @@ def initialize_grid_stages(cime):
         title="Atmosphere Grid",
         description="From the below list of standard atmosphere grids, select one to be used as the "
         "atmosphere grid within the new, custom CESM grid.",
-        widget=StageWidget(HBox),
+        widget=stage_widget("HBox"),
         parent=guard_custom_grid,
         varlist=[cvars["CUSTOM_ATM_GRID"]],
         auto_set_default_value=False,
@@ -83,7 +92,7 @@ def initialize_grid_stages(cime):
         "MOM6 as the ocean model, create a new ocean grid. If you choose to create a new ocean grid, "
         "you will be prompted to specify the grid extent, resolution, and other parameters. You "
         "will then be directed to a new notebook to create the new grid using the mom6_forge tool.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_grid,
         varlist=[cvars["OCN_GRID_MODE"]],
     )
@@ -92,7 +101,7 @@ def initialize_grid_stages(cime):
         title="Ocean Grid",
         description="From the below list of standard ocean grids, select one to be used as the "
         "ocean grid within the new, custom CESM grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Std Ocn Grid",
             parent=stg_custom_ocn_grid_mode,
@@ -108,9 +117,9 @@ def initialize_grid_stages(cime):
         "the button will launch a new notebook. Execute all the cells in the notebook to create the new "
         "grid. Once all the cells are executed, return to this tab and click the Confirm Completion "
         "button to proceed to the next stage.",
-        widget=StageWidget(
-            VBox,
-            supplementary_widgets=[MOM6ForgeLauncher()]
+        widget=stage_widget(
+            "VBox",
+            supplementary_widgets=[_mom6_forge_launcher]
         ),
         parent=Guard(
             title="Custom Ocn Grid",
@@ -138,7 +147,7 @@ def initialize_grid_stages(cime):
         "is set to a constant reference value and salinity is fit accordingly. This is rather a simple "
         "configuration and users are encouraged to further customize the initial conditions in the user_nl_mom6 "
         "file once the case is created.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=stg_new_ocn_grid,
         varlist=[cvars["OCN_IC_MODE"]],
     )
@@ -147,7 +156,7 @@ def initialize_grid_stages(cime):
         title="Simple Initial Conditions",
         description="Set a uniform reference temperature for the new ocean grid. Salinity will be "
         "fit accordingly.",
-        widget=StageWidget(VBox, add_ok_button=True),
+        widget=stage_widget("VBox", add_ok_button=True),
         parent=Guard(
             title="Std IC",
             parent=stg_new_ocn_grid_ic_mode,
@@ -159,7 +168,7 @@ def initialize_grid_stages(cime):
     stg_new_ocn_grid_ic_file = Stage(
         title="Initial Conditions from File",
         description="Specify the path to the initial temperature and salinity file for the new ocean grid.",
-        widget=StageWidget(VBox, add_ok_button=True),
+        widget=stage_widget("VBox", add_ok_button=True),
         parent=Guard(
             title="File IC",
             parent=stg_new_ocn_grid_ic_mode,
@@ -175,7 +184,7 @@ def initialize_grid_stages(cime):
     stg_custom_lnd_grid_mode = Stage(
         title="Land Grid Mode",
         description="Determine whether to use a standard land grid or modify an existing land grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_grid,
         varlist=[cvars["LND_GRID_MODE"]],
         # Only relevant for an active land model (CLM). For stub/data land, the land grid is
@@ -186,7 +195,7 @@ def initialize_grid_stages(cime):
     stg_standard_custom_lnd_grid = Stage(
         title="Land Grid",
         description="Select a standard land grid to be used as the land grid within the new, custom CESM grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Std Lnd Grid",
             parent=stg_custom_lnd_grid_mode,
@@ -202,7 +211,7 @@ def initialize_grid_stages(cime):
         title="Base Land Grid",
         description="Select a base CLM grid. In the following stages, you will be able modify its "
         "land mask and surface data using the auxiliary tools that come with CESM.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Modified Lnd Grid",
             parent=stg_custom_lnd_grid_mode,
@@ -212,7 +221,19 @@ def initialize_grid_stages(cime):
         auto_set_default_value=False,
     )
 
-    fsurdat_modifier_launcher = FsurdatModifierLauncher(cime.srcroot)
+    @cache
+    def fsurdat_modifier_launcher():
+        """The fsurdat modifier launcher, shared by the two fsurdat stages below."""
+        from visualCaseGen.custom_widget_types.clm_modifier_launcher import FsurdatModifierLauncher
+        return FsurdatModifierLauncher(cime.srcroot)
+
+    def runoff_mapping_generator():
+        from visualCaseGen.custom_widget_types.runoff_mapping_generator import RunoffMappingGenerator
+        return RunoffMappingGenerator(cime)
+
+    def mesh_mask_modifier_launcher():
+        from visualCaseGen.custom_widget_types.clm_modifier_launcher import MeshMaskModifierLauncher
+        return MeshMaskModifierLauncher(cime.srcroot)
 
     stg_fsurdat_modifier_w_mom = Stage(
         title="fsurdat",
@@ -220,10 +241,10 @@ def initialize_grid_stages(cime):
         "tool to modify the surface data of the selected CLM grid. The properties to configure and "
         "modify include soil properties, vegetation properties, urban areas, etc. See CLM documentation "
         "for more information.",
-        widget=StageWidget(
-            VBox,
+        widget=stage_widget(
+            "VBox",
             supplementary_widgets=[
-                cvars["FSURDAT_MATRIX"]._widget,
+                lambda: cvars["FSURDAT_MATRIX"].widget,
                 fsurdat_modifier_launcher,
             ],
         ),
@@ -260,10 +281,10 @@ def initialize_grid_stages(cime):
         "mask file that contains the final land mask. This file must be created by the user beforehand. "
         "You may then specify the variable and dimension names of latitude and longitude in the mask file. "
         "Finally, specify the output file name to be generated by the mesh_mask_modifier tool.",
-        widget=StageWidget(
-            VBox,
+        widget=stage_widget(
+            "VBox",
             supplementary_widgets=[
-                MeshMaskModifierLauncher(cime.srcroot)
+                mesh_mask_modifier_launcher
             ]
         ),
         parent=guard_custom_clm_grid_wo_mom,
@@ -284,10 +305,10 @@ def initialize_grid_stages(cime):
         "tool to modify the surface data of the selected CLM grid. The properties to configure and "
         "modify include soil properties, vegetation properties, urban areas, etc. See CLM documentation "
         "for more information.",
-        widget=StageWidget(
-            VBox,
+        widget=stage_widget(
+            "VBox",
             supplementary_widgets=[
-                cvars["FSURDAT_MATRIX"]._widget,
+                lambda: cvars["FSURDAT_MATRIX"].widget,
                 fsurdat_modifier_launcher
             ]
         ),
@@ -310,7 +331,7 @@ def initialize_grid_stages(cime):
         title="Runoff Grid",
         description="From the below list of standard runoff grids, select one to be used as the "
         "runoff grid within the new, custom CESM grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_grid,
         varlist=[cvars["CUSTOM_ROF_GRID"]],
         auto_set_default_value=False,
@@ -324,9 +345,9 @@ def initialize_grid_stages(cime):
         description="If the ocean model is MOM6, and unless there exists a standard mapping between"
         "the selected runoff grid and the custom ocean grid, a new mapping must be created using "
         "the mom6_forge mapping module.",
-        widget=StageWidget(
-            VBox,
-            supplementary_widgets=[RunoffMappingGenerator(cime)]
+        widget=stage_widget(
+            "VBox",
+            supplementary_widgets=[runoff_mapping_generator]
         ),
         parent=Guard(
             title="ROF to OCN Mapping",
@@ -341,7 +362,7 @@ def initialize_grid_stages(cime):
         description="Choose the wave grid for the new, custom CESM grid. If you created a custom "
         "ocean grid and waves are active (WW3), you may reuse that ocean grid as the wave grid; "
         "otherwise, select an existing (standard) wave grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=guard_custom_grid,
         varlist=[cvars["WAV_GRID_MODE"]],
         # Only relevant when a wave component is present. For stub waves (swav) there is no wave
@@ -352,7 +373,7 @@ def initialize_grid_stages(cime):
     stg_custom_wav_grid_standard = Stage(
         title="Wave Grid",
         description="Select an existing (standard) wave grid to use within the new, custom CESM grid.",
-        widget=StageWidget(VBox),
+        widget=stage_widget("VBox"),
         parent=Guard(
             title="Std Wav Grid",
             parent=stg_custom_wav_grid_mode,
@@ -368,9 +389,9 @@ def initialize_grid_stages(cime):
         description="Reusing the custom ocean grid as the wave grid requires generating the WW3 "
         "grid-preprocessor input files from the ocean grid. Click the button below to generate "
         "them, then click Confirm to proceed.",
-        widget=StageWidget(
-            VBox,
-            supplementary_widgets=[WW3InputGenerator()]
+        widget=stage_widget(
+            "VBox",
+            supplementary_widgets=[_ww3_input_generator]
         ),
         parent=Guard(
             title="WAV uses OCN grid",
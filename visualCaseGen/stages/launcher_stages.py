@@ -1,11 +1,9 @@
 import logging
-from ipywidgets import VBox, HBox, Button
 
 from ProConPy.config_var import cvars
 from ProConPy.stage import Stage
 from ProConPy.out_handler import handler as owh
-from visualCaseGen.custom_widget_types.stage_widget import StageWidget
-from visualCaseGen.custom_widget_types.case_creator_widget import CaseCreatorWidget
+from visualCaseGen.stages.stage_widget_factory import stage_widget
 
 logger = logging.getLogger("\t" + __name__.split(".")[-1])
 
@@ -21,6 +19,10 @@ def initialize_launcher_stages(cime):
     ]
     # Note: PROJECT is not included in the launcher_vars list because it is not always required.
 
+    def case_creator_widget():
+        from visualCaseGen.custom_widget_types.case_creator_widget import CaseCreatorWidget
+        return CaseCreatorWidget(cime)
+
     stg_launch = Stage(
         title="3. Launch",
         description="Create and set up the case by specifying an existing path for its creation "
@@ -30,9 +32,9 @@ def initialize_launcher_stages(cime):
         "If the machine requires a PROJECT id, you'll be prompted to provide it. When everything "
         "is set, click either the *Create Case* button or *Show Commands* to view the "
         "corresponding terminal commands.",
-        widget=StageWidget(
-            VBox,
-            supplementary_widgets=[CaseCreatorWidget(cime)]
+        widget=stage_widget(
+            "VBox",
+            supplementary_widgets=[case_creator_widget]
         ),
         varlist=launcher_vars,
     )
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""A module to construct the widgets of stages. Stage widgets are constructed lazily, i.e., when
+the stage is first enabled or displayed. In headless mode, i.e., when visualCaseGen is used as a
+backend library without the GUI, stages are given DummyStageWidget instances instead, and neither
+ipywidgets nor the modules of supplementary widgets get imported."""
+
+from ProConPy.dummy_widget import DummyStageWidget
+
+_headless = False
+
+
+def set_headless(headless):
+    """Set whether the stages to be initialized are to be traversed headless.
+
+    Parameters
+    ----------
+    headless : bool
+        If True, stage_widget returns DummyStageWidget instances.
+    """
+    global _headless
+    _headless = headless
+
+
+def is_headless():
+    """Returns True if the stages are initialized headless."""
+    return _headless
+
+
+def stage_widget(main_body_type="VBox", supplementary_widgets=(), add_ok_button=False):
+    """Return the widget of a stage, or rather, a function constructing it when called by the
+    stage upon first enabling or displaying it. In headless mode, a DummyStageWidget is returned.
+
+    Parameters
+    ----------
+    main_body_type : str
+        The type of the main body of the StageWidget: "VBox", "HBox", or "Tab".
+    supplementary_widgets : list of callables
+        Functions returning the supplementary widgets to be added to the StageWidget. These are
+        called only when the StageWidget gets constructed, so that the supplementary widgets are
+        not constructed (and their modules not imported) otherwise.
+    add_ok_button : bool
+        Whether to add an OK button to the StageWidget.
+
+    Returns
+    -------
+    callable or DummyStageWidget
+        A function returning the StageWidget, or a DummyStageWidget if headless.
+    """
+    if _headless:
+        return DummyStageWidget()
+
+    def make_stage_widget():
+        import ipywidgets
+        from visualCaseGen.custom_widget_types.stage_widget import StageWidget
+
+        return StageWidget(
+            getattr(ipywidgets, main_body_type),
+            supplementary_widgets=[make_widget() for make_widget in supplementary_widgets],
+            add_ok_button=add_ok_button,
+        )
+
+    return make_stage_widget
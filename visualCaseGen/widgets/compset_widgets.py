@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 import ipywidgets as widgets
 
 from ProConPy.config_var import cvars
@@ -14,7 +15,8 @@ def initialize_compset_widgets(cime):
     """Construct the compset section of the GUI."""
 
     cv_compset_mode = cvars["COMPSET_MODE"]
-    cv_compset_mode.widget = widgets.ToggleButtons(
+    cv_compset_mode.widget_factory = partial(
+        widgets.ToggleButtons,
         description="Configuration Mode:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": button_width, "description_width": description_width},
@@ -23,7 +25,8 @@ def initialize_compset_widgets(cime):
     # Standard Compset Widgets
 
     cv_support_level = cvars["SUPPORT_LEVEL"]
-    cv_support_level.widget = widgets.ToggleButtons(
+    cv_support_level.widget_factory = partial(
+        widgets.ToggleButtons,
         description="Browse all compsets or scientifically supported only?",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": button_width, "description_width": "max-content"},
@@ -31,21 +34,24 @@ def initialize_compset_widgets(cime):
 
     for comp_class in cime.comp_classes:
         cv_comp_filter = cvars[f"COMP_{comp_class}_FILTER"]
-        cv_comp_filter.widget = widgets.ToggleButtons(
+        cv_comp_filter.widget_factory = partial(
+            widgets.ToggleButtons,
             description=f'{chr(int("2000",base=16))*5}{chr(int("25BC",base=16))} {comp_class}',
             layout={"width": "120px"},  # , 'max_height':'145px'},
             style={"button_width": "105px", "description_width": "0px"},
         )
 
     compset_alias = cvars["COMPSET_ALIAS"]
-    compset_alias.widget = MultiCheckbox(
+    compset_alias.widget_factory = partial(
+        MultiCheckbox,
         description="Compset Alias: (Scroll horizontally to see all option descriptions.)",
         allow_multi_select=False
     )
     # Custom Compset Widgets
 
     cv_inittime = cvars["INITTIME"]
-    cv_inittime.widget = widgets.ToggleButtons(
+    cv_inittime.widget_factory = partial(
+        widgets.ToggleButtons,
         description="Initialization Time:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "100px", "description_width": description_width},
@@ -54,21 +60,24 @@ def initialize_compset_widgets(cime):
     for comp_class in cime.comp_classes:
 
         cv_comp = cvars[f"COMP_{comp_class}"]
-        cv_comp.widget = widgets.ToggleButtons(
+        cv_comp.widget_factory = partial(
+            widgets.ToggleButtons,
             description=f'{chr(int("2000",base=16))*5}{chr(int("25BC",base=16))} {comp_class}',
             layout={"width": "120px"},  # , 'max_height':'145px'},
             style={"button_width": "105px", "description_width": "0px"},
         )
 
         cv_comp_phys = cvars[f"COMP_{comp_class}_PHYS"]
-        cv_comp_phys.widget = widgets.ToggleButtons(
+        cv_comp_phys.widget_factory = partial(
+            widgets.ToggleButtons,
             description=f'{chr(int("2000",base=16))*5}{chr(int("25BC",base=16))} {comp_class}',
             layout={"width": "120px"},  # , 'max_height':'145px'},
             style={"button_width": "105px", "description_width": "90px"},
         )
 
         cv_comp_option = cvars[f"COMP_{comp_class}_OPTION"]
-        cv_comp_option.widget = MultiCheckbox(
+        cv_comp_option.widget_factory = partial(
+            MultiCheckbox,
             description=comp_class + ":",
             allow_multi_select=True
         )
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from ipywidgets import ToggleButtons, Text, Dropdown
 from ipyfilechooser import FileChooser
 from pathlib import Path
@@ -18,7 +19,8 @@ def initialize_grid_widgets(cime):
     """Construct the grid widgets for the case configurator."""
 
     cv_grid_mode = cvars["GRID_MODE"]
-    cv_grid_mode.widget = ToggleButtons(
+    cv_grid_mode.widget_factory = partial(
+        ToggleButtons,
         description="Configuration Mode:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "100px", "description_width": description_width},
@@ -36,7 +38,8 @@ def initialize_grid_widgets(cime):
 def initialize_standard_grid_widgets():
     """Initialize the widgets for the standard grid options."""
     cv_grid = cvars["GRID"]
-    cv_grid.widget = MultiCheckbox(
+    cv_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Grid:",
         allow_multi_select=False,
     )
@@ -50,7 +53,8 @@ def initialize_custom_grid_path_widget(cime):
             default_path = p
     
     cv_custom_grid_path = cvars["CUSTOM_GRID_PATH"]
-    cv_custom_grid_path.widget = FileChooser(
+    cv_custom_grid_path.widget_factory = partial(
+        FileChooser,
         path=default_path,
         filename="",
         title="Specify a directory and a new grid name:",
@@ -62,7 +66,8 @@ def initialize_custom_grid_path_widget(cime):
 def initialize_custom_atm_grid_widgets():
     """Initialize the widgets for the custom ATM grid options."""
     cv_custom_atm_grid = cvars["CUSTOM_ATM_GRID"]
-    cv_custom_atm_grid.widget = MultiCheckbox(
+    cv_custom_atm_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Custom ATM Grid:",
         allow_multi_select=False,
     )
@@ -70,69 +75,79 @@ def initialize_custom_atm_grid_widgets():
 def initialize_custom_ocn_grid_widgets():
     """Initialize the widgets for the custom OCN grid options."""
     cv_custom_ocn_grid_mode = cvars["OCN_GRID_MODE"]
-    cv_custom_ocn_grid_mode.widget = ToggleButtons(
+    cv_custom_ocn_grid_mode.widget_factory = partial(
+        ToggleButtons,
         description="Ocean Grid Mode:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "140px", "description_width": description_width},
     )
 
     cv_custom_ocn_grid = cvars["CUSTOM_OCN_GRID"]
-    cv_custom_ocn_grid.widget = MultiCheckbox(
+    cv_custom_ocn_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Custom Ocean Grid:",
         allow_multi_select=False,
     )
 
     cv_ocn_grid_extent = cvars["OCN_GRID_EXTENT"]
-    cv_ocn_grid_extent.widget = ToggleButtons(
+    cv_ocn_grid_extent.widget_factory = partial(
+        ToggleButtons,
         description="Grid Extent:",
         layout={"display": "flex", "left":"30px", "width": "max-content", "padding": "5px"},
         style={"button_width": "100px", "description_width": "125px"},
     )
 
     cv_ocn_cyclic_x = cvars["OCN_CYCLIC_X"]
-    cv_ocn_cyclic_x.widget = ToggleButtons(
+    cv_ocn_cyclic_x.widget_factory = partial(
+        ToggleButtons,
         description="Zonally Reentrant:",
         layout={"display": "flex", "left":"30px", "width": "max-content", "padding": "5px"},
         style={"button_width": "100px", "description_width": "125px"},
     )
 
     cv_ocn_nx = cvars["OCN_NX"]
-    cv_ocn_nx.widget = Text(
+    cv_ocn_nx.widget_factory = partial(
+        Text,
         description="Number of Cells in X direction:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_ocn_ny = cvars["OCN_NY"]
-    cv_ocn_ny.widget = Text(
+    cv_ocn_ny.widget_factory = partial(
+        Text,
         description="Number of Cells in Y direction:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_ocn_lenx = cvars["OCN_LENX"]
-    cv_ocn_lenx.widget = Text(
+    cv_ocn_lenx.widget_factory = partial(
+        Text,
         description="Grid Length in X direction (degrees):",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_ocn_leny = cvars["OCN_LENY"]
-    cv_ocn_leny.widget = Text(
+    cv_ocn_leny.widget_factory = partial(
+        Text,
         description="Grid Length in Y direction (degrees):",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_custom_ocn_grid_name = cvars["CUSTOM_OCN_GRID_NAME"]
-    cv_custom_ocn_grid_name.widget = Text(
+    cv_custom_ocn_grid_name.widget_factory = partial(
+        Text,
         description="Custom Ocean Grid Name:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_mom6_forge_stat = cvars["MOM6_BATHY_STATUS"]
-    cv_mom6_forge_stat.widget = DisabledText(
+    cv_mom6_forge_stat.widget_factory = partial(
+        DisabledText,
         value = '',
         disabled = True, 
         description="mom6_forge status:",
@@ -142,14 +157,16 @@ def initialize_custom_ocn_grid_widgets():
     )
 
     cv_ocn_ic_mode = cvars["OCN_IC_MODE"]
-    cv_ocn_ic_mode.widget = ToggleButtons(
+    cv_ocn_ic_mode.widget_factory = partial(
+        ToggleButtons,
         description="Ocean Initial Conditions Mode:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "140px", "description_width": "200px"},
     )
 
     cv_t_ref = cvars["T_REF"]
-    cv_t_ref.widget = Text(
+    cv_t_ref.widget_factory = partial(
+        Text,
         description="Reference Temperature [degC]:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
@@ -157,7 +174,8 @@ def initialize_custom_ocn_grid_widgets():
     )
 
     cv_temp_salt_z_init = cvars["TEMP_SALT_Z_INIT_FILE"]
-    cv_temp_salt_z_init.widget = FileChooser(
+    cv_temp_salt_z_init.widget_factory = partial(
+        FileChooser,
         path=Path.home(),
         filename="",
         title="&#9658; Initial Temperature and Salinity File:",
@@ -168,7 +186,8 @@ def initialize_custom_ocn_grid_widgets():
     )
 
     cv_ic_ptemp_name = cvars["IC_PTEMP_NAME"]
-    cv_ic_ptemp_name.widget = Text(
+    cv_ic_ptemp_name.widget_factory = partial(
+        Text,
         description="P. temperature variable name in IC file:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
@@ -176,7 +195,8 @@ def initialize_custom_ocn_grid_widgets():
     )
 
     cv_ic_salt_name = cvars["IC_SALT_NAME"]
-    cv_ic_salt_name.widget = Text(
+    cv_ic_salt_name.widget_factory = partial(
+        Text,
         description="Salinity variable name in IC file:",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
@@ -189,20 +209,23 @@ def initialize_custom_lnd_grid_widgets():
     description_width = "250px"
 
     cv_lnd_grid_mode = cvars["LND_GRID_MODE"]
-    cv_lnd_grid_mode.widget = ToggleButtons(
+    cv_lnd_grid_mode.widget_factory = partial(
+        ToggleButtons,
         description="LND grid mode:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "140px", "description_width": description_width},
     )
 
     cv_custom_lnd_grid = cvars["CUSTOM_LND_GRID"]
-    cv_custom_lnd_grid.widget = MultiCheckbox(
+    cv_custom_lnd_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Custom LND Grid:",
         allow_multi_select=False,
     )
 
     cv_input_mask_mesh = cvars["INPUT_MASK_MESH"]
-    cv_input_mask_mesh.widget = FileChooser(
+    cv_input_mask_mesh.widget_factory = partial(
+        FileChooser,
         #path=Path.home(),
         filename="",
         title="&#9658; Mesh file (containing the coordinates):",
@@ -213,7 +236,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_land_mask = cvars["LAND_MASK"]
-    cv_land_mask.widget = FileChooser(
+    cv_land_mask.widget_factory = partial(
+        FileChooser,
         #path=Path.home(),
         filename="",
         title="&#9658; Land mask file (pre-generated by the user and containing a custom land mesh):",
@@ -224,7 +248,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lat_var_name = cvars["LAT_VAR_NAME"]
-    cv_lat_var_name.widget = Text(
+    cv_lat_var_name.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description="&#9658; Latitude Variable Name:",
         layout={"width": "350px", "padding": "5px"},
@@ -232,7 +257,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lon_var_name = cvars["LON_VAR_NAME"]
-    cv_lon_var_name.widget = Text(
+    cv_lon_var_name.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description="&#9658; Longitude Variable Name:",
         layout={"width": "350px", "padding": "5px"},
@@ -240,7 +266,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lat_dim_name = cvars["LAT_DIM_NAME"]
-    cv_lat_dim_name.widget = Text(
+    cv_lat_dim_name.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description="&#9658; Latitude Dimension Name:",
         layout={"width": "350px", "padding": "5px"},
@@ -248,7 +275,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lon_dim_name = cvars["LON_DIM_NAME"]
-    cv_lon_dim_name.widget = Text(
+    cv_lon_dim_name.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description="&#9658; Longitude Dimension Name:",
         layout={"width": "350px", "padding": "5px"},
@@ -257,10 +285,11 @@ def initialize_custom_lnd_grid_widgets():
 
 
     cv_mask_mesh_mod_status = cvars["MESH_MASK_MOD_STATUS"]
-    cv_mask_mesh_mod_status.widget = DisabledText(value = '',)
+    cv_mask_mesh_mod_status.widget_factory = partial(DisabledText, value = '',)
 
     cv_input_fsurdat = cvars["INPUT_FSURDAT"]
-    cv_input_fsurdat.widget = FileChooser(
+    cv_input_fsurdat.widget_factory = partial(
+        FileChooser,
         #path=Path.home(),
         filename="",
         title="&#9658; Input surface data file (fsurdat):",
@@ -271,10 +300,11 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_fsurdat_area_spec = cvars["FSURDAT_AREA_SPEC"]
-    cv_fsurdat_area_spec.widget = FsurdatAreaSpecifier()
+    cv_fsurdat_area_spec.widget_factory = FsurdatAreaSpecifier
 
     cv_fsurdat_idealized = cvars["FSURDAT_IDEALIZED"]
-    cv_fsurdat_idealized.widget = ToggleButtons(
+    cv_fsurdat_idealized.widget_factory = partial(
+        ToggleButtons,
         description_allow_html=True,
         description="&#9658; Idealized Surface Data?",
         layout={"display": "flex", "width": "max-content", "margin": "20px 5px 5px 5px", "left":"70px"},
@@ -282,7 +312,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lnd_dom_pft = cvars["LND_DOM_PFT"]
-    cv_lnd_dom_pft.widget = Text(
+    cv_lnd_dom_pft.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description='&#9658; PFT/CFT',
         layout={'display':'flex', 'width': 'max-content', 'margin':'5px'},
@@ -290,7 +321,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lnd_soil_color = cvars["LND_SOIL_COLOR"]
-    cv_lnd_soil_color.widget = Text(
+    cv_lnd_soil_color.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description='&#9658; Soil Color (between 0-20)',
         layout={'display':'flex', 'width': 'max-content', 'margin':'5px'},
@@ -298,7 +330,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lnd_std_elev = cvars["LND_STD_ELEV"]
-    cv_lnd_std_elev.widget = Text(
+    cv_lnd_std_elev.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description='&#9658; Std. dev. of elevation',
         layout={'display':'flex', 'width': 'max-content', 'margin':'5px'},
@@ -307,7 +340,8 @@ def initialize_custom_lnd_grid_widgets():
 
     cv_lnd_max_sat_area = cvars["LND_MAX_SAT_AREA"]
     description_allow_html=True,
-    cv_lnd_max_sat_area.widget = Text(
+    cv_lnd_max_sat_area.widget_factory = partial(
+        Text,
         description_allow_html=True,
         description='&#9658; Max fraction of saturated area',
         layout={'display':'flex', 'width': 'max-content', 'margin':'5px'},
@@ -315,7 +349,8 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_lnd_include_nonveg = cvars["LND_INCLUDE_NONVEG"]
-    cv_lnd_include_nonveg.widget = ToggleButtons(
+    cv_lnd_include_nonveg.widget_factory = partial(
+        ToggleButtons,
         description_allow_html=True,
         description="&#9658; Include non-vegetation land units?",
         layout={"display": "flex", "width": "max-content", "margin": "5px", 'left':"10px"},
@@ -323,32 +358,35 @@ def initialize_custom_lnd_grid_widgets():
     )
 
     cv_fsurdat_matrix = cvars["FSURDAT_MATRIX"]
-    cv_fsurdat_matrix.widget = FsurdatMatrix()
+    cv_fsurdat_matrix.widget_factory = FsurdatMatrix
 
     cv_fsurdat_mod_status = cvars["FSURDAT_MOD_STATUS"]
-    cv_fsurdat_mod_status.widget = DisabledText(value='')
+    cv_fsurdat_mod_status.widget_factory = partial(DisabledText, value='')
 
 
 def initialize_custom_rof_grid_widgets():
     """Initialize the widgets for the custom ROF grid options."""
     cv_custom_rof_grid = cvars["CUSTOM_ROF_GRID"]
-    cv_custom_rof_grid.widget = MultiCheckbox(
+    cv_custom_rof_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Custom ROF Grid:",
         allow_multi_select=False,
     )
 
     cv_rof_ocn_mapping_status = cvars["ROF_OCN_MAPPING_STATUS"]
-    cv_rof_ocn_mapping_status.widget = DisabledText(value='')
+    cv_rof_ocn_mapping_status.widget_factory = partial(DisabledText, value='')
 
     cv_rof_ocn_mapping_rmax = cvars["ROF_OCN_MAPPING_RMAX"]
-    cv_rof_ocn_mapping_rmax.widget = Text(
+    cv_rof_ocn_mapping_rmax.widget_factory = partial(
+        Text,
         description="Smoothing Rmax (km):",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
     )
 
     cv_rof_ocn_mapping_fold = cvars["ROF_OCN_MAPPING_FOLD"]
-    cv_rof_ocn_mapping_fold.widget = Text(
+    cv_rof_ocn_mapping_fold.widget_factory = partial(
+        Text,
         description="Smoothing Fold (km):",
         layout={"width": "370px", "padding": "5px"},
         style={"description_width": "250px"},
@@ -358,17 +396,19 @@ def initialize_custom_rof_grid_widgets():
 def initialize_custom_wav_grid_widgets():
     """Initialize the widgets for the custom wave grid options."""
     cv_wav_grid_mode = cvars["WAV_GRID_MODE"]
-    cv_wav_grid_mode.widget = ToggleButtons(
+    cv_wav_grid_mode.widget_factory = partial(
+        ToggleButtons,
         description="Wave Grid:",
         layout={"display": "flex", "width": "max-content", "padding": "10px"},
         style={"button_width": "160px", "description_width": description_width},
     )
 
     cv_custom_wav_grid = cvars["CUSTOM_WAV_GRID"]
-    cv_custom_wav_grid.widget = MultiCheckbox(
+    cv_custom_wav_grid.widget_factory = partial(
+        MultiCheckbox,
         description="Custom Wave Grid:",
         allow_multi_select=False,
     )
 
     cv_ww3_input_status = cvars["WW3_INPUT_STATUS"]
-    cv_ww3_input_status.widget = DisabledText(value='')
\ No newline at end of file
+    cv_ww3_input_status.widget_factory = partial(DisabledText, value='')
\ No newline at end of file
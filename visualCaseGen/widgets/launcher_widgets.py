@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 import ipywidgets as widgets
 from pathlib import Path
 from ipyfilechooser import FileChooser
@@ -20,7 +21,8 @@ def initialize_launcher_widgets(cime):
         default_case_dir = Path(cime.cimeroot).parent.parent.as_posix()
 
     cv_caseroot = cvars["CASEROOT"]
-    cv_caseroot.widget = FileChooser(
+    cv_caseroot.widget_factory = partial(
+        FileChooser,
         path=default_case_dir,
         filename="",
         title="Select a case root (full path and name):",
@@ -33,18 +35,20 @@ def initialize_launcher_widgets(cime):
     cv_machine = cvars["MACHINE"]
     #if cime.machine is not None:
     #    cv_machine.value = cime.machine
-    cv_machine.widget = widgets.Dropdown(
+    cv_machine.widget_factory = partial(
+        widgets.Dropdown,
         description='Machine:',
         layout={'width': '260px', 'margin': '10px'}, # If the items' names are long
         style={'description_width': '80px'},
     )
 
     cv_project = cvars["PROJECT"]
-    cv_project.widget = widgets.Text(
+    cv_project.widget_factory = partial(
+        widgets.Text,
         description='Project ID:',
         layout={'width': '260px', 'margin': '10px'},
         style={'description_width': '80px'},
     )
 
     cv_case_creator_status = cvars["CASE_CREATOR_STATUS"]
-    cv_case_creator_status.widget = DisabledText(value = '',)
\ No newline at end of file
+    cv_case_creator_status.widget_factory = partial(DisabledText, value = '',)
\ No newline at end of file